@@ -2,37 +2,98 @@ import sys
 import os
 import asyncio
 import signal
+import time
 import functools
-from typing_extensions import Any, Type, Coroutine, TextIO, Callable, Self, Sequence
+import threading
+import multiprocessing
+import pickle
+import random
+from typing_extensions import (
+    Any,
+    Type,
+    Coroutine,
+    TextIO,
+    Callable,
+    Self,
+    Sequence,
+    Iterable,
+    Tuple,
+    cast,
+)
 import logging
 
 from .constants import *
 from .registry import PTRegistry, TokenRegistry
-from .pt_common import PTCommon, Arc
-from .observer import MergedRecordsType, Observer, ComparativeObserver
-from .transition import Transition
+from .pt_common import PTCommon, Arc, _loop
+from .observer import (
+    MergedRecordsType,
+    Observer,
+    ComparativeObserver,
+    StatisticsObserver,
+    OccupancyStatistics,
+)
+from .transition import Transition, FiringSubscription, FiringRecords
 from .place import Place, SpecialPlace
 from .token import Token
 from .validate import init_validator
+from .partition import ChannelArc, validate_partitions, insert_channels
+from .distributed import (
+    ProcessChannelArc,
+    PTStateType,
+    get_arc_tokens,
+    get_pt_state,
+    set_pt_state,
+)
+from .clock import VirtualClockEventLoop, run_with_virtual_clock
+from .cache import ResultCache
+from .trace import TraceSource, write_trace
+from .eventlog import EventLogWriter
+from .conformance import TokenReplayer, ConformanceResult, CaseReplay
+from .steadystate import (
+    BatchMeans,
+    SteadyStateEstimate,
+    SteadyStateMonitor,
+)
+from .policy import (
+    ConflictPolicy,
+    RoundRobinPolicy,
+    PriorityPolicy,
+    WeightedRandomPolicy,
+)
+from .control import (
+    RunControl,
+    RunResult,
+    StopConditions,
+    current_control,
+    _current_control,
+)
 
 
 def _int_handler(
-    signame: str, loop: asyncio.AbstractEventLoop, pt_registry: PTRegistry
+    signame: str,
+    loop: asyncio.AbstractEventLoop,
+    pt_registry: PTRegistry,
+    control: RunControl | None = None,
 ) -> None:
     print(f"Got signal '{signame}'")
 
     if signame == "SIGINT" or signame == "SIGTERM":
         print("Terminating...")
-        loop.stop()
+        if control is not None:
+            control.stop()
+        else:
+            loop.stop()
 
 
-def _add_int_handlers(pt_registry: PTRegistry) -> None:
+def _add_int_handlers(
+    pt_registry: PTRegistry, control: RunControl | None = None
+) -> None:
     loop = asyncio.get_running_loop()
 
     for signame in {"SIGINT", "SIGTERM"}:
         loop.add_signal_handler(
             getattr(signal, signame),
-            functools.partial(_int_handler, signame, loop, pt_registry),
+            functools.partial(_int_handler, signame, loop, pt_registry, control),
         )
 
 
@@ -45,13 +106,166 @@ def _cancel_all_tasks() -> None:
 def terminate() -> None:
     """
     Terminates PT net simulation.
+
+    Inside a simulation run, PT loops are requested to stop after completing
+    their current iteration. Tasks which do not belong to the run are not affected.
+    Outside of a run, all tasks of the running event loop are cancelled.
+    """
+    control: RunControl | None = current_control()
+    if control is not None:
+        control.stop()
+    else:
+        _cancel_all_tasks()
+
+
+_SHUTDOWN_ROUNDS: int = 3
+"""Number of event loop iterations without progress before the remaining
+tasks of a stopped run are cancelled"""
+
+
+def _raise_first_error(tasks: Iterable[asyncio.Task[Any]]) -> None:
+    for task in tasks:
+        if not task.cancelled() and (error := task.exception()) is not None:
+            raise error
+
+
+async def _shutdown(pending: set[asyncio.Task[Any]]) -> None:
+    """
+    Lets the tasks of a stopped run end by themselves, and cancels the ones which
+    are blocked, e.g. waiting for a full arc or an external event. A token which
+    is being sent to a full arc is put back to its PT when the sender is cancelled.
+
+    :param pending: Tasks which are not done yet.
+    """
+    rounds: int = 0
+    while pending and rounds < _SHUTDOWN_ROUNDS:
+        await asyncio.sleep(0)
+        done: set[asyncio.Task[Any]] = {task for task in pending if task.done()}
+        pending -= done
+        rounds = 0 if done else rounds + 1
+        _raise_first_error(done)
+
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _main(
+    pts: Iterable[PTCommon],
+    extra_routines: list[Coroutine[Any, Any, None]],
+    control: RunControl | None = None,
+) -> RunControl:
+    """
+    Runs PT loops and additional routines as asyncio tasks until all of them end
+    or the run is stopped by :py:func:`soyutnet.terminate`.
+
+    Only the tasks created here are cancelled when the run stops, so the
+    simulation can be embedded in an application with other tasks.
+
+    :param pts: PTs whose loops are run.
+    :param extra_routines: Asyncio task functions to be run additional to the PT net loops.
+    :param control: Stop request shared by the tasks. A new one is created if it is ``None``.
+    :return: Control of the completed run.
+    """
+    if control is None:
+        control = RunControl()
+    token: Any = _current_control.set(control)
+    """Tasks copy the current context, so they share the control."""
+    pending: set[asyncio.Task[Any]] = set()
+    logs: set[EventLogWriter] = set()
+    """Event logs are flushed even if the run fails."""
+    traces: set[TraceSource] = set()
+    """Trace files are closed even if the run is stopped or fails."""
+    try:
+        pts = list(pts)
+        control.start(asyncio.get_running_loop(), pts)
+        observed: list[PTCommon] = []
+        for pt in pts:
+            pending.add(asyncio.create_task(_loop(pt)))
+            if pt._observer is not None:
+                observed.append(pt)
+            if isinstance(pt, Transition) and pt._event_log is not None:
+                logs.add(pt._event_log)
+            if isinstance(pt, SpecialPlace) and isinstance(pt._source, TraceSource):
+                traces.add(pt._source)
+        for r in extra_routines:
+            pending.add(asyncio.create_task(r))
+
+        stop_request: asyncio.Task[None] = asyncio.create_task(control.wait())
+        try:
+            while pending and not control.stopped:
+                done, pending = await asyncio.wait(
+                    pending | {stop_request}, return_when=asyncio.FIRST_COMPLETED
+                )
+                pending.discard(stop_request)
+                done.discard(stop_request)
+                _raise_first_error(done)
+        finally:
+            stop_request.cancel()
+
+        await _shutdown(pending)
+        for pt in observed:
+            await pt._observer.flush()  # type: ignore[union-attr]
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+    finally:
+        for log in logs:
+            log.flush()
+        for trace in traces:
+            await trace.release()
+        control.close()
+        _current_control.reset(token)
+
+    return control
+
+
+def _get_result(
+    pts: Iterable[PTCommon], elapsed: float, stopped: bool = False, reason: str = ""
+) -> RunResult:
     """
-    _cancel_all_tasks()
+    Collects the final markings, the tokens in transitions and arcs, and the firing counts of PTs.
+
+    :param pts: PTs.
+    :param elapsed: Duration of the run in seconds.
+    :param stopped: ``True`` if the run is requested to stop.
+    :param reason: The reason of the stop request.
+    :return: Run result.
+    """
+    result: RunResult = RunResult(elapsed=elapsed, stopped=stopped, reason=reason)
+    for pt in pts:
+        wallet: TokenWalletType = {
+            label: list(ids) for label, ids in pt._tokens.items()
+        }
+        if isinstance(pt, Transition):
+            result.firing_counts[pt._name] = pt._no_of_times_enabled
+            result.held[pt._name] = wallet
+        elif isinstance(pt, Place):
+            result.markings[pt._name] = wallet
+        for arc, tokens in zip(pt._output_arcs, get_arc_tokens(pt)):
+            end: PTCommon | None = arc.end
+            if end is None or tokens is None:
+                continue
+            queued: TokenWalletType = result.arc_tokens.setdefault(
+                f"{pt._name}->{end._name}", {}
+            )
+            for label, id in tokens:
+                queued.setdefault(label, []).append(id)
+
+    return result
+
+
+def _registered_pts(pt_registry: PTRegistry) -> list[PTCommon]:
+    return [e[1] for e in pt_registry.entries() if isinstance(e[1], PTCommon)]
 
 
 async def main(
-    pt_registry: PTRegistry, extra_routines: list[Coroutine[Any, Any, None]] = []
-) -> None:
+    pt_registry: PTRegistry,
+    extra_routines: list[Coroutine[Any, Any, None]] = [],
+    until: StopConditions | None = None,
+) -> RunResult:
     """
     Main entry point of PT net simulation.
 
@@ -59,36 +273,317 @@ async def main(
 
     :param pt_registry: Registry object keeping all places and transitions in the model.
     :param extra_routines: Asyncio task functions to be run additional to the PT net loops.
+    :param until: Conditions stopping the run. It runs until :py:func:`soyutnet.terminate` \
+                  is called if it is ``None``.
+    :return: Final markings, firing counts and duration of the run.
     """
-    tasks: set[asyncio.Task[PTCommon]] = set()
+    control: RunControl = RunControl(until)
+    _add_int_handlers(pt_registry, control)
+    pts: list[PTCommon] = _registered_pts(pt_registry)
+    start: float = asyncio.get_running_loop().time()
+    await _main(pts, extra_routines, control)
+    elapsed: float = asyncio.get_running_loop().time() - start
+
+    result: RunResult = _get_result(pts, elapsed, control.stopped, control.reason)
+    result.quiescence = control.report
 
-    _add_int_handlers(pt_registry)
-    for loop in pt_registry.get_loops():
-        task: asyncio.Task[Any] = asyncio.create_task(loop)
-        tasks.add(task)
-        task.add_done_callback(tasks.discard)
+    return result
 
-    for r in extra_routines:
-        task = asyncio.create_task(r)
-        tasks.add(task)
-        task.add_done_callback(tasks.discard)
 
-    await asyncio.gather(*tasks, return_exceptions=False)
+def run(
+    *args: Any,
+    ignore_cancelled_exception: bool = True,
+    cache: ResultCache | None = None,
+    **kwargs: Any,
+) -> RunResult | None:
+    """
+    Runs :py:func:`soyutnet.main` in a new event loop.
 
+    If the net of the registry has a seed (see :py:class:`soyutnet.SoyutNet`),
+    the event loop is a :py:class:`soyutnet.clock.VirtualClockEventLoop`.
 
-def run(*args: Any, ignore_cancelled_exception: bool = True, **kwargs: Any) -> None:
+    :param ignore_cancelled_exception: Suppresses the cancellation of the run.
+    :param cache: If the run is deterministic and its result is in the cache, the \
+                  final state of the net is restored from the cache instead of running it. \
+                  See :py:class:`soyutnet.cache.ResultCache`.
+    :return: Result of the run or ``None`` if it is cancelled.
+    """
+    pt_registry: PTRegistry | None = args[0] if args else kwargs.get("pt_registry")
+    key: str | None = None
+    if cache is not None and pt_registry is not None:
+        extra_routines: Any = args[1] if len(args) > 1 else kwargs.get("extra_routines")
+        until: Any = args[2] if len(args) > 2 else kwargs.get("until")
+        key = cache.key(pt_registry, until, extra_routines or [])
+        if key is not None and (cached := cache.load(pt_registry, key)) is not None:
+            return cached
+
+    result: RunResult | None = None
     try:
-        asyncio.run(main(*args, **kwargs))
+        if pt_registry is not None and pt_registry.net.seed is not None:
+            result = run_with_virtual_clock(
+                main(*args, **kwargs), pt_registry.net.TIME_STEP
+            )
+        else:
+            result = asyncio.run(main(*args, **kwargs))
     except asyncio.exceptions.CancelledError as e:
         if not ignore_cancelled_exception:
             raise asyncio.exceptions.CancelledError(e)
 
+    if cache is not None and key is not None and result is not None:
+        cache.store(cast(PTRegistry, pt_registry), key, result)
+
+    return result
+
+
+def run_partitioned(
+    pt_registry: PTRegistry,
+    partitions: Sequence[Iterable[PTCommon]] | None = None,
+    extra_routines: list[Coroutine[Any, Any, None]] = [],
+) -> RunResult:
+    """
+    Runs the PT net in partitions, each on its own thread and asyncio event loop.
+
+    The arcs between PTs in different partitions are replaced by thread-safe
+    channels (:py:class:`soyutnet.partition.ChannelArc`) during the simulation.
+    The marking semantics in each partition are the same as :py:func:`soyutnet.run`.
+    When :py:func:`soyutnet.terminate` is called in any partition, or a partition
+    fails, all partitions are terminated.
+
+    :param pt_registry: Registry object keeping all places and transitions in the model.
+    :param partitions: Groups of PTs run together. Every registered PT must be in \
+                       exactly one group. If it is ``None``, connected components \
+                       of the net are used. See :py:func:`soyutnet.registry.PTRegistry.get_connected_components`.
+    :param extra_routines: Asyncio task functions run on the event loop of the first partition. \
+                           They must only interact with the PTs in the first partition.
+    :return: Final markings, firing counts and duration of the run.
+    """
+    if partitions is None:
+        partitions = pt_registry.get_connected_components()
+    groups: list[list[PTCommon]] = [list(partition) for partition in partitions]
+    pts: list[PTCommon] = _registered_pts(pt_registry)
+    owner: dict[PTCommon, int] = validate_partitions(pts, groups)
+    loops: list[asyncio.AbstractEventLoop] = [asyncio.new_event_loop() for _ in groups]
+    controls: list[RunControl] = [RunControl() for _ in groups]
+    channels: list[ChannelArc] = insert_channels(owner, loops)
+    errors: list[BaseException] = []
+    start: float = time.monotonic()
+
+    def stop_all() -> None:
+        for loop, control in zip(loops, controls):
+            loop.call_soon_threadsafe(control.stop)
+
+    def worker(i: int) -> None:
+        loop: asyncio.AbstractEventLoop = loops[i]
+        asyncio.set_event_loop(loop)
+        routines: list[Coroutine[Any, Any, None]] = extra_routines if i == 0 else []
+        try:
+            loop.run_until_complete(_main(groups[i], routines, controls[i]))
+        except asyncio.exceptions.CancelledError:
+            pass
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            stop_all()
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=worker, args=(i,), name=f"partition{i}")
+        for i in range(len(groups))
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for channel in channels:
+            channel.detach()
+        for loop in loops:
+            loop.close()
+
+    if errors:
+        raise errors[0]
+
+    stopped: list[RunControl] = [control for control in controls if control.stopped]
+    return _get_result(
+        pts,
+        time.monotonic() - start,
+        bool(stopped),
+        stopped[0].reason if stopped else "",
+    )
+
+
+def _run_worker(
+    pts: list[PTCommon],
+    channels: list[ProcessChannelArc],
+    extra_routines: list[Coroutine[Any, Any, None]],
+    stop: Any,
+    conn: Any,
+    poll_interval: float,
+) -> None:
+    """
+    Runs a partition of the net in a worker process started by
+    :py:func:`soyutnet.run_distributed` and sends back the final state of its PTs.
+    """
+    members: set[PTCommon] = set(pts)
+    owned: list[ProcessChannelArc] = [c for c in channels if c.start in members]
+
+    control: RunControl = RunControl()
+
+    async def coordinate() -> None:
+        while not stop.value and not control.stopped:
+            for channel in owned:
+                await channel.apply_feedback()
+            await asyncio.sleep(poll_interval)
+        control.stop()
+
+    error: BaseException | None = None
+    try:
+        asyncio.run(_main(pts, extra_routines + [coordinate()], control))
+    except asyncio.exceptions.CancelledError:
+        pass
+    except BaseException as e:
+        error = e
+    finally:
+        stop.value = 1
+
+    states: list[PTStateType] = [get_pt_state(pt) for pt in pts]
+    try:
+        conn.send((states, error))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        conn.send((states, SoyutNetError(repr(error))))
+    conn.close()
+
+
+def run_distributed(
+    pt_registry: PTRegistry,
+    partitions: Sequence[Iterable[PTCommon]] | None = None,
+    extra_routines: list[Coroutine[Any, Any, None]] = [],
+    poll_interval: float = 0.001,
+) -> RunResult:
+    """
+    Runs the PT net in partitions, each in its own worker process.
+
+    Worker processes are forked, so the net does not have to be picklable.
+    The arcs between PTs in different partitions are replaced by
+    :py:class:`soyutnet.distributed.ProcessChannelArc` which transmits
+    ``(label, id)`` pairs over shared memory ring buffers without pickling.
+    When :py:func:`soyutnet.terminate` is called in any partition, or a partition
+    fails, all partitions are terminated. Then, the final markings, tokens in the
+    arcs, observer records and statistics, and firing counts are copied back to
+    the PTs in the calling process, and the tokens left in the channels are moved
+    back to the original arcs.
+
+    It requires ``fork`` start method, so it works on Linux and other POSIX systems.
+
+    :param pt_registry: Registry object keeping all places and transitions in the model.
+    :param partitions: Groups of PTs run together. See :py:func:`soyutnet.run_partitioned`.
+    :param extra_routines: Asyncio task functions run in the process of the first partition. \
+                           They must only interact with the PTs in the first partition.
+    :param poll_interval: Period of checking the termination flag and observer \
+                          updates of cross partition arcs in seconds.
+    :return: Final markings, firing counts and duration of the run. \
+             :py:attr:`soyutnet.control.RunResult.stopped` is always ``True``.
+    """
+    if partitions is None:
+        partitions = pt_registry.get_connected_components()
+    groups: list[list[PTCommon]] = [list(partition) for partition in partitions]
+    all_pts: list[PTCommon] = _registered_pts(pt_registry)
+    owner: dict[PTCommon, int] = validate_partitions(all_pts, groups)
+    start: float = time.monotonic()
+    ctx = multiprocessing.get_context("fork")
+    stop: Any = ctx.Value("b", 0, lock=False)
+    channels: list[ProcessChannelArc] = []
+    errors: list[BaseException] = []
+    try:
+        for pt, i in owner.items():
+            for arc in list(pt._output_arcs):
+                end: Any = arc.end
+                if end is None or owner.get(end, i) == i:
+                    continue
+                channel: ProcessChannelArc = ProcessChannelArc(arc)
+                channel.attach()
+                channels.append(channel)
+
+        workers: list[Tuple[Any, Any]] = []
+        for i, pts in enumerate(groups):
+            receiver, sender = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_run_worker,
+                args=(
+                    pts,
+                    channels,
+                    extra_routines if i == 0 else [],
+                    stop,
+                    sender,
+                    poll_interval,
+                ),
+                name=f"partition{i}",
+            )
+            process.start()
+            sender.close()
+            workers.append((process, receiver))
+
+        for (process, receiver), pts in zip(workers, groups):
+            try:
+                states, error = receiver.recv()
+            except EOFError:
+                states, error = None, SoyutNetError(
+                    f"{process.name} exited unexpectedly"
+                )
+                stop.value = 1
+            process.join()
+            if error is not None:
+                errors.append(error)
+            if states is not None:
+                for pt, state in zip(pts, states):
+                    set_pt_state(pt, state)
+
+        async def apply_feedback() -> None:
+            """Observer updates sent after the start partition is terminated."""
+            for channel in channels:
+                await channel.apply_feedback()
+
+        asyncio.run(apply_feedback())
+    finally:
+        for coro in extra_routines:
+            coro.close()
+        for channel in channels:
+            channel.detach()
+            channel.close()
+
+    if errors:
+        raise errors[0]
+
+    return _get_result(all_pts, time.monotonic() - start, True)
+
 
 class SoyutNet(object):
     class Break(Exception):
         """Raised from :meth:`.bye` to exit SoyutNet context prematurely."""
 
-    def __init__(self, extra_routines: list[Coroutine[Any, Any, None]] = []) -> None:
+    def __init__(
+        self,
+        extra_routines: list[Coroutine[Any, Any, None]] = [],
+        until: StopConditions | None = None,
+        seed: int | None = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param extra_routines: Additional task functions to be run in a SoyutNet context.
+        :param until: Conditions stopping the run in a SoyutNet context.
+        :param seed: Enables the deterministic mode. :py:func:`soyutnet.run` uses \
+                     a :py:class:`soyutnet.clock.VirtualClockEventLoop`, and PT \
+                     identifiers and :py:attr:`soyutnet.SoyutNet.random` are generated \
+                     from the seed. So, the same net and seed produce identical \
+                     observer records, unless blocking callbacks are run in executors.
+        """
+        self.seed: int | None = seed
+        """Seed of the deterministic mode"""
+        self.random: random.Random = random.Random(seed)
+        """Random number generator used by the PTs and policies of the net"""
+        self.TIME_STEP: float = 1e-6
+        """Virtual duration of an event loop iteration in the deterministic mode"""
         self._LOOP_DELAY: float = 0.5
         self.DEBUG_ENABLED: bool = False
         """if set, :py:func:`soyutnet.SoyutNet.DEBUG` will print."""
@@ -108,6 +603,13 @@ class SoyutNet(object):
         """Auto created PT registry if AUTO_REGISTER is enabled."""
         self._extra_routines: list[Coroutine[Any, Any, None]] = extra_routines
         """List of additional task functions to be run in a SoyutNet context."""
+        self.until: StopConditions | None = until
+        """Conditions stopping the run in a SoyutNet context."""
+        self.result: RunResult | None = None
+        """Result of the last run in a SoyutNet context."""
+        self.conflict_policy: ConflictPolicy | None = None
+        """Default conflict resolution policy of places. Places without a policy \
+        serve their output transitions in round-robin order if it is ``None``."""
 
         init_validator(classes=[PTCommon, Place, Transition, Arc])
         self.AUTO_REGISTER = False
@@ -195,7 +697,9 @@ class SoyutNet(object):
         if exc_type is self.Break:
             return True
         if self._reg is not None:
-            run(self._reg, extra_routines=self._extra_routines)
+            self.result = run(
+                self._reg, extra_routines=self._extra_routines, until=self.until
+            )
         else:
             self.ERROR("No net is defined to run.")
         return False
@@ -358,6 +862,10 @@ class SoyutNet(object):
         kwargs["net"] = self
         return ComparativeObserver(*args, **kwargs)
 
+    def StatisticsObserver(self, *args: Any, **kwargs: Any) -> StatisticsObserver:
+        kwargs["net"] = self
+        return StatisticsObserver(*args, **kwargs)
+
     def TokenRegistry(self, *args: Any, **kwargs: Any) -> TokenRegistry:
         kwargs["net"] = self
         return TokenRegistry(*args, **kwargs)
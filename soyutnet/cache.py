@@ -0,0 +1,295 @@
+import os
+import pickle
+import random
+import hashlib
+import tempfile
+from typing_extensions import (
+    Any,
+    Coroutine,
+    Tuple,
+)
+
+from .constants import *
+from .pt_common import PTCommon
+from .place import SpecialPlace
+from .transition import Transition
+from .observer import Observer
+from .registry import PTRegistry
+from .control import StopConditions, RunResult
+from .distributed import (
+    PTStateType,
+    get_arc_tokens,
+    get_pt_state,
+    get_rotation,
+    get_sampling_state,
+    set_pt_state,
+)
+
+CACHE_FORMAT_VERSION: int = 4
+"""Changes when the stored data or the hashed net description changes"""
+
+_CachedEntryType = Tuple[list[PTStateType], list[Any], RunResult]
+"""Final state of each registered PT, states of the random number generators and the run result"""
+
+
+def _get_rngs(registry: PTRegistry) -> list[random.Random]:
+    """
+    Collects the random number generators used by a run of the net.
+
+    :param registry: Registry of the net.
+    :return: Random number generator of the net and of each conflict policy having one.
+    """
+    net: Any = registry.net
+    rngs: list[random.Random] = [net.random]
+    policies: list[Any] = [net.conflict_policy] + [
+        obj._conflict_policy
+        for _, obj in registry.entries()
+        if isinstance(obj, PTCommon)
+    ]
+    for policy in policies:
+        rng: Any = getattr(policy, "_rng", None)
+        if rng is not None and not any(rng is other for other in rngs):
+            rngs.append(rng)
+
+    return rngs
+
+
+def _describe_pt(pt: PTCommon) -> Tuple[Any, ...] | None:
+    """
+    Describes the structure and the state of a PT which a run continues from,
+    including the tokens waiting in its output arcs and its history which is
+    restored from the cache.
+
+    :param pt: PT.
+    :return: Description or ``None`` if the PT runs custom callbacks.
+    """
+    if pt._processor is not None or pt._blocking_processor is not None:
+        return None
+    if isinstance(pt, SpecialPlace) and (
+        pt._consumer
+        or pt._blocking_consumer
+        or pt._batch_consumer
+        or pt._blocking_batch_consumer
+        or pt._producer
+        or pt._blocking_producer
+        or pt._source
+        or pt._source_iterator
+    ):
+        return None
+    if isinstance(pt, Transition) and pt._event_log is not None:
+        return None
+    observer: Tuple[Any, ...] = ()
+    if pt._observer is not None:
+        if type(pt._observer) is not Observer:
+            return None
+        observer = (
+            "Observer",
+            pt._observer._record_limit,
+            pt._observer._sample_every,
+            pt._observer._sample_period,
+            pt._observer._change_threshold,
+            get_sampling_state(pt._observer),
+            sorted(pt._observer._token_counters.items()),
+            pt._observer._records,
+        )
+    policy: Any = pt._conflict_policy
+    arcs: list[Tuple[Any, ...]] = []
+    for arc in pt._output_arcs:
+        end: Any = arc.end
+        arcs.append((end._id if end is not None else None, arc.weight, arc._labels))
+    extra: Tuple[Any, ...] = ()
+    if isinstance(pt, Transition):
+        extra = (
+            pt._priority,
+            pt._conflict_weight,
+            pt._record_firing,
+            pt._no_of_times_enabled,
+            tuple(pt._firing_records),
+        )
+
+    return (
+        type(pt).__name__,
+        pt._id,
+        pt._name,
+        sorted(pt._tokens.items()),
+        arcs,
+        get_arc_tokens(pt),
+        get_rotation(pt),
+        observer,
+        type(policy).__name__ if policy is not None else None,
+        extra,
+    )
+
+
+class ResultCache(object):
+    """
+    Content addressed disk cache of the results of deterministic runs.
+
+    Runs of nets without a seed, with custom callbacks (processors, consumers,
+    producers, extra routines, marking predicates or hooks), or with observers
+    other than :py:class:`soyutnet.observer.Observer` are not cached.
+
+    Each entry is a file named by the hash of the net and run parameters. Files
+    are written to a temporary file first and renamed, so concurrent processes
+    never read a partial entry. The least recently used entries are deleted
+    when the total size exceeds the limit.
+
+    A hit restores the final state of the PTs, the states of the random number
+    generators of the net and its conflict policies, and the rotations of the
+    arcs, so later runs continue exactly as after a simulated run.
+
+    Entries are pickled, so the directory must only be writable by trusted users.
+    """
+
+    def __init__(self, directory: str, max_size: int = 256 * 1024 * 1024) -> None:
+        """
+        Constructor.
+
+        :param directory: Cache directory. It is created if it does not exist.
+        :param max_size: Maximum total size of the entries in bytes.
+        """
+        self._directory: str = directory
+        """Cache directory"""
+        self._max_size: int = max_size
+        """Maximum total size of the entries in bytes"""
+        os.makedirs(directory, exist_ok=True)
+
+    def key(
+        self,
+        registry: PTRegistry,
+        until: StopConditions | None = None,
+        extra_routines: list[Coroutine[Any, Any, None]] = [],
+    ) -> str | None:
+        """
+        Hashes the net in the registry and the run parameters.
+
+        :param registry: Registry of the net.
+        :param until: Stop conditions.
+        :param extra_routines: Additional task functions.
+        :return: Hex digest or ``None`` if the run can not be cached.
+        """
+        net: Any = registry.net
+        if net.seed is None or extra_routines:
+            return None
+        conditions: Tuple[Any, ...] = ()
+        if until is not None:
+            if until.marking is not None or until.on_quiescence is not None:
+                return None
+            conditions = (
+                until.max_firings,
+                sorted(until.transition_firings.items()),
+                until.max_time,
+                until.quiescence,
+            )
+        policy: Any = net.conflict_policy
+        digest: Any = hashlib.blake2b(digest_size=20)
+        digest.update(
+            repr(
+                (
+                    CACHE_FORMAT_VERSION,
+                    net.seed,
+                    net.random.getstate(),
+                    net.TIME_STEP,
+                    net.LOOP_DELAY,
+                    type(policy).__name__ if policy is not None else None,
+                    [rng.getstate() for rng in _get_rngs(registry)],
+                    conditions,
+                )
+            ).encode()
+        )
+        for _, obj in registry.entries():
+            if not isinstance(obj, PTCommon):
+                continue
+            description: Tuple[Any, ...] | None = _describe_pt(obj)
+            if description is None:
+                return None
+            digest.update(repr(description).encode())
+
+        return str(digest.hexdigest())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f"{key}.pkl")
+
+    def load(self, registry: PTRegistry, key: str) -> RunResult | None:
+        """
+        Restores the final state of the PTs from the cache.
+
+        :param registry: Registry of the net.
+        :param key: See :py:func:`soyutnet.cache.ResultCache.key`.
+        :return: Cached result or ``None`` if there is no entry.
+        """
+        path: str = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                entry: _CachedEntryType = pickle.load(fh)
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        states, rng_states, result = entry
+        pts: list[PTCommon] = [
+            obj for _, obj in registry.entries() if isinstance(obj, PTCommon)
+        ]
+        rngs: list[random.Random] = _get_rngs(registry)
+        if len(pts) != len(states) or len(rngs) != len(rng_states):
+            return None
+        for pt, state in zip(pts, states):
+            set_pt_state(pt, state)
+        for rng, rng_state in zip(rngs, rng_states):
+            rng.setstate(rng_state)
+
+        return result
+
+    def store(self, registry: PTRegistry, key: str, result: RunResult) -> None:
+        """
+        Saves the final state of the PTs and the result.
+
+        :param registry: Registry of the net.
+        :param key: See :py:func:`soyutnet.cache.ResultCache.key`.
+        :param result: Result of the run.
+        """
+        pts: list[PTCommon] = [
+            obj for _, obj in registry.entries() if isinstance(obj, PTCommon)
+        ]
+        entry: _CachedEntryType = (
+            [get_pt_state(pt) for pt in pts],
+            [rng.getstate() for rng in _get_rngs(registry)],
+            result,
+        )
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Deletes the least recently used entries until the total size is below the limit.
+        """
+        entries: list[Tuple[float, int, str]] = []
+        total: int = 0
+        with os.scandir(self._directory) as it:
+            for e in it:
+                if not e.name.endswith(".pkl"):
+                    continue
+                try:
+                    stat: os.stat_result = e.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, e.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,91 @@
+import asyncio
+import selectors
+from typing_extensions import (
+    Any,
+    Coroutine,
+    TypeVar,
+)
+
+from .constants import *
+
+T = TypeVar("T")
+
+
+class _VirtualClockSelector(selectors.DefaultSelector):
+    """
+    Selector advancing the virtual time of :py:class:`soyutnet.clock.VirtualClockEventLoop`
+    instead of blocking.
+    """
+
+    def __init__(self, time_step: float) -> None:
+        super().__init__()
+        self.now: float = 0.0
+        """Virtual time"""
+        self._time_step: float = time_step
+        """Virtual duration of an event loop iteration"""
+
+    def select(self, timeout: float | None = None) -> Any:
+        events: Any = super().select(0)
+        if timeout is None and not events:
+            """Nothing is scheduled, only an external event can wake up the loop."""
+            events = super().select(None)
+        if events or timeout is None or timeout <= self._time_step:
+            self.now += self._time_step
+        else:
+            """Jumps to the next scheduled callback."""
+            self.now += timeout
+
+        return events
+
+
+class VirtualClockEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop with a virtual clock.
+
+    Each iteration of the event loop advances the clock by a fixed time step. If no
+    callback is ready, the clock jumps to the next scheduled one without waiting.
+    Since the busy polling PT loops, ``asyncio.sleep`` calls and timers are
+    then ordered only by the event loop iterations, a run does not depend on the
+    speed of the machine, and same inputs produce bit-identical timestamps.
+
+    Callbacks completed by other threads, e.g. executors, are not deterministic.
+    """
+
+    def __init__(self, time_step: float = 1e-6) -> None:
+        """
+        Constructor.
+
+        :param time_step: Virtual duration of an event loop iteration in seconds.
+        """
+        self._virtual_selector: _VirtualClockSelector = _VirtualClockSelector(time_step)
+        """Selector keeping the virtual time"""
+        super().__init__(selector=self._virtual_selector)
+
+    def time(self) -> float:
+        return self._virtual_selector.now
+
+
+def run_with_virtual_clock(coro: Coroutine[Any, Any, T], time_step: float = 1e-6) -> T:
+    """
+    Runs a coroutine in a new :py:class:`soyutnet.clock.VirtualClockEventLoop` like
+    ``asyncio.run`` does.
+
+    :param coro: Coroutine.
+    :param time_step: See :py:class:`soyutnet.clock.VirtualClockEventLoop`.
+    :return: Result of the coroutine.
+    """
+    loop: VirtualClockEventLoop = VirtualClockEventLoop(time_step)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            tasks: set[asyncio.Task[Any]] = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
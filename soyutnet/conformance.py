@@ -0,0 +1,340 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing_extensions import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Sequence,
+    Tuple,
+)
+
+from .constants import *
+from .pt_common import PTCommon, Arc
+from .registry import PTRegistry
+
+EventType = str | Sequence[Any]
+"""Transition name, or a sequence whose first item is the transition name, e.g. \
+``(name, timestamp, tokens)``. The other items are ignored."""
+CaseType = Tuple[Any, Sequence[EventType]]
+"""Case identifier and its events"""
+
+_ArcSpecType = Tuple[int, Tuple[label_t, ...], int]
+"""Place index, arc labels and arc weight"""
+_MarkingType = Dict[Tuple[int, label_t], int]
+"""Number of tokens with a label in a place given by its index"""
+
+
+@dataclass
+class CaseReplay:
+    """
+    Token replay result of a case.
+    """
+
+    case: Any = None
+    """Case identifier"""
+    produced: int = 0
+    """Number of produced tokens, including the initial marking"""
+    consumed: int = 0
+    """Number of consumed tokens, including the final marking"""
+    missing: int = 0
+    """Number of tokens created artificially to fire transitions or to reach the final marking"""
+    remaining: int = 0
+    """Number of tokens left after the final marking is consumed"""
+    first_deviation: Tuple[int, str] | None = None
+    """Index and name of the first event whose transition lacked tokens or is not in the net"""
+
+    @property
+    def fitness(self) -> float:
+        return _get_fitness(self.produced, self.consumed, self.missing, self.remaining)
+
+
+@dataclass
+class ConformanceResult:
+    """
+    Token replay result of an event log.
+    """
+
+    cases: list[CaseReplay] = field(default_factory=list)
+    """Result of each case in the order of the log"""
+    produced: int = 0
+    """Total number of produced tokens"""
+    consumed: int = 0
+    """Total number of consumed tokens"""
+    missing: int = 0
+    """Total number of missing tokens"""
+    remaining: int = 0
+    """Total number of remaining tokens"""
+
+    @property
+    def fitness(self) -> float:
+        return _get_fitness(self.produced, self.consumed, self.missing, self.remaining)
+
+    @property
+    def fitting_cases(self) -> int:
+        return sum(
+            1 for case in self.cases if case.missing == 0 and case.remaining == 0
+        )
+
+
+def _get_fitness(produced: int, consumed: int, missing: int, remaining: int) -> float:
+    """
+    Token based fitness: ``(1 - m/c)/2 + (1 - r/p)/2``.
+    """
+    return 0.5 * (1.0 - missing / consumed if consumed else 1.0) + 0.5 * (
+        1.0 - remaining / produced if produced else 1.0
+    )
+
+
+class _ReplayNet(object):
+    """
+    Picklable structure of a net replayed on a synchronous marking.
+    """
+
+    def __init__(
+        self,
+        initial: _MarkingType,
+        final: _MarkingType | None,
+        transitions: Dict[str, Tuple[list[_ArcSpecType], list[_ArcSpecType]]],
+    ) -> None:
+        self.initial: _MarkingType = initial
+        self.final: _MarkingType | None = final
+        self.transitions: Dict[str, Tuple[list[_ArcSpecType], list[_ArcSpecType]]] = (
+            transitions
+        )
+
+    def replay(self, case: Any, events: Sequence[EventType]) -> CaseReplay:
+        """
+        Replays the events of a case.
+
+        :param case: Case identifier.
+        :param events: Events.
+        :return: Result.
+        """
+        result: CaseReplay = CaseReplay(case=case)
+        marking: _MarkingType = dict(self.initial)
+        result.produced = sum(marking.values())
+        for i, event in enumerate(events):
+            name: str = event if isinstance(event, str) else event[0]
+            spec: Tuple[list[_ArcSpecType], list[_ArcSpecType]] | None = (
+                self.transitions.get(name)
+            )
+            if spec is None:
+                if result.first_deviation is None:
+                    result.first_deviation = (i, name)
+                continue
+            inputs, outputs = spec
+            wallet: Dict[label_t, int] = {}
+            lacking: int = 0
+            for place, labels, weight in inputs:
+                need: int = weight
+                for label in labels:
+                    key: Tuple[int, label_t] = (place, label)
+                    take: int = min(marking.get(key, 0), need)
+                    if take:
+                        marking[key] -= take
+                        wallet[label] = wallet.get(label, 0) + take
+                        need -= take
+                        if not need:
+                            break
+                if need:
+                    lacking += need
+                    wallet[labels[0]] = wallet.get(labels[0], 0) + need
+                result.consumed += weight
+            if lacking:
+                result.missing += lacking
+                if result.first_deviation is None:
+                    result.first_deviation = (i, name)
+            for place, labels, weight in outputs:
+                need = weight
+                for label in labels:
+                    take = min(wallet.get(label, 0), need)
+                    if take:
+                        wallet[label] -= take
+                        key = (place, label)
+                        marking[key] = marking.get(key, 0) + take
+                        need -= take
+                        if not need:
+                            break
+                if need:
+                    key = (place, labels[0])
+                    marking[key] = marking.get(key, 0) + need
+                result.produced += weight
+
+        final: _MarkingType = self.final or {}
+        for key in marking.keys() | final.keys():
+            count: int = marking.get(key, 0)
+            expected: int = final.get(key, 0)
+            result.consumed += expected
+            result.missing += max(0, expected - count)
+            result.remaining += max(0, count - expected)
+
+        return result
+
+
+_worker_net: _ReplayNet | None = None
+"""Net replayed by the process pool workers"""
+
+
+def _init_worker(net: _ReplayNet) -> None:
+    global _worker_net
+    _worker_net = net
+
+
+def _replay_chunk(cases: list[CaseType]) -> list[CaseReplay]:
+    net: Any = _worker_net
+    return [net.replay(case, events) for case, events in cases]
+
+
+def _chunks(cases: Iterable[CaseType], size: int) -> Iterator[list[CaseType]]:
+    chunk: list[CaseType] = []
+    for case in cases:
+        chunk.append(case)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class TokenReplayer(object):
+    """
+    Checks the conformance of event logs to a net by token replay.
+
+    The structure and the current marking of the net are copied to plain
+    dictionaries when the replayer is created, and each case is replayed by
+    firing its transitions on a copy of the marking without the asyncio loops.
+    A transition lacking tokens fires anyway, the lacking tokens are counted
+    as missing. Tokens are counted for each place and label, token IDs are not
+    tracked. Transitions are identified by their names, which must be unique.
+
+    .. code:: python
+
+        replayer = TokenReplayer(reg, final_marking={"done": 1})
+        result = replayer.replay([("case1", ["t1", "t2"]), ("case2", ["t2"])])
+        print(result.fitness, result.cases[1].first_deviation)
+    """
+
+    def __init__(
+        self, registry: PTRegistry, final_marking: Dict[str, int] | None = None
+    ) -> None:
+        """
+        Constructor.
+
+        :param registry: Registry of the net.
+        :param final_marking: Number of tokens expected in the places given by their \
+                              names when a case completes. Tokens are counted with the \
+                              first label of the input arcs of the place. All \
+                              tokens left are counted as remaining if it is ``None``.
+        """
+        pts: list[PTCommon] = [
+            obj for _, obj in registry.entries() if isinstance(obj, PTCommon)
+        ]
+        places: Dict[int, int] = {}
+        names: Dict[str, int] = {}
+        initial: _MarkingType = {}
+        transitions: Dict[str, Tuple[list[_ArcSpecType], list[_ArcSpecType]]] = {}
+        for pt in pts:
+            if pt._is_transition():
+                continue
+            index: int = len(places)
+            places[id(pt)] = index
+            names[pt._name] = index
+            for label, ids in pt._tokens.items():
+                if ids:
+                    initial[(index, label)] = len(ids)
+
+        def spec(arc: Arc, place: Any) -> _ArcSpecType:
+            if id(place) not in places:
+                raise SoyutNetError(f"{place.ident()} is not registered")
+            return (places[id(place)], tuple(arc._labels), arc.weight)
+
+        for pt in pts:
+            if not pt._is_transition():
+                continue
+            if pt._name in transitions:
+                raise SoyutNetError(f"Transition name '{pt._name}' is not unique")
+            transitions[pt._name] = (
+                [spec(arc, arc.start) for arc in pt._input_arcs],
+                [spec(arc, arc.end) for arc in pt._output_arcs],
+            )
+
+        final: _MarkingType | None = None
+        if final_marking is not None:
+            final = {}
+            for name, count in final_marking.items():
+                if name not in names:
+                    raise SoyutNetError(f"Place '{name}' is not registered")
+                index = names[name]
+                first_label: label_t = next(
+                    (
+                        s[1][0]
+                        for _, outputs in transitions.values()
+                        for s in outputs
+                        if s[0] == index
+                    ),
+                    GENERIC_LABEL,
+                )
+                final[(index, first_label)] = count
+
+        self._net: _ReplayNet = _ReplayNet(initial, final, transitions)
+        """Net structure and the initial marking"""
+
+    def replay_case(self, case: Any, events: Sequence[EventType]) -> CaseReplay:
+        """
+        Replays a case.
+
+        :param case: Case identifier.
+        :param events: Events.
+        :return: Result.
+        """
+        return self._net.replay(case, events)
+
+    def replay(
+        self,
+        cases: Iterable[CaseType],
+        processes: int | None = None,
+        chunk_size: int = 1000,
+    ) -> ConformanceResult:
+        """
+        Replays the cases of an event log.
+
+        :param cases: Case identifiers and their events.
+        :param processes: Number of worker processes. The number of CPUs is used \
+                          if it is ``None``. Cases are replayed in the calling \
+                          process if it is ``1``.
+        :param chunk_size: Number of cases sent to a worker process at once. \
+                           At most two chunks for each worker are read from \
+                           ``cases`` before their results are collected, so long \
+                           logs can be streamed.
+        :return: Results of the cases and their totals.
+        """
+        output: ConformanceResult = ConformanceResult()
+        workers: int = processes or os.cpu_count() or 1
+        if workers == 1:
+            output.cases = [self._net.replay(case, events) for case, events in cases]
+        else:
+            window: int = 2 * workers
+            in_flight: Deque[Future[list[CaseReplay]]] = deque()
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self._net,),
+            ) as executor:
+                for chunk in _chunks(cases, max(1, chunk_size)):
+                    if len(in_flight) >= window:
+                        output.cases += in_flight.popleft().result()
+                    in_flight.append(executor.submit(_replay_chunk, chunk))
+                while in_flight:
+                    output.cases += in_flight.popleft().result()
+
+        for result in output.cases:
+            output.produced += result.produced
+            output.consumed += result.consumed
+            output.missing += result.missing
+            output.remaining += result.remaining
+
+        return output
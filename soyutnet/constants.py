@@ -32,18 +32,21 @@ GENERIC_ID: id_t = 0
 """Generic ID"""
 INITIAL_ID: id_t = 0
 
+_IDENTIFIER_CHARS: str = string.ascii_uppercase + string.digits
 
-def random_identifier(N: int = 5) -> str:
+
+def random_identifier(N: int = 5, rng: random.Random | None = None) -> str:
     """
     Generates a random string.
 
     :param N: Length of random string
+    :param rng: Random number generator. The operating system's randomness source \
+                is used if it is ``None``.
     :return: Random string
     """
-    return "".join(
-        random.SystemRandom().choice(string.ascii_uppercase + string.digits)
-        for _ in range(N)
-    )
+    if rng is not None:
+        return "".join(rng.choices(_IDENTIFIER_CHARS, k=N))
+    return "".join(random.SystemRandom().choice(_IDENTIFIER_CHARS) for _ in range(N))
 
 
 class BaseObject(object):
@@ -54,7 +57,9 @@ class BaseObject(object):
     def __init__(self, net: "SoyutNet") -> None:
         self._net: ReferenceType["SoyutNet"] = weakref.ref(net)
         """Reference to the creator SoyutNet instance."""
-        self._ident0: str = random_identifier()
+        self._ident0: str = random_identifier(
+            rng=net.random if net.seed is not None else None
+        )
 
     def __repr__(self) -> str:
         return f"<{type(self)}, ident={self.ident()}>"
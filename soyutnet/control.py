@@ -0,0 +1,335 @@
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing_extensions import (
+    Any,
+    Callable,
+    Dict,
+    Sequence,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from .constants import *
+
+if TYPE_CHECKING:
+    from .place import Place
+    from .pt_common import PTCommon
+else:
+    Place = Any
+    PTCommon = Any
+
+
+MarkingPredicateType = Callable[[Place], bool]
+"""Called with a place whose marking changed. The run stops when it returns ``True``."""
+
+
+@dataclass
+class QuiescenceReport:
+    """
+    State of a quiescent net.
+    """
+
+    time: float = 0.0
+    """Detection time. See :py:func:`soyutnet.SoyutNet.time`"""
+    tokens: Dict[str, int] = field(default_factory=dict)
+    """Number of tokens held by each place which has any, including the ones \
+    waiting in its output arcs"""
+    missing: list[Tuple[str, int]] = field(default_factory=list)
+    """Number of tokens each transition requires to be enabled, sorted in \
+    ascending order, so the transitions closest to enabled come first"""
+
+
+QuiescenceHookType = Callable[[QuiescenceReport], None]
+"""Called when the net becomes quiescent"""
+
+
+class StopConditions(object):
+    """
+    Conditions ending a simulation run. The run stops when any of them holds.
+
+    They are checked by the PTs when a transition fires or the marking of a place
+    changes, so no polling task is required and no transition fires after the
+    run is requested to stop.
+    """
+
+    def __init__(
+        self,
+        max_firings: int = 0,
+        transition_firings: Dict[str, int] = {},
+        max_time: float = 0.0,
+        marking: MarkingPredicateType | None = None,
+        quiescence: bool = False,
+        on_quiescence: QuiescenceHookType | None = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param max_firings: Total number of firings of all transitions. It is unlimited if chosen ``0``.
+        :param transition_firings: Number of firings of transitions given by their names.
+        :param max_time: Duration of the run in seconds measured by :py:func:`soyutnet.SoyutNet.time`. \
+                         It is unlimited if chosen ``0``.
+        :param marking: Marking predicate. See :py:attr:`soyutnet.control.MarkingPredicateType`.
+        :param quiescence: Stops when no PT makes progress, e.g. no transition is enabled, \
+                           no token can be moved and no executor callback is pending.
+        :param on_quiescence: Called each time the net becomes quiescent. The hook can add \
+                              tokens to resume the run if ``quiescence`` is ``False``.
+        """
+        self.max_firings: int = max_firings
+        """Total number of firings"""
+        self.transition_firings: Dict[str, int] = dict(transition_firings)
+        """Number of firings of each transition"""
+        self.max_time: float = max_time
+        """Duration of the run in seconds"""
+        self.marking: MarkingPredicateType | None = marking
+        """Marking predicate"""
+        self.quiescence: bool = quiescence
+        """Stops when the net is quiescent"""
+        self.on_quiescence: QuiescenceHookType | None = on_quiescence
+        """Quiescence hook"""
+
+
+class RunControl(object):
+    """
+    Cooperative stop request shared by the tasks of a simulation run.
+
+    PT loops check :py:attr:`soyutnet.control.RunControl.stopped` before each
+    iteration and end after completing the current one, so no PT is interrupted
+    in the middle of a firing.
+    """
+
+    def __init__(self, conditions: StopConditions | None = None) -> None:
+        """
+        Constructor.
+
+        :param conditions: Conditions stopping the run.
+        """
+        self._stopped: bool = False
+        """Set when the run is requested to stop"""
+        self.reason: str = ""
+        """The reason of the stop request"""
+        self._event: asyncio.Event = asyncio.Event()
+        """Wakes up the task waiting for the stop request"""
+        self._conditions: StopConditions = (
+            StopConditions() if conditions is None else conditions
+        )
+        """Conditions stopping the run"""
+        self.activity: int = 0
+        """Incremented when tokens move or transitions fire"""
+        self._firings: int = 0
+        """Number of firings in the run"""
+        self._transition_firings: Dict[str, int] = {}
+        """Number of firings of each transition with a firing limit"""
+        self._pts: Sequence[PTCommon] = []
+        """PTs whose loops are run"""
+        self._loop: asyncio.AbstractEventLoop | None = None
+        """Event loop running the simulation"""
+        self._idle: Set[int] = set()
+        """PTs completed an iteration without progress since the last activity"""
+        self._parked: Set[int] = set()
+        """PTs waiting to send a token to a full arc"""
+        self._idle_activity: int = -1
+        """:py:attr:`soyutnet.control.RunControl.activity` when the idle PTs are counted"""
+        self._timer: asyncio.TimerHandle | None = None
+        """Stops the run after the time limit"""
+        self._reported_activity: int = -1
+        """:py:attr:`soyutnet.control.RunControl.activity` when the last quiescence is reported"""
+        self.report: QuiescenceReport | None = None
+        """The last quiescence report"""
+        self.enabled: Set[PTCommon] = set()
+        """Transitions whose counted input arcs are all full. Transitions check \
+        their membership instead of their input arcs in every loop iteration."""
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def detects_quiescence(self) -> bool:
+        return self._conditions.quiescence or self._conditions.on_quiescence is not None
+
+    def stop(self, reason: str = "terminate") -> None:
+        """
+        Requests the run to stop. It must be called from the event loop running
+        the simulation.
+
+        :param reason: The reason of the stop request. Only the first one is kept.
+        """
+        if not self._stopped:
+            self.reason = reason
+        self._stopped = True
+        self._event.set()
+
+    def start(self, loop: asyncio.AbstractEventLoop, pts: Sequence[PTCommon]) -> None:
+        """
+        Called when the PT loops of the run are started.
+
+        :param loop: Event loop running the simulation.
+        :param pts: PTs whose loops are run.
+        """
+        self._loop = loop
+        self._pts = pts
+        if self._conditions.max_time > 0:
+            self._timer = loop.call_later(
+                self._conditions.max_time, self.stop, "max_time"
+            )
+
+    def close(self) -> None:
+        """
+        Called when the run ends.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def fired(self, name: str) -> None:
+        """
+        Called by transitions when they fire.
+
+        :param name: Name of the transition.
+        """
+        self.activity += 1
+        self._firings += 1
+        conditions: StopConditions = self._conditions
+        if 0 < conditions.max_firings <= self._firings:
+            self.stop("max_firings")
+        if (limit := conditions.transition_firings.get(name)) is not None:
+            count: int = self._transition_firings.get(name, 0) + 1
+            self._transition_firings[name] = count
+            if count >= limit:
+                self.stop("transition_firings")
+
+    def marking_changed(self, place: Place) -> None:
+        """
+        Called by places when they acquire or release tokens.
+
+        :param place: Place.
+        """
+        self.activity += 1
+        predicate: MarkingPredicateType | None = self._conditions.marking
+        if predicate is not None and not self._stopped and predicate(place):
+            self.stop("marking")
+
+    def iteration_done(self, pt: PTCommon, activity: int) -> None:
+        """
+        Called by PT loops after each iteration when quiescence is detected.
+
+        The net is quiescent when each PT completes an iteration without any
+        activity in the net and without pending executor callbacks. It costs
+        a comparison and a set insertion per iteration, the arcs are not scanned.
+
+        :param pt: PT.
+        :param activity: :py:attr:`soyutnet.control.RunControl.activity` at the \
+                         start of the iteration.
+        """
+        if activity != self.activity or pt._has_pending_work():
+            return
+        self._set_idle(pt)
+
+    def park(self, pt: PTCommon) -> None:
+        """
+        Called when a PT waits to send a token to a full arc. The PT does not
+        complete its iteration until the arc is drained, so it counts as idle.
+
+        :param pt: PT.
+        """
+        self._parked.add(id(pt))
+        if self.detects_quiescence:
+            self._set_idle(pt)
+
+    def unpark(self, pt: PTCommon) -> None:
+        """
+        Called when a PT parked by :py:func:`soyutnet.control.RunControl.park`
+        stops waiting.
+
+        :param pt: PT.
+        """
+        self._parked.discard(id(pt))
+        self._idle.discard(id(pt))
+
+    def _set_idle(self, pt: PTCommon) -> None:
+        activity: int = self.activity
+        if self._idle_activity != activity:
+            self._idle = set(self._parked)
+            self._idle_activity = activity
+        self._idle.add(id(pt))
+        if len(self._idle) < len(self._pts) or self._reported_activity == activity:
+            return
+
+        self._reported_activity = activity
+        self.report = self._get_report()
+        if self._conditions.on_quiescence is not None:
+            self._conditions.on_quiescence(self.report)
+        if self._conditions.quiescence:
+            self.stop("quiescence")
+
+    def _get_report(self) -> QuiescenceReport:
+        report: QuiescenceReport = QuiescenceReport(
+            time=self._loop.time() if self._loop is not None else 0.0
+        )
+        for pt in self._pts:
+            if pt._is_transition():
+                missing: int = sum(
+                    arc.weight - arc._queue.qsize() for arc in pt._input_arcs
+                )
+                if pt._input_arcs:
+                    report.missing.append((pt._name, missing))
+                continue
+            count: int = sum(len(ids) for ids in pt._tokens.values())
+            count += sum(arc._queue.qsize() for arc in pt._output_arcs)
+            if count > 0:
+                report.tokens[pt._name] = count
+        report.missing.sort(key=lambda entry: entry[1])
+
+        return report
+
+    async def wait(self) -> None:
+        """
+        Waits until the run is requested to stop.
+        """
+        await self._event.wait()
+
+
+@dataclass
+class RunResult:
+    """
+    Summary of a completed simulation run.
+
+    PTs are keyed by their names, so PTs sharing a name are reported once.
+    """
+
+    markings: Dict[str, TokenWalletType] = field(default_factory=dict)
+    """Final tokens of each place"""
+    held: Dict[str, TokenWalletType] = field(default_factory=dict)
+    """Tokens acquired by each transition and not yet sent to its output arcs. \
+    A stopped run can leave tokens in transitions."""
+    arc_tokens: Dict[str, TokenWalletType] = field(default_factory=dict)
+    """Tokens waiting in each arc, keyed by ``"<start name>-><end name>"``. \
+    Together with :py:attr:`soyutnet.control.RunResult.markings` and \
+    :py:attr:`soyutnet.control.RunResult.held`, they are all tokens of the net."""
+    firing_counts: Dict[str, int] = field(default_factory=dict)
+    """Number of times each transition fired"""
+    elapsed: float = 0.0
+    """Duration of the run in seconds"""
+    stopped: bool = False
+    """``True`` if the run ended by :py:func:`soyutnet.terminate` or a stop condition"""
+    reason: str = ""
+    """The reason of the stop. See :py:attr:`soyutnet.control.RunControl.reason`"""
+    quiescence: QuiescenceReport | None = None
+    """The last quiescence report if quiescence is detected"""
+
+
+_current_control: ContextVar[RunControl | None] = ContextVar(
+    "soyutnet_run_control", default=None
+)
+"""Control of the run which the current task belongs to"""
+
+
+def current_control() -> RunControl | None:
+    """
+    Returns the control of the simulation run which the calling task belongs to.
+
+    :return: Run control or ``None`` if it is called outside of a run.
+    """
+    return _current_control.get()
@@ -0,0 +1,345 @@
+import asyncio
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from typing_extensions import (
+    Any,
+    Dict,
+    Tuple,
+)
+
+from .constants import *
+from .pt_common import PTCommon, Arc
+from .transition import Transition
+from .observer import Observer, StatisticsObserver
+from .partition import ChannelQueue, ChannelArc
+
+PTStateType = Dict[str, Any]
+"""Simulation state of a PT sent from a worker process to the parent"""
+
+
+class SharedRingBuffer(object):
+    """
+    Single producer, single consumer ring buffer of integer pairs in shared memory.
+
+    The buffer starts with two counters, the number of pushed and popped pairs.
+    Only the producer writes the first and only the consumer writes the second.
+    Each push and pop holds a lock shared between processes, which makes the slot
+    writes visible before the counter updates. Plain stores to shared memory are
+    not ordered on weakly ordered CPUs, e.g. ARM.
+
+    The buffer must be created before the processes using it are forked.
+    """
+
+    _HEADER_SIZE: int = 2
+    """Number of 64-bit integers before the slots"""
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Constructor.
+
+        :param capacity: Maximum number of pairs in the buffer.
+        """
+        self._capacity: int = capacity
+        """Maximum number of pairs in the buffer"""
+        self._shm: SharedMemory = SharedMemory(
+            create=True, size=8 * (self._HEADER_SIZE + 2 * capacity)
+        )
+        """Shared memory block"""
+        buf: memoryview | None = self._shm.buf
+        if buf is None:
+            raise SoyutNetError("Shared memory block is not mapped")
+        self._data: memoryview = buf.cast("q")
+        """Shared memory block as 64-bit integers"""
+        self._data[0] = 0
+        self._data[1] = 0
+        self._lock: Any = multiprocessing.Lock()
+        """Orders the accesses of the producer and the consumer"""
+
+    def __len__(self) -> int:
+        return int(self._data[0] - self._data[1])
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def push(self, first: int, second: int) -> bool:
+        """
+        Appends a pair to the buffer.
+
+        :param first: First integer.
+        :param second: Second integer.
+        :return: ``False`` if the buffer is full.
+        """
+        data: memoryview = self._data
+        with self._lock:
+            head: int = data[0]
+            if head - data[1] >= self._capacity:
+                return False
+            i: int = self._HEADER_SIZE + 2 * (head % self._capacity)
+            data[i] = first
+            data[i + 1] = second
+            data[0] = head + 1
+        return True
+
+    def pop(self) -> Tuple[int, int] | None:
+        """
+        Removes the oldest pair from the buffer.
+
+        :return: The pair or ``None`` if the buffer is empty.
+        """
+        data: memoryview = self._data
+        with self._lock:
+            tail: int = data[1]
+            if data[0] == tail:
+                return None
+            i: int = self._HEADER_SIZE + 2 * (tail % self._capacity)
+            pair: Tuple[int, int] = (data[i], data[i + 1])
+            data[1] = tail + 1
+        return pair
+
+    def close(self) -> None:
+        """
+        Releases and removes the shared memory block. It must be called only
+        by the process that created the buffer.
+        """
+        self._data.release()
+        self._shm.close()
+        self._shm.unlink()
+
+
+class SharedMemoryQueue(ChannelQueue):
+    """
+    Arc queue transmitting tokens between processes over a :py:class:`soyutnet.distributed.SharedRingBuffer`.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Constructor.
+
+        :param maxsize: Capacity of the channel. It is the weight of the arc.
+        """
+        super().__init__(maxsize=maxsize)
+        self._ring: SharedRingBuffer = SharedRingBuffer(maxsize)
+        """Shared token buffer"""
+
+    def qsize(self) -> int:
+        return len(self._ring)
+
+    def empty(self) -> bool:
+        return len(self._ring) == 0
+
+    def full(self) -> bool:
+        return len(self._ring) >= self.maxsize
+
+    def put_nowait(self, item: Any) -> None:
+        if not self._ring.push(item[0], item[1]):
+            raise asyncio.QueueFull
+
+    def get_nowait(self) -> Any:
+        token: Tuple[int, int] | None = self._ring.pop()
+        if token is None:
+            raise asyncio.QueueEmpty
+        return token
+
+
+class ProcessChannelArc(ChannelArc):
+    """
+    Replaces an arc whose start and end PTs are run in different processes.
+
+    Observer updates of the start place requested by the end transition are sent
+    back over a second ring buffer and applied by the process running the start
+    place in :py:func:`soyutnet.distributed.ProcessChannelArc.apply_feedback`.
+    """
+
+    _OBSERVE: label_t = INVALID_LABEL
+    """Feedback entry requesting an observation instead of a count update"""
+
+    def __init__(self, arc: Arc) -> None:
+        """
+        Constructor.
+
+        :param arc: Replaced arc.
+        """
+        super().__init__(arc, queue=SharedMemoryQueue(maxsize=arc.weight))
+        self._feedback: SharedRingBuffer = SharedRingBuffer(4 * (arc.weight + 1))
+        """Observer updates sent from the end PT to the start PT"""
+
+    async def _send_feedback(self, first: int, second: int) -> None:
+        while not self._feedback.push(first, second):
+            await asyncio.sleep(0)
+
+    async def observe_input_places(self, requester: str = "") -> None:
+        await self._send_feedback(self._OBSERVE, 0)
+
+    async def notify_observer(self, label: label_t, increment: int = -1) -> None:
+        await self._send_feedback(label, increment)
+
+    async def apply_feedback(self) -> bool:
+        """
+        Applies the observer updates received from the end PT.
+
+        :return: ``True`` if any update is applied.
+        """
+        start_ref: Any = self.start
+        end_ref: Any = self.end
+        applied: bool = False
+        while (entry := self._feedback.pop()) is not None:
+            applied = True
+            if start_ref is None:
+                continue
+            if entry[0] == self._OBSERVE:
+                await start_ref.observe(requester=end_ref._name if end_ref else "")
+            elif start_ref._observer is not None:
+                await start_ref._observer.inc_token_count(entry[0], entry[1])
+
+        return applied
+
+    def close(self) -> None:
+        """
+        Releases the shared memory blocks. It must be called after
+        :py:func:`soyutnet.partition.ChannelArc.detach`.
+        """
+        queue: Any = self._queue
+        queue._ring.close()
+        self._feedback.close()
+
+
+def get_arc_tokens(pt: PTCommon) -> list[list[TokenType] | None]:
+    """
+    Copies the tokens waiting in the output arcs of a PT without removing them.
+
+    :param pt: PT.
+    :return: Tokens of each output arc. ``None`` for the arcs to other processes, \
+             whose tokens are moved back to the original arcs when they are detached.
+    """
+    output: list[list[TokenType] | None] = []
+    for arc in pt._output_arcs:
+        if isinstance(arc, ProcessChannelArc):
+            output.append(None)
+            continue
+        tokens: list[TokenType] = []
+        while not arc._queue.empty():
+            tokens.append(arc._queue.get_nowait())
+        for token in tokens:
+            arc._queue.put_nowait(token)
+        output.append(tokens)
+
+    return output
+
+
+def _set_arc_tokens(pt: PTCommon, arc_tokens: list[list[TokenType] | None]) -> None:
+    """
+    Replaces the tokens waiting in the output arcs of a PT.
+
+    :param pt: PT.
+    :param arc_tokens: See :py:func:`soyutnet.distributed.get_arc_tokens`.
+    """
+    for arc, tokens in zip(pt._output_arcs, arc_tokens):
+        if tokens is None:
+            continue
+        while not arc._queue.empty():
+            arc._queue.get_nowait()
+        for token in tokens:
+            arc._queue.put_nowait(token)
+
+
+def get_rotation(pt: PTCommon) -> Tuple[int, int, int, list[int]]:
+    """
+    Collects the positions where a PT and its output arcs continue iterating
+    their arcs and labels in the next loop iteration.
+
+    :param pt: PT.
+    :return: Input and output arc indices, conflict policy rotation and label \
+             index of each output arc.
+    """
+    return (
+        pt._last_processed_input_arc_index,
+        pt._last_processed_output_arc_index,
+        pt._conflict_rotation,
+        [arc._last_processed_label_index for arc in pt._output_arcs],
+    )
+
+
+def get_sampling_state(observer: Observer) -> Tuple[Any, ...]:
+    """
+    Collects the state of the sampling parameters of an observer.
+
+    :param observer: Observer.
+    :return: Number of calls, time of the next record, token counts of the last \
+             record and the pending requester.
+    """
+    return (
+        observer._save_count,
+        observer._next_sample_time,
+        observer._last_counts,
+        observer._pending_requester,
+    )
+
+
+def get_pt_state(pt: PTCommon) -> PTStateType:
+    """
+    Collects the simulation state of a PT in a worker process.
+
+    :param pt: PT.
+    :return: Tokens, tokens in the output arcs, arc rotations, observer records, \
+             statistics and firing counts.
+    """
+    state: PTStateType = {
+        "tokens": pt._tokens,
+        "arc_tokens": get_arc_tokens(pt),
+        "rotation": get_rotation(pt),
+    }
+    if pt._observer is not None:
+        state["records"] = pt._observer._records
+        state["token_counters"] = pt._observer._token_counters
+        state["sampling"] = get_sampling_state(pt._observer)
+    if isinstance(pt._observer, StatisticsObserver):
+        state["statistics"] = (
+            pt._observer._start_time,
+            pt._observer._accumulators,
+            pt._observer._firings,
+        )
+    if isinstance(pt, Transition):
+        state["no_of_times_enabled"] = pt._no_of_times_enabled
+        state["firing_records"] = pt._firing_records
+
+    return state
+
+
+def set_pt_state(pt: PTCommon, state: PTStateType) -> None:
+    """
+    Applies the state collected by :py:func:`soyutnet.distributed.get_pt_state`
+    to the PT in the parent process.
+
+    :param pt: PT.
+    :param state: State of the PT.
+    """
+    pt._tokens = state["tokens"]
+    pt._rebuild_label_index()
+    _set_arc_tokens(pt, state["arc_tokens"])
+    (
+        pt._last_processed_input_arc_index,
+        pt._last_processed_output_arc_index,
+        pt._conflict_rotation,
+        label_indices,
+    ) = state["rotation"]
+    for arc, index in zip(pt._output_arcs, label_indices):
+        arc._last_processed_label_index = index
+    if pt._observer is not None:
+        pt._observer._records = state["records"]
+        pt._observer._token_counters = state["token_counters"]
+        (
+            pt._observer._save_count,
+            pt._observer._next_sample_time,
+            pt._observer._last_counts,
+            pt._observer._pending_requester,
+        ) = state["sampling"]
+    if isinstance(pt._observer, StatisticsObserver):
+        (
+            pt._observer._start_time,
+            pt._observer._accumulators,
+            pt._observer._firings,
+        ) = state["statistics"]
+    if isinstance(pt, Transition):
+        pt._no_of_times_enabled = state["no_of_times_enabled"]
+        pt._firing_records = state["firing_records"]
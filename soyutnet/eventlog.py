@@ -0,0 +1,155 @@
+import json
+import time
+from datetime import datetime, timezone
+from xml.sax.saxutils import quoteattr
+from typing_extensions import (
+    Any,
+    Literal,
+    TextIO,
+    Self,
+)
+
+from .constants import *
+
+
+class EventLogWriter(object):
+    """
+    Streams the firings of transitions to an event log file for process mining.
+
+    .. code:: python
+
+        with EventLogWriter("run.jsonl") as log:
+            t = net.Transition("t", event_log=log)
+            soyutnet.run(reg)
+
+    Each firing is an event with the name of the transition, the firing time and
+    the tokens consumed from the input arcs and produced to the output arcs.
+    Events are formatted as soon as the transition fires and written through
+    a buffered file, so no trace is kept in memory. The buffer is flushed when
+    a simulation run ends, also if it fails, and when the writer is closed.
+
+    Formats:
+
+    * ``jsonl``: An OCEL 2.0 like JSON object per line. Tokens are the objects \
+      of the events, identified by ``"<label>:<id>"`` and qualified as \
+      ``consumed`` or ``produced``.
+    * ``xes``: A XES log with a single trace. Tokens are written as the \
+      ``consumed`` and ``produced`` string attributes of the events, so a case \
+      notion can be chosen offline.
+
+    Timestamps are :py:func:`soyutnet.SoyutNet.time` values. XES timestamps are
+    converted to dates by adding them to the wall clock time when the writer is
+    created.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        format: Literal["jsonl", "xes"] = "jsonl",
+        buffer_size: int = 1 << 16,
+    ) -> None:
+        """
+        Constructor.
+
+        :param path: Path of the event log file. It is overwritten.
+        :param format: ``jsonl`` or ``xes``.
+        :param buffer_size: Size of the file buffer in bytes.
+        """
+        self._xes: bool = format == "xes"
+        """Format of the event log"""
+        self._file: TextIO | None = open(
+            path, "w", buffering=buffer_size, encoding="utf-8"
+        )
+        """Event log file"""
+        self._epoch: float = time.time()
+        """Wall clock time corresponding to the timestamp ``0`` in XES logs"""
+        self.count: int = 0
+        """Number of written events"""
+        if self._xes:
+            self._file.write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<log xes.version="1.0" xmlns="http://www.xes-standard.org/">\n'
+                '<extension name="Concept" prefix="concept" uri="http://www.xes-standard.org/concept.xesext"/>\n'
+                '<extension name="Time" prefix="time" uri="http://www.xes-standard.org/time.xesext"/>\n'
+                '<trace>\n<string key="concept:name" value="soyutnet"/>\n'
+            )
+
+    @staticmethod
+    def _format_tokens(tokens: list[TokenType]) -> str:
+        return " ".join(f"{token[0]}:{token[1]}" for token in tokens)
+
+    def write(
+        self,
+        name: str,
+        timestamp: float,
+        consumed: list[TokenType],
+        produced: list[TokenType],
+    ) -> None:
+        """
+        Writes a firing event. It is called by the transitions.
+
+        :param name: Name of the transition.
+        :param timestamp: Firing time.
+        :param consumed: Tokens consumed from the input arcs.
+        :param produced: Tokens produced to the output arcs.
+        """
+        if self._file is None:
+            return
+        self.count += 1
+        if self._xes:
+            date: str = datetime.fromtimestamp(
+                self._epoch + timestamp, tz=timezone.utc
+            ).isoformat(timespec="microseconds")
+            self._file.write(
+                f'<event><string key="concept:name" value={quoteattr(name)}/>'
+                f'<date key="time:timestamp" value="{date}"/>'
+                f'<string key="consumed" value="{self._format_tokens(consumed)}"/>'
+                f'<string key="produced" value="{self._format_tokens(produced)}"/>'
+                "</event>\n"
+            )
+            return
+
+        relationships: list[Any] = [
+            {"objectId": f"{token[0]}:{token[1]}", "qualifier": "consumed"}
+            for token in consumed
+        ]
+        relationships += [
+            {"objectId": f"{token[0]}:{token[1]}", "qualifier": "produced"}
+            for token in produced
+        ]
+        self._file.write(
+            json.dumps(
+                {
+                    "id": f"e{self.count}",
+                    "type": name,
+                    "time": timestamp,
+                    "relationships": relationships,
+                },
+                separators=(",", ":"),
+            )
+        )
+        self._file.write("\n")
+
+    def flush(self) -> None:
+        """
+        Writes the buffered events to the file.
+        """
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        """
+        Completes and closes the event log file.
+        """
+        if self._file is None:
+            return
+        if self._xes:
+            self._file.write("</trace>\n</log>\n")
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
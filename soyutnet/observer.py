@@ -1,4 +1,5 @@
 import asyncio
+from dataclasses import dataclass
 from weakref import ref, ReferenceType
 from typing_extensions import (
     Any,
@@ -28,6 +29,11 @@ MergedRecordsType = list[Tuple[str, ObserverRecordType | Tuple[float]]]
 class Observer(BaseObject):
     """
     Can be assigned to a place to observe its state.
+
+    By default each :py:func:`soyutnet.observer.Observer.save` call adds a record.
+    The sampling parameters decimate the records of busy places. When more than
+    one is given, a record is added only if all of them allow it. Rejected calls
+    return before acquiring the lock or building the record.
     """
 
     def __init__(
@@ -35,6 +41,9 @@ class Observer(BaseObject):
         record_limit: int = 0,
         verbose: bool = False,
         place: Place | None = None,
+        sample_every: int = 1,
+        sample_period: float = 0.0,
+        change_threshold: int = 0,
         **kwargs: Any,
     ) -> None:
         """
@@ -43,6 +52,13 @@ class Observer(BaseObject):
         :param record_limit: Maximum number of records to be kept. It is unlimited if chosen ``0``.
         :param verbose: Print observations if ``True``.
         :param place: Reference to the :py:class:`soyutnet.place.Place` that is observed.
+        :param sample_every: Records only every N-th call, starting from the first one.
+        :param sample_period: Records at most once in the given duration in seconds \
+                              measured by :py:func:`soyutnet.SoyutNet.time`. It is \
+                              unlimited if chosen ``0``.
+        :param change_threshold: Records only if the token count of a label differs \
+                                 from the last record by more than the threshold. \
+                                 Every call is recorded if chosen ``0``.
         """
         super().__init__(**kwargs)
         self._records: ObserverHistoryType = []
@@ -59,6 +75,20 @@ class Observer(BaseObject):
         self._verbose: bool = verbose
         """Prints the observations if ``True``"""
         self._token_counters: Dict[label_t, int] = {}
+        self._sample_every: int = max(1, sample_every)
+        """Records every N-th call"""
+        self._sample_period: float = sample_period
+        """Minimum duration between records"""
+        self._change_threshold: int = change_threshold
+        """Minimum change of a token count between records"""
+        self._save_count: int = 0
+        """Number of :py:func:`soyutnet.observer.Observer.save` calls"""
+        self._next_sample_time: float = float("-inf")
+        """Time when the next record is allowed"""
+        self._last_counts: Dict[label_t, int] | None = None
+        """Token counts of the last record if a change threshold is used"""
+        self._pending_requester: str | None = None
+        """Requester of the last call rejected by sampling, if no record is added after it"""
         self._place: ReferenceType[Place] | None = None
         """Weak reference to the :py:class:`soyutnet.place.Place` that is observed."""
         self._set_place(place)
@@ -124,6 +154,35 @@ class Observer(BaseObject):
 
         return ""
 
+    def _is_sampled(self) -> bool:
+        """
+        Applies the sampling parameters to a :py:func:`soyutnet.observer.Observer.save` call.
+
+        :return: ``True`` if the call adds a record.
+        """
+        self._save_count += 1
+        if (self._save_count - 1) % self._sample_every:
+            return False
+        now: float = 0.0
+        if self._sample_period > 0:
+            now = self.net.time()
+            if now < self._next_sample_time:
+                return False
+        if self._change_threshold > 0:
+            last: Dict[label_t, int] | None = self._last_counts
+            counters: Dict[label_t, int] = self._token_counters
+            if last is not None and all(
+                abs(count - last.get(label, 0)) <= self._change_threshold
+                for label, count in counters.items()
+            ):
+                return False
+            self._last_counts = dict(counters)
+        if self._sample_period > 0:
+            """The period starts only when a record is added."""
+            self._next_sample_time = now + self._sample_period
+
+        return True
+
     async def save(self, requester: str = "") -> None:
         """
         Save counted tokens to the list of records.
@@ -134,6 +193,23 @@ class Observer(BaseObject):
         """
         if not requester:
             requester = "n/a"
+        if (
+            self._sample_every > 1
+            or self._sample_period > 0
+            or self._change_threshold > 0
+        ):
+            if not self._is_sampled():
+                self._pending_requester = requester
+                return
+            self._pending_requester = None
+        await self._save_counts(requester)
+
+    async def _save_counts(self, requester: str) -> None:
+        """
+        Adds a record of the current token counts.
+
+        :param requester: The identity of the caller.
+        """
         async with self._lock:
             tmp: list[TokenType] = []
             for label in self._token_counters:
@@ -147,6 +223,20 @@ class Observer(BaseObject):
             )
             await self._save(record)
 
+    async def flush(self) -> None:
+        """
+        Completes pending records. It is called once when the simulation ends.
+
+        If the last :py:func:`soyutnet.observer.Observer.save` call is rejected by
+        the sampling parameters, a record of the final token counts is added for
+        its requester, so the records end with the final state of the place.
+        """
+        requester: str | None = self._pending_requester
+        if requester is not None:
+            self._pending_requester = None
+            await self._save_counts(requester)
+        await self._clean_records()
+
     def get_records(self, column: int = -1) -> list[Any]:
         """
         Returns the records at the specified column.
@@ -244,3 +334,214 @@ class ComparativeObserver(Observer):
                     self._on_comparison_ends(self)
 
         await super()._save(record)
+
+
+@dataclass
+class OccupancyStatistics:
+    """
+    Time-weighted statistics of the token count of a label in a place.
+
+    The sojourn time is derived by Little's law from the mean occupancy and the
+    arrival rate.
+    """
+
+    duration: float = 0.0
+    """Observed duration in seconds"""
+    mean: float = 0.0
+    """Time-weighted mean of the token count, i.e. mean occupancy"""
+    variance: float = 0.0
+    """Time-weighted variance of the token count"""
+    minimum: int = 0
+    """Minimum token count"""
+    maximum: int = 0
+    """Maximum token count"""
+    arrivals: int = 0
+    """Number of tokens acquired, including the initial marking"""
+    departures: int = 0
+    """Number of tokens taken by the output transitions"""
+    arrival_rate: float = 0.0
+    """Arrivals per second"""
+    throughput: float = 0.0
+    """Departures per second"""
+    sojourn_time: float = 0.0
+    """Mean time a token stays in the place: ``mean / arrival_rate``"""
+
+
+class _OccupancyAccumulator(object):
+    """
+    Accumulates the time-weighted moments and histogram of a token count.
+    """
+
+    __slots__ = (
+        "count",
+        "last_time",
+        "area",
+        "area_sq",
+        "minimum",
+        "maximum",
+        "arrivals",
+        "departures",
+        "histogram",
+    )
+
+    def __init__(self, time: float, histogram_size: int) -> None:
+        self.count: int = 0
+        self.last_time: float = time
+        self.area: float = 0.0
+        self.area_sq: float = 0.0
+        self.minimum: int | None = None
+        self.maximum: int | None = None
+        self.arrivals: int = 0
+        self.departures: int = 0
+        self.histogram: list[float] = [0.0] * histogram_size
+
+    def advance(self, time: float) -> None:
+        """
+        Accumulates the current token count until the given time.
+        """
+        elapsed: float = time - self.last_time
+        if elapsed <= 0:
+            return
+        count: int = self.count
+        self._update_range(count)
+        self.area += count * elapsed
+        self.area_sq += count * count * elapsed
+        self.histogram[min(max(count, 0), len(self.histogram) - 1)] += elapsed
+        self.last_time = time
+
+    def _update_range(self, count: int) -> None:
+        if self.minimum is None or count < self.minimum:
+            self.minimum = count
+        if self.maximum is None or count > self.maximum:
+            self.maximum = count
+
+
+class StatisticsObserver(Observer):
+    """
+    Observer maintaining time-weighted statistics of the token counts of each
+    label instead of keeping records.
+
+    Statistics are updated incrementally when the place acquires or releases
+    tokens, using constant memory for each label. Percentiles are computed from
+    a time-weighted histogram of the token counts, where the counts larger than
+    the histogram size are accumulated in the last bin. The
+    :py:func:`soyutnet.observer.Observer.save` calls of the output transitions
+    are counted to compute their throughputs.
+
+    Statistics can be read at any time of a run and include the time since the
+    last change.
+    """
+
+    def __init__(self, histogram_size: int = 64, **kwargs: Any) -> None:
+        """
+        Constructor.
+
+        :param histogram_size: Number of bins of the token count histogram.
+        """
+        super().__init__(**kwargs)
+        self._histogram_size: int = max(1, histogram_size)
+        """Number of bins of the token count histogram"""
+        self._start_time: float | None = None
+        """Time of the first token count update"""
+        self._accumulators: Dict[label_t, _OccupancyAccumulator] = {}
+        """Statistics of each label"""
+        self._firings: Dict[str, int] = {}
+        """Number of firings of each output transition"""
+
+    async def inc_token_count(self, label: label_t, inc: int = 1) -> None:
+        now: float = self.net.time()
+        if self._start_time is None:
+            self._start_time = now
+        acc: _OccupancyAccumulator | None = self._accumulators.get(label)
+        if acc is None:
+            acc = _OccupancyAccumulator(self._start_time, self._histogram_size)
+            self._accumulators[label] = acc
+        acc.advance(now)
+        acc.count += inc
+        if inc > 0:
+            acc.arrivals += inc
+        else:
+            acc.departures -= inc
+        await super().inc_token_count(label, inc)
+
+    async def save(self, requester: str = "") -> None:
+        """
+        Counts the firings of the output transitions. No record is kept.
+
+        :param requester: The identity of the caller.
+        """
+        self._firings[requester] = self._firings.get(requester, 0) + 1
+
+    def _get_accumulator(self, label: label_t) -> _OccupancyAccumulator:
+        acc: _OccupancyAccumulator | None = self._accumulators.get(label)
+        if acc is None:
+            return _OccupancyAccumulator(self.net.time(), self._histogram_size)
+        acc.advance(self.net.time())
+
+        return acc
+
+    def _get_duration(self) -> float:
+        if self._start_time is None:
+            return 0.0
+
+        return self.net.time() - self._start_time
+
+    def get_statistics(self, label: label_t = GENERIC_LABEL) -> OccupancyStatistics:
+        """
+        Returns the statistics of a label.
+
+        :param label: Label.
+        :return: Statistics.
+        """
+        acc: _OccupancyAccumulator = self._get_accumulator(label)
+        duration: float = self._get_duration()
+        output: OccupancyStatistics = OccupancyStatistics(
+            duration=duration,
+            minimum=min(acc.count, acc.count if acc.minimum is None else acc.minimum),
+            maximum=max(acc.count, acc.count if acc.maximum is None else acc.maximum),
+            arrivals=acc.arrivals,
+            departures=acc.departures,
+        )
+        if duration > 0:
+            output.mean = acc.area / duration
+            output.variance = max(0.0, acc.area_sq / duration - output.mean**2)
+            output.arrival_rate = acc.arrivals / duration
+            output.throughput = acc.departures / duration
+        if output.arrival_rate > 0:
+            output.sojourn_time = output.mean / output.arrival_rate
+
+        return output
+
+    def get_percentile(self, q: float, label: label_t = GENERIC_LABEL) -> int:
+        """
+        Returns a time-weighted percentile of the token count of a label.
+
+        :param q: Percentile between ``0`` and ``100``.
+        :param label: Label.
+        :return: The smallest token count which the count is less than or equal \
+                 to for ``q`` percent of the time.
+        """
+        histogram: list[float] = self._get_accumulator(label).histogram
+        total: float = sum(histogram)
+        if total <= 0:
+            return 0
+        target: float = total * q / 100.0
+        cumulative: float = 0.0
+        for count, duration in enumerate(histogram):
+            cumulative += duration
+            if duration > 0 and cumulative >= target:
+                return count
+
+        return len(histogram) - 1
+
+    def get_throughputs(self) -> Dict[str, float]:
+        """
+        Returns the number of firings per second of the output transitions of the place.
+
+        :return: Throughput of each transition given by its name.
+        """
+        duration: float = self._get_duration()
+        if duration <= 0:
+            return {name: 0.0 for name in self._firings}
+
+        return {name: count / duration for name, count in self._firings.items()}
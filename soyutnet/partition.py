@@ -0,0 +1,206 @@
+import asyncio
+import threading
+from collections import deque
+from typing_extensions import (
+    Any,
+    Coroutine,
+    Deque,
+    Dict,
+    Iterable,
+    Sequence,
+)
+
+from .constants import *
+from .pt_common import PTCommon, Arc, Queue
+
+
+class ChannelQueue(Queue):
+    """
+    Thread-safe replacement of the arc queue for the arcs connecting PTs run on
+    different event loops.
+
+    Waiting operations poll the channel by yielding to the event loop, like the
+    PT loops in :py:func:`soyutnet.pt_common._loop` do, so no future is shared
+    between loops.
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        """
+        Constructor.
+
+        :param maxsize: Capacity of the channel. It is the weight of the arc.
+        """
+        super().__init__(maxsize=maxsize)
+        self._items: Deque[Any] = deque()
+        """Tokens in the channel"""
+        self._channel_lock: threading.Lock = threading.Lock()
+        """Protects :py:attr:`soyutnet.partition.ChannelQueue._items`"""
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    def put_nowait(self, item: Any) -> None:
+        with self._channel_lock:
+            if len(self._items) >= self.maxsize:
+                raise asyncio.QueueFull
+            self._items.append(item)
+
+    def get_nowait(self) -> Any:
+        with self._channel_lock:
+            if not self._items:
+                raise asyncio.QueueEmpty
+            return self._items.popleft()
+
+    async def put(self, item: Any) -> None:
+        while True:
+            try:
+                self.put_nowait(item)
+                return
+            except asyncio.QueueFull:
+                await asyncio.sleep(0)
+
+    async def get(self) -> Any:
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                await asyncio.sleep(0)
+
+    def task_done(self) -> None:
+        pass
+
+
+class ChannelArc(Arc):
+    """
+    Replaces an arc whose start and end PTs are run on different event loops.
+
+    Tokens are transmitted over a :py:class:`soyutnet.partition.ChannelQueue`.
+    Observations of the start place requested by the end transition are run on
+    the event loop of the start place.
+    """
+
+    _counts_fill_level: bool = False
+
+    def __init__(
+        self,
+        arc: Arc,
+        start_loop: asyncio.AbstractEventLoop | None = None,
+        queue: ChannelQueue | None = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param arc: Replaced arc.
+        :param start_loop: Event loop running the start PT of the arc. Observations \
+                           are run on the caller's loop if it is ``None``.
+        :param queue: Channel. A :py:class:`soyutnet.partition.ChannelQueue` is \
+                      created if it is ``None``.
+        """
+        super().__init__(
+            start=arc.start,
+            end=arc.end,
+            weight=arc.weight,
+            labels=arc._labels,
+            validate=False,
+        )
+        self.index_at_start = arc.index_at_start
+        self.index_at_end = arc.index_at_end
+        self._last_processed_label_index = arc._last_processed_label_index
+        self._queue = ChannelQueue(maxsize=arc.weight) if queue is None else queue
+        _move_tokens(arc._queue, self._queue)
+        self._arc: Arc = arc
+        """Replaced arc"""
+        self._start_loop: asyncio.AbstractEventLoop | None = start_loop
+        """Event loop running the start PT"""
+
+    async def _run_at_start(self, coro: Coroutine[Any, Any, None]) -> None:
+        if self._start_loop is None or asyncio.get_running_loop() is self._start_loop:
+            await coro
+        else:
+            future = asyncio.run_coroutine_threadsafe(coro, self._start_loop)
+            await asyncio.wrap_future(future)
+
+    async def observe_input_places(self, requester: str = "") -> None:
+        await self._run_at_start(super().observe_input_places(requester=requester))
+
+    async def notify_observer(self, label: label_t, increment: int = -1) -> None:
+        await self._run_at_start(super().notify_observer(label, increment))
+
+    def attach(self) -> None:
+        """
+        Replaces the original arc in the arc lists of start and end PTs.
+        """
+        self.start._output_arcs[self.index_at_start] = self
+        self.end._input_arcs[self.index_at_end] = self
+        self.start._rebuild_label_index()
+
+    def detach(self) -> Arc:
+        """
+        Puts the original arc back and moves the tokens in the channel to it.
+
+        :return: Original arc.
+        """
+        arc: Arc = self._arc
+        _move_tokens(self._queue, arc._queue)
+        arc._last_processed_label_index = self._last_processed_label_index
+        self.start._output_arcs[self.index_at_start] = arc
+        self.end._input_arcs[self.index_at_end] = arc
+        self.start._rebuild_label_index()
+        return arc
+
+
+def _move_tokens(src: Queue, dst: Queue) -> None:
+    while not src.empty():
+        dst.put_nowait(src.get_nowait())
+
+
+def validate_partitions(
+    pts: Iterable[PTCommon], partitions: Sequence[Iterable[PTCommon]]
+) -> Dict[PTCommon, int]:
+    """
+    Checks that each PT is assigned to exactly one partition.
+
+    :param pts: All PTs of the net.
+    :param partitions: Groups of PTs.
+    :return: Partition index of each PT.
+    """
+    owner: Dict[PTCommon, int] = {}
+    for i, partition in enumerate(partitions):
+        for pt in partition:
+            if pt in owner:
+                raise SoyutNetError(f"{pt.ident()} is assigned to multiple partitions")
+            owner[pt] = i
+    for pt in pts:
+        if pt not in owner:
+            raise SoyutNetError(f"{pt.ident()} is not assigned to a partition")
+
+    return owner
+
+
+def insert_channels(
+    owner: Dict[PTCommon, int], loops: Sequence[asyncio.AbstractEventLoop]
+) -> list[ChannelArc]:
+    """
+    Replaces the arcs between different partitions by channels.
+
+    :param owner: Partition index of each PT.
+    :param loops: Event loop of each partition.
+    :return: Channel arcs. They must be detached after the simulation.
+    """
+    channels: list[ChannelArc] = []
+    for pt, i in owner.items():
+        for arc in list(pt._output_arcs):
+            end: Any = arc.end
+            if end is None or owner.get(end, i) == i:
+                continue
+            channel: ChannelArc = ChannelArc(arc, loops[i])
+            channel.attach()
+            channels.append(channel)
+
+    return channels
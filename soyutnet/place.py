@@ -2,13 +2,18 @@ import asyncio
 from typing_extensions import (
     Any,
     Tuple,
+    AsyncIterable,
+    AsyncIterator,
     Awaitable,
     Callable,
+    Set,
+    cast,
 )
 
 from .constants import *
 from .pt_common import PTCommon, Arc
 from .observer import Observer
+from .policy import ConflictPolicy
 
 
 class Place(PTCommon):
@@ -22,6 +27,7 @@ class Place(PTCommon):
         observer: Observer | None = None,
         observer_record_limit: int = 0,
         observer_verbose: bool = False,
+        conflict_policy: ConflictPolicy | None = None,
         **kwargs: Any,
     ) -> None:
         """
@@ -32,8 +38,11 @@ class Place(PTCommon):
         :param observer_record_limit: Maximum number of records that is recorded \
                                       by the observer. It is unlimited when chosen ``0``.
         :param observer_verbose: If set, observer will print new records when saved.
+        :param conflict_policy: Chooses which output transitions receive the tokens first. \
+                                :py:attr:`soyutnet.SoyutNet.conflict_policy` is used if it is ``None``.
         """
         super().__init__(name=name, **kwargs)
+        self._conflict_policy = conflict_policy
         self._observer: Observer
         if observer is not None:
             self._observer = observer
@@ -51,6 +60,31 @@ class Place(PTCommon):
         if self._observer is not None:
             await self._observer.save(requester=requester)
 
+    def _marking_changed(self) -> None:
+        """
+        Notifies the run control that the place acquired or released tokens.
+        """
+        if self._run_control is not None:
+            self._run_control.marking_changed(self)
+
+
+ConsumerType = Callable[["SpecialPlace"], Awaitable[None]]
+"""Custom consumer function run on the event loop"""
+BlockingConsumerType = Callable[[TokenType], None]
+"""Custom consumer function run in an executor for each token"""
+ProducerType = Callable[["SpecialPlace"], Awaitable[list[TokenType]]]
+"""Custom producer function run on the event loop"""
+BlockingProducerType = Callable[[], list[TokenType]]
+"""Custom producer function run in an executor"""
+DemandProducerType = Callable[["SpecialPlace", int], Awaitable[list[TokenType]]]
+"""Custom producer function called with the maximum number of tokens requested"""
+TokenSourceType = DemandProducerType | AsyncIterable[TokenType]
+"""Demand driven producer or async iterable of tokens"""
+BatchConsumerType = Callable[["SpecialPlace", list[TokenType]], Awaitable[None]]
+"""Custom consumer function run on the event loop with all available tokens"""
+BlockingBatchConsumerType = Callable[[list[TokenType]], None]
+"""Custom consumer function run in an executor with all available tokens"""
+
 
 class SpecialPlace(Place):
     """
@@ -60,44 +94,281 @@ class SpecialPlace(Place):
     def __init__(
         self,
         name: str = "",
-        consumer: Callable[["SpecialPlace"], Awaitable[None]] | None = None,
-        producer: Callable[["SpecialPlace"], Awaitable[list[TokenType]]] | None = None,
+        consumer: ConsumerType | None = None,
+        producer: ProducerType | None = None,
+        max_pending: int = 1,
+        token_limit: int = 0,
+        batch_consumer: BatchConsumerType | None = None,
+        source: TokenSourceType | None = None,
+        blocking_consumer: BlockingConsumerType | None = None,
+        blocking_producer: BlockingProducerType | None = None,
+        blocking_batch_consumer: BlockingBatchConsumerType | None = None,
         **kwargs: Any,
     ) -> None:
         """
         Constructor.
 
+        The ``blocking_*`` callbacks are synchronous functions run in the executor
+        (see :py:class:`soyutnet.pt_common.PTCommon`). ``blocking_consumer`` is
+        called with each token taken from the place, and ``blocking_producer`` is
+        called without arguments. The place keeps processing its arcs while they
+        are in progress.
+
+        ``batch_consumer`` is called only when the place has tokens, with all of
+        them removed from the place. It is called with the place and the tokens
+        on the event loop. ``blocking_batch_consumer`` is called with the tokens
+        in the executor. If ``max_pending`` calls are in progress in the executor,
+        the tokens are accumulated for the next call.
+
+        ``source`` produces tokens on demand. Tokens are requested only when the
+        output arcs have free capacity which is not covered by the tokens already
+        in the place, and at most that many, so the production is paced by the
+        consumption and the place never holds more tokens than its output arcs
+        can take. ``source`` is either a coroutine function called with the place
+        and the number of requested tokens, or an async iterable, e.g. an async
+        generator, of tokens which is iterated on demand until it is exhausted.
+
         :param name: Name of the place.
         :param consumer: Custom :py:func:`soyutnet.pt_common.PTCommon._process_input_arcs` function.
         :param producer: Custom :py:func:`soyutnet.pt_common.PTCommon._process_output_arcs` function.
+        :param max_pending: Maximum number of blocking consumer and producer calls each \
+                            in progress in the executor.
+        :param token_limit: The place stops acquiring tokens from its input arcs and \
+                            calling the producer while it has this many tokens. \
+                            It is unlimited if chosen ``0``.
+        :param batch_consumer: Custom consumer called with batches of tokens.
+        :param source: Demand driven token source.
+        :param blocking_consumer: Synchronous consumer called with each token in the executor.
+        :param blocking_producer: Synchronous producer called in the executor.
+        :param blocking_batch_consumer: Synchronous consumer called with batches of \
+                                        tokens in the executor.
+
+        Only one of the consumers and one of the producers, including ``source``, can be given.
         """
+        consumers: list[Any] = [
+            consumer,
+            batch_consumer,
+            blocking_consumer,
+            blocking_batch_consumer,
+        ]
+        if sum(c is not None for c in consumers) > 1:
+            raise SoyutNetError(f"Place '{name}' can not have more than one consumer")
+        producers: list[Any] = [producer, source, blocking_producer]
+        if sum(p is not None for p in producers) > 1:
+            raise SoyutNetError(f"Place '{name}' can not have more than one producer")
         super().__init__(name=name, **kwargs)
-        self._consumer: Callable[["SpecialPlace"], Awaitable[None]] | None = consumer
+        self._consumer: ConsumerType | None = consumer
         """Custom :py:func:`soyutnet.pt_common.PTCommon._process_input_arcs` function."""
-        self._producer: (
-            Callable[["SpecialPlace"], Awaitable[list[TokenType]]] | None
-        ) = producer
+        self._blocking_consumer: BlockingConsumerType | None = blocking_consumer
+        """Custom consumer run in the executor"""
+        self._batch_consumer: BatchConsumerType | None = batch_consumer
+        """Custom consumer called with batches of tokens"""
+        self._blocking_batch_consumer: BlockingBatchConsumerType | None = (
+            blocking_batch_consumer
+        )
+        """Custom consumer called with batches of tokens in the executor"""
+        self._producer: ProducerType | None = producer
         """Custom :py:func:`soyutnet.pt_common.PTCommon._process_output_arcs` function."""
+        self._blocking_producer: BlockingProducerType | None = blocking_producer
+        """Custom producer run in the executor"""
+        self._source: DemandProducerType | None = None
+        """Demand driven producer"""
+        self._source_iterator: AsyncIterator[TokenType] | None = None
+        """Iterator of the async iterable token source"""
+        if isinstance(source, AsyncIterable):
+            self._source_iterator = source.__aiter__()
+        else:
+            self._source = source
+        self._max_pending: int = max(1, max_pending)
+        """Maximum number of callbacks in progress in the executor"""
+        self._token_limit: int = token_limit
+        """Maximum number of tokens kept before acquiring new ones"""
+        self._pending_consumers: Set[asyncio.Future[None]] = set()
+        """Consumer calls in progress in the executor"""
+        self._pending_producers: Set[asyncio.Future[list[TokenType]]] = set()
+        """Producer calls in progress in the executor"""
+
+    def _has_pending_work(self) -> bool:
+        return bool(self._pending_consumers or self._pending_producers)
+
+    def _count_tokens(self) -> int:
+        return sum(len(ids) for ids in self._tokens.values())
+
+    def _is_below_token_limit(self) -> bool:
+        if self._token_limit <= 0:
+            return True
+
+        return self._count_tokens() < self._token_limit
+
+    @staticmethod
+    def _collect(pending: Set[asyncio.Future[Any]]) -> list[Any]:
+        """
+        Removes the completed executor calls.
+
+        :param pending: Calls in progress.
+        :return: Results of the completed calls. Raises their exceptions, if any.
+        """
+        results: list[Any] = []
+        for future in [f for f in pending if f.done()]:
+            pending.discard(future)
+            results.append(future.result())
+
+        return results
+
+    async def _produce(self) -> list[TokenType]:
+        """
+        Calls the producer on the event loop, or collects the tokens produced in
+        the executor and submits new calls.
+
+        :return: New tokens.
+        """
+        if self._producer is not None:
+            return await self._producer(self)
+
+        tokens: list[TokenType] = []
+        for result in self._collect(self._pending_producers):
+            tokens += result
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        producer: BlockingProducerType = cast(
+            BlockingProducerType, self._blocking_producer
+        )
+        while len(self._pending_producers) < self._max_pending:
+            self._pending_producers.add(loop.run_in_executor(self._executor, producer))
+
+        return tokens
+
+    def _get_demand(self) -> int:
+        """
+        Counts the tokens which the output arcs can accept and are not covered by
+        the tokens in the place.
+
+        :return: Number of tokens to request from the source.
+        """
+        capacity: int = sum(
+            arc.weight - arc._queue.qsize() for arc in self._output_arcs
+        )
+        if self._token_limit > 0:
+            capacity = min(capacity, self._token_limit)
+
+        return capacity - self._count_tokens()
+
+    async def _request_tokens(self) -> list[TokenType]:
+        """
+        Requests tokens from the demand driven source.
+
+        :return: New tokens.
+        """
+        demand: int = self._get_demand()
+        if demand <= 0:
+            return []
+        if self._source is not None:
+            return await self._source(self, demand)
+
+        iterator: AsyncIterator[TokenType] = cast(
+            AsyncIterator[TokenType], self._source_iterator
+        )
+        tokens: list[TokenType] = []
+        try:
+            while len(tokens) < demand:
+                tokens.append(await iterator.__anext__())
+        except StopAsyncIteration:
+            self._source_iterator = None
+
+        return tokens
+
+    async def _consume(self) -> None:
+        """
+        Calls the consumer on the event loop, or submits a consumer call to the
+        executor for each token while the number of calls in progress is below
+        :py:attr:`soyutnet.place.SpecialPlace._max_pending`.
+        """
+        count: int = self._count_tokens()
+        if self._consumer is not None:
+            await self._consumer(self)
+        else:
+            self._collect(self._pending_consumers)
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            consumer: BlockingConsumerType = cast(
+                BlockingConsumerType, self._blocking_consumer
+            )
+            for label, ids in self._tokens.items():
+                while ids and len(self._pending_consumers) < self._max_pending:
+                    token: TokenType = self._get_token(label)
+                    self._pending_consumers.add(
+                        loop.run_in_executor(self._executor, consumer, token)
+                    )
+
+        if self._count_tokens() != count:
+            self._marking_changed()
+
+    def _take_all_tokens(self) -> list[TokenType]:
+        """
+        Removes all tokens from the place.
+
+        :return: Tokens.
+        """
+        tokens: list[TokenType] = []
+        for label, ids in self._tokens.items():
+            if ids:
+                tokens += [(label, id) for id in ids]
+                ids.clear()
+                for arc, bit in self._label_arcs.get(label, ()):
+                    arc._label_mask &= ~bit
+
+        return tokens
+
+    async def _consume_batch(self) -> None:
+        """
+        Calls the batch consumer with all tokens of the place, if it has any.
+        """
+        if not any(self._tokens.values()):
+            if self._pending_consumers:
+                self._collect(self._pending_consumers)
+            return
+        if self._batch_consumer is not None:
+            tokens: list[TokenType] = self._take_all_tokens()
+            await self._batch_consumer(self, tokens)
+        else:
+            self._collect(self._pending_consumers)
+            if len(self._pending_consumers) >= self._max_pending:
+                return
+            tokens = self._take_all_tokens()
+            self._pending_consumers.add(
+                asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    cast(BlockingBatchConsumerType, self._blocking_batch_consumer),
+                    tokens,
+                )
+            )
+
+        self._marking_changed()
 
     async def _process_input_arcs(self) -> bool:
         """
-        Calls custom producer function after the default
+        Calls custom producer function or requests tokens from the source after the default
         :py:func:`soyutnet.pt_common.PTCommon._process_input_arcs`.
 
         :return: If ``True`` continues to processing tokens and output arcs, \
                  else loops back to processing input arcs.
         """
+        if not self._is_below_token_limit():
+            return True
+
         result: bool = await super()._process_input_arcs()
-        if self._producer is not None:
-            tokens: list[TokenType] = await self._producer(self)
-            if tokens:
-                for token in tokens:
-                    label: label_t = token[0]
-                    count: int = self._put_token(token, strict=False)
-                    if self._observer is not None:
-                        await self._observer.inc_token_count(label)
+        tokens: list[TokenType] = []
+        if self._producer is not None or self._blocking_producer is not None:
+            tokens = await self._produce()
+        elif self._source is not None or self._source_iterator is not None:
+            tokens = await self._request_tokens()
+        if tokens:
+            for token in tokens:
+                label: label_t = token[0]
+                count: int = self._put_token(token, strict=False)
+                if self._observer is not None:
+                    await self._observer.inc_token_count(label)
+            self._marking_changed()
 
-                return True
+            return True
 
         return result
 
@@ -107,8 +378,13 @@ class SpecialPlace(Place):
 
         See, :py:func:`soyutnet.place.Place._process_output_arcs`.
         """
-        if self._consumer is not None:
-            await self._consumer(self)
+        if self._consumer is not None or self._blocking_consumer is not None:
+            await self._consume()
+        elif (
+            self._batch_consumer is not None
+            or self._blocking_batch_consumer is not None
+        ):
+            await self._consume_batch()
 
         await super()._process_output_arcs()
 
@@ -0,0 +1,290 @@
+import os
+import gc
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+from typing_extensions import (
+    Any,
+    Dict,
+    IO,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from .constants import *
+from .pt_common import PTCommon, EdgeType, connect_all
+from .place import Place
+from .transition import Transition
+from .registry import PTRegistry
+from .validate import ModelError
+
+if TYPE_CHECKING:
+    from . import SoyutNet
+
+
+PNML_NAMESPACE: str = "http://www.pnml.org/version-2009/grammar/pnml"
+"""XML namespace of PNML documents"""
+PNML_PTNET_TYPE: str = "http://www.pnml.org/version-2009/grammar/ptnet"
+"""PNML net type of place/transition nets"""
+TOOL_NAME: str = "soyutnet"
+"""Tool name used in ``<toolspecific>`` elements"""
+
+PNMLSourceType = str | os.PathLike[str] | IO[bytes]
+"""Types accepted by :py:func:`soyutnet.pnml.read_pnml`"""
+
+_ArcEntryType = Tuple[str, str, int, Tuple[label_t, ...]]
+"""(source id, target id, weight, labels)"""
+
+
+def _local_name(tag: str) -> str:
+    """
+    Strips the XML namespace from a tag.
+
+    :param tag: Tag name possibly in ``{namespace}name`` form.
+    :return: Tag name without namespace.
+    """
+    return tag.rpartition("}")[2]
+
+
+def _child(elem: ET.Element, *path: str) -> ET.Element | None:
+    """
+    Finds a descendant element by following local tag names.
+
+    :param elem: Parent element.
+    :param path: Local names of the nested elements.
+    :return: Found element or ``None``.
+    """
+    current: ET.Element | None = elem
+    for name in path:
+        if current is None:
+            return None
+        found: ET.Element | None = None
+        for sub in current:
+            if _local_name(sub.tag) == name:
+                found = sub
+                break
+        current = found
+
+    return current
+
+
+def _text(elem: ET.Element, *path: str) -> str | None:
+    node: ET.Element | None = _child(elem, *path)
+    if node is None or node.text is None:
+        return None
+
+    return node.text.strip()
+
+
+def _parse_labels(text: str) -> Tuple[label_t, ...]:
+    return tuple(int(l) for l in text.split(",") if l.strip())
+
+
+def _parse_ids(text: str) -> list[id_t]:
+    return [int(i) for i in text.split(",") if i.strip()]
+
+
+def _parse_marking(elem: ET.Element) -> TokenWalletType:
+    """
+    Parses the initial marking of a place.
+
+    Labeled tokens are read from ``<toolspecific tool="soyutnet">`` element. If it
+    does not exist, the standard ``<initialMarking>`` count is converted to generic tokens.
+
+    :param elem: ``<place>`` element.
+    :return: Initial tokens.
+    """
+    tokens: TokenWalletType = {}
+    for sub in elem:
+        if _local_name(sub.tag) != "toolspecific" or sub.get("tool") != TOOL_NAME:
+            continue
+        for entry in sub:
+            if _local_name(entry.tag) != "tokens":
+                continue
+            label: label_t = int(entry.get("label", GENERIC_LABEL))
+            tokens[label] = _parse_ids(entry.text or "")
+        return tokens
+
+    count: str | None = _text(elem, "initialMarking", "text")
+    if count:
+        tokens[GENERIC_LABEL] = [GENERIC_ID] * int(count)
+
+    return tokens
+
+
+def _parse_arc(elem: ET.Element) -> _ArcEntryType:
+    source: str | None = elem.get("source")
+    target: str | None = elem.get("target")
+    if source is None or target is None:
+        raise ModelError(f"Arc '{elem.get('id')}' has no source or target")
+    weight: str | None = _text(elem, "inscription", "text")
+    labels: Tuple[label_t, ...] = (GENERIC_LABEL,)
+    for sub in elem:
+        if _local_name(sub.tag) == "toolspecific" and sub.get("tool") == TOOL_NAME:
+            text: str | None = _text(sub, "labels")
+            if text is not None:
+                labels = _parse_labels(text)
+
+    return (source, target, int(weight) if weight else 1, labels)
+
+
+def read_pnml(
+    net: "SoyutNet",
+    source: PNMLSourceType,
+    registry: PTRegistry | None = None,
+) -> PTRegistry:
+    """
+    Builds a PT net from a PNML (Petri Net Markup Language) document.
+
+    The document is parsed incrementally, so memory usage does not grow with
+    the size of the XML tree. Places and transitions are registered as they are
+    parsed. Arcs are created after all nodes are known by
+    :py:func:`soyutnet.pt_common.connect_all` which validates them in a single pass.
+
+    Arc labels and labeled initial markings are read from
+    ``<toolspecific tool="soyutnet">`` elements written by
+    :py:func:`soyutnet.pnml.write_pnml`. Standard P/T net documents are read by
+    using :py:attr:`soyutnet.constants.GENERIC_LABEL` for all arcs and tokens.
+
+    :param net: SoyutNet instance which the new PTs belong to.
+    :param source: File name or binary file object.
+    :param registry: PTs are registered to this registry. A new one is created if it is ``None``.
+    :return: Registry containing the PTs.
+    """
+    if registry is None:
+        registry = net.PTRegistry()
+
+    gc_enabled: bool = gc.isenabled()
+    """Cyclic garbage collector is paused while allocating many small objects."""
+    gc.disable()
+    try:
+        _read_pnml(net, source, registry)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return registry
+
+
+def _read_pnml(net: "SoyutNet", source: PNMLSourceType, registry: PTRegistry) -> None:
+    pts: Dict[str, PTCommon] = {}
+    arcs: list[_ArcEntryType] = []
+    parents: list[ET.Element] = []
+    """Keeps the path from the root to the current element"""
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        name: str = _local_name(elem.tag)
+        pt: PTCommon | None = None
+        if name == "place":
+            pt = Place(
+                name=_text(elem, "name", "text") or elem.get("id", ""),
+                initial_tokens=_parse_marking(elem),
+                net=net,
+            )
+        elif name == "transition":
+            pt = Transition(
+                name=_text(elem, "name", "text") or elem.get("id", ""), net=net
+            )
+        elif name == "arc":
+            arcs.append(_parse_arc(elem))
+        else:
+            continue
+        if pt is not None:
+            pts[elem.get("id", pt._name)] = pt
+            registry.register(pt)
+        if parents:
+            """Processed siblings are not needed anymore."""
+            parents[-1].clear()
+
+    edges: list[EdgeType] = []
+    for source_id, target_id, weight, labels in arcs:
+        try:
+            edges.append((pts[source_id], pts[target_id], weight, labels))
+        except KeyError as e:
+            raise ModelError(f"Arc refers to an unknown node {e}")
+
+    connect_all(edges)
+
+
+def _write_marking(fh: IO[str], pt: PTCommon, indent: str) -> None:
+    eol: str = "\n"
+    count: int = sum(len(ids) for ids in pt._tokens.values())
+    if count > 0:
+        fh.write(f"{indent}<initialMarking><text>{count}</text></initialMarking>{eol}")
+    fh.write(f'{indent}<toolspecific tool="{TOOL_NAME}" version="1.0">{eol}')
+    for label, ids in pt._tokens.items():
+        if not ids:
+            continue
+        fh.write(
+            f'{indent}  <tokens label="{label}">{",".join(map(str, ids))}</tokens>{eol}'
+        )
+    fh.write(f"{indent}</toolspecific>{eol}")
+
+
+def write_pnml(
+    registry: PTRegistry,
+    fh: IO[str],
+    net_id: str = "net",
+    net_name: str = "Net",
+) -> None:
+    """
+    Writes the PTs in the registry and their current marking in PNML format.
+
+    The document is streamed to ``fh`` node by node. Arc labels and labeled
+    tokens are written in ``<toolspecific tool="soyutnet">`` elements, so the
+    output can be read back by :py:func:`soyutnet.pnml.read_pnml` without loss.
+
+    :param registry: Registry containing the PTs.
+    :param fh: Text file object.
+    :param net_id: ``id`` attribute of the ``<net>`` element.
+    :param net_name: Name of the net.
+    """
+    eol: str = "\n"
+    indent: str = "      "
+    fh.write(f'<?xml version="1.0" encoding="UTF-8"?>{eol}')
+    fh.write(f'<pnml xmlns="{PNML_NAMESPACE}">{eol}')
+    fh.write(f'  <net id={quoteattr(net_id)} type="{PNML_PTNET_TYPE}">{eol}')
+    fh.write(f"    <name><text>{escape(net_name)}</text></name>{eol}")
+    fh.write(f'    <page id="page0">{eol}')
+
+    pts: list[PTCommon] = []
+    for _, obj in registry.entries():
+        if not isinstance(obj, PTCommon):
+            continue
+        pts.append(obj)
+        name: str = escape(obj._name)
+        node_id: str = quoteattr(f"n{obj._id}")
+        if isinstance(obj, Place):
+            fh.write(f"{indent}<place id={node_id}>{eol}")
+            fh.write(f"{indent}  <name><text>{name}</text></name>{eol}")
+            _write_marking(fh, obj, indent + "  ")
+            fh.write(f"{indent}</place>{eol}")
+        elif isinstance(obj, Transition):
+            fh.write(f"{indent}<transition id={node_id}>{eol}")
+            fh.write(f"{indent}  <name><text>{name}</text></name>{eol}")
+            fh.write(f"{indent}</transition>{eol}")
+
+    i: int = 0
+    for pt in pts:
+        for arc in pt._output_arcs:
+            end: Any = arc.end
+            if end is None:
+                continue
+            labels: str = ",".join(map(str, arc._labels))
+            fh.write(
+                f'{indent}<arc id="a{i}" source="n{pt._id}" target="n{end._id}">{eol}'
+            )
+            fh.write(
+                f"{indent}  <inscription><text>{arc.weight}</text></inscription>{eol}"
+            )
+            fh.write(
+                f'{indent}  <toolspecific tool="{TOOL_NAME}" version="1.0"><labels>{labels}</labels></toolspecific>{eol}'
+            )
+            fh.write(f"{indent}</arc>{eol}")
+            i += 1
+
+    fh.write(f"    </page>{eol}")
+    fh.write(f"  </net>{eol}")
+    fh.write(f"</pnml>{eol}")
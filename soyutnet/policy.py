@@ -0,0 +1,153 @@
+import random
+from abc import ABC, abstractmethod
+from weakref import WeakKeyDictionary
+from typing_extensions import (
+    Any,
+    Dict,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from .constants import *
+
+if TYPE_CHECKING:
+    from .pt_common import PTCommon, Arc
+else:
+    PTCommon = Any
+    Arc = Any
+
+
+class ConflictPolicy(ABC):
+    """
+    Resolves conflicts between transitions sharing an input place.
+
+    A place offers its tokens to its output arcs in the order returned by
+    :py:func:`soyutnet.policy.ConflictPolicy.order` and each arc which is not
+    full receives at most one token per loop iteration, so the transitions at
+    the beginning of the order are served first when tokens are scarce.
+
+    A policy instance can be shared by several places. The rotation of the
+    output arcs of each place is kept in the place, see
+    :py:attr:`soyutnet.pt_common.PTCommon._conflict_rotation`.
+    """
+
+    @abstractmethod
+    def order(self, place: PTCommon, arcs: Sequence[Arc]) -> Sequence[Arc]:
+        """
+        Orders the output arcs of a place for the current loop iteration.
+
+        :param place: Place.
+        :param arcs: Output arcs of the place.
+        :return: Ordered arcs.
+        """
+
+
+def _get_priority(arc: Arc) -> int:
+    end: Any = arc.end
+    return int(getattr(end, "_priority", 0))
+
+
+def _get_conflict_weight(arc: Arc) -> float:
+    end: Any = arc.end
+    return float(getattr(end, "_conflict_weight", 1.0))
+
+
+class RoundRobinPolicy(ConflictPolicy):
+    """
+    Starts each iteration from the arc after the one the previous iteration started.
+    It is the default behavior of places without a policy.
+    """
+
+    def order(self, place: PTCommon, arcs: Sequence[Arc]) -> Sequence[Arc]:
+        count: int = len(arcs)
+        if count < 2:
+            return arcs
+        i: int = place._conflict_rotation % count
+        place._conflict_rotation = i + 1
+
+        return [*arcs[i:], *arcs[:i]]
+
+
+class PriorityPolicy(ConflictPolicy):
+    """
+    Serves the output transitions with higher :py:attr:`soyutnet.transition.Transition._priority`
+    first. Transitions with the same priority are served in round-robin order.
+
+    Priorities are static, so the groups are sorted once per place and rebuilt
+    only when the output arcs of the place change, e.g. an arc is added or
+    replaced by a channel.
+    """
+
+    def __init__(self) -> None:
+        self._groups: WeakKeyDictionary[
+            PTCommon, Tuple[Tuple[Arc, ...], list[list[Arc]]]
+        ] = WeakKeyDictionary()
+        """Output arcs and the arcs grouped by descending priority for each place"""
+
+    def _get_groups(self, place: PTCommon, arcs: Sequence[Arc]) -> list[list[Arc]]:
+        cached: Tuple[Tuple[Arc, ...], list[list[Arc]]] | None = self._groups.get(place)
+        if (
+            cached is not None
+            and len(cached[0]) == len(arcs)
+            and all(a is b for a, b in zip(cached[0], arcs))
+        ):
+            return cached[1]
+
+        groups: Dict[int, list[Arc]] = {}
+        for arc in arcs:
+            groups.setdefault(_get_priority(arc), []).append(arc)
+        ordered: list[list[Arc]] = [groups[p] for p in sorted(groups, reverse=True)]
+        self._groups[place] = (tuple(arcs), ordered)
+
+        return ordered
+
+    def order(self, place: PTCommon, arcs: Sequence[Arc]) -> Sequence[Arc]:
+        groups: list[list[Arc]] = self._get_groups(place, arcs)
+        if len(groups) == 1 and len(groups[0]) < 2:
+            return arcs
+
+        rotation: int = place._conflict_rotation + 1
+        place._conflict_rotation = rotation
+        output: list[Arc] = []
+        for group in groups:
+            i: int = rotation % len(group)
+            output += group[i:]
+            output += group[:i]
+
+        return output
+
+
+class WeightedRandomPolicy(ConflictPolicy):
+    """
+    Orders the output arcs randomly. An arc comes first with a probability
+    proportional to the :py:attr:`soyutnet.transition.Transition._conflict_weight`
+    of its transition. Transitions with zero weight come last.
+
+    The order is a weighted random permutation (Efraimidis-Spirakis sampling).
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        """
+        Constructor.
+
+        :param seed: Seed of the random number generator. If it is ``None``, \
+                     :py:attr:`soyutnet.SoyutNet.random` of the net is used.
+        """
+        self._rng: random.Random | None = (
+            random.Random(seed) if seed is not None else None
+        )
+        """Random number generator"""
+
+    def order(self, place: PTCommon, arcs: Sequence[Arc]) -> Sequence[Arc]:
+        if len(arcs) < 2:
+            return arcs
+
+        rand = (self._rng or place.net.random).random
+        keys: list[Tuple[float, int]] = []
+        for i, arc in enumerate(arcs):
+            weight: float = _get_conflict_weight(arc)
+            keys.append((rand() ** (1.0 / weight) if weight > 0 else -1.0, i))
+        keys.sort(reverse=True)
+
+        return [arcs[i] for _, i in keys]
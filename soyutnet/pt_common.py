@@ -1,5 +1,6 @@
 import sys
 import asyncio
+from concurrent.futures import Executor
 from weakref import ref, ReferenceType
 from copy import deepcopy
 from functools import reduce
@@ -14,6 +15,7 @@ from typing_extensions import (
     Awaitable,
     Callable,
     TYPE_CHECKING,
+    Iterable,
     Self,
     Sequence,
     Set,
@@ -22,7 +24,9 @@ from typing_extensions import (
 from .constants import *
 from .token import Token
 from .observer import Observer
-from .validate import validate_net
+from .control import RunControl, current_control
+from .policy import ConflictPolicy
+from .validate import validate_net, validate_arc_connections
 
 
 if TYPE_CHECKING:
@@ -31,17 +35,82 @@ else:
     Queue = asyncio.Queue
 
 
+class ArcFillCounter(object):
+    """
+    Counts the input arcs of a transition which are full.
+
+    Arcs update the count only when their fill level crosses their weight, so
+    checking whether the transition is enabled costs O(1). Transitions whose
+    input arcs are all full are kept in :py:attr:`soyutnet.control.RunControl.enabled`.
+    """
+
+    __slots__ = ("satisfied", "required", "_transition", "_control")
+
+    def __init__(
+        self, transition: "PTCommon", required: int, control: RunControl | None
+    ) -> None:
+        """
+        Constructor.
+
+        :param transition: Transition.
+        :param required: Number of input arcs whose fill levels are counted.
+        :param control: Control of the run.
+        """
+        self.satisfied: int = 0
+        """Number of full input arcs"""
+        self.required: int = required
+        """Number of counted input arcs"""
+        self._transition: ReferenceType["PTCommon"] = ref(transition)
+        """Weak reference to the transition"""
+        self._control: RunControl | None = control
+        """Control of the run"""
+        if required == 0:
+            self._enable()
+
+    def _enable(self) -> None:
+        """
+        Adds the transition to :py:attr:`soyutnet.control.RunControl.enabled`.
+        """
+        transition: PTCommon | None = self._transition()
+        if self._control is not None and transition is not None:
+            self._control.enabled.add(transition)
+
+    def filled(self) -> None:
+        """
+        Called when an input arc becomes full.
+        """
+        self.satisfied += 1
+        if self.satisfied == self.required:
+            self._enable()
+
+    def drained(self) -> None:
+        """
+        Called when a full input arc loses a token.
+        """
+        if self.satisfied == self.required and self._control is not None:
+            transition: PTCommon | None = self._transition()
+            if transition is not None:
+                self._control.enabled.discard(transition)
+        self.satisfied -= 1
+
+
 class Arc(object):
     """
     Defines a generic labeled PT net arc which connects places to transitions or vice versa.
     """
 
+    _counts_fill_level: bool = True
+    """If ``True``, the transition at the end is notified of the fill level \
+    changes by :py:class:`soyutnet.pt_common.ArcFillCounter`. Arcs whose queues are \
+    accessed from other threads are polled instead."""
+
     def __init__(
         self,
         start: Any,
         end: Any,
         weight: int = 1,
         labels: Sequence[label_t] = (GENERIC_LABEL,),
+        validate: bool = True,
     ) -> None:
         """
         Constructor.
@@ -50,6 +119,8 @@ class Arc(object):
         :param end: Place or transition. Output place of a transition (`start`), or output transition of a place (`start`).
         :param weight: Arc weight.
         :param labels: List of arc label.
+        :param validate: If ``False``, ``start`` and ``end`` are assigned without \
+                         validation. The caller is responsible for validating the arc later.
         """
         self._start: ReferenceType[Any] | None = None
         """Input place/transition"""
@@ -64,11 +135,19 @@ class Arc(object):
         self._labels: tuple[label_t, ...] = tuple(labels)
         """The list of arc labels"""
         self._last_processed_label_index: int = 0
+        self._label_mask: int = 0
+        """Bit ``i`` is set if the start PT has tokens with label ``_labels[i]``"""
+        self._fill_counter: ArcFillCounter | None = None
+        """Fill level counter of the transition at the end"""
         self._queue: Queue = Queue(maxsize=weight)
         """Input/output queue for transmitting tokens from :py:attr:`soyutnet.pt_common.Arc.start` to :py:attr:`soyutnet.pt_common.Arc.end`"""
 
-        self.start = start
-        self.end = end
+        if validate:
+            self.start = start
+            self.end = end
+        else:
+            self._start = ref(start) if start is not None else None
+            self._end = ref(end) if end is not None else None
 
     @staticmethod
     def _validate(func: Any) -> Any:  # TODO: Fix annotation
@@ -161,6 +240,11 @@ class Arc(object):
         while count > 0:
             token: TokenType = await self._queue.get()
             self._queue.task_done()
+            if (
+                self._fill_counter is not None
+                and self._queue.qsize() == self.weight - 1
+            ):
+                self._fill_counter.drained()
             count -= 1
             yield token
 
@@ -172,7 +256,25 @@ class Arc(object):
         """
         if not token:
             return
-        await self._queue.put(token)
+        start_ref: Any = self.start
+        control: RunControl | None = None
+        if self._queue.full() and start_ref is not None:
+            control = start_ref._run_control
+            if control is not None:
+                control.park(start_ref)
+        try:
+            await self._queue.put(token)
+        except asyncio.CancelledError:
+            """The run is stopped while the arc is full. The token goes back to
+            the start PT, so it is kept in the final marking."""
+            if start_ref is not None:
+                start_ref._unget_token(token)
+            raise
+        finally:
+            if control is not None:
+                control.unpark(start_ref)
+        if self._fill_counter is not None and self._queue.qsize() == self.weight:
+            self._fill_counter.filled()
 
     def is_enabled(self) -> bool:
         """
@@ -206,7 +308,7 @@ class Arc(object):
             await start_ref._observer.inc_token_count(label, increment)
 
     def get_graphviz_definition(
-        self, t: int = 0, label_names: Dict[int, str] = {}
+        self, t: int | str = 0, label_names: Dict[int, str] = {}
     ) -> str:
         """
         Generates graphviv DOT formated edge definition for the arc.
@@ -236,6 +338,28 @@ class Arc(object):
 
         return ""
 
+    def _pick_label(self) -> label_t | None:
+        """
+        Picks the next label whose tokens are available at the start PT in
+        round-robin order, like iterating :py:func:`soyutnet.pt_common.Arc.labels`
+        with ``remember_last_processed=True`` until a token is found.
+
+        :return: Label or ``None`` if the start PT has no token for the arc.
+        """
+        mask: int = self._label_mask
+        if not mask:
+            return None
+        start: int = self._last_processed_label_index
+        high: int = mask >> start
+        i: int = (
+            start + (high & -high).bit_length() - 1
+            if high
+            else (mask & -mask).bit_length() - 1
+        )
+        self._last_processed_label_index = i + 1 if i + 1 < len(self._labels) else 0
+
+        return self._labels[i]
+
     def labels(
         self, remember_last_processed: bool = False
     ) -> Generator[label_t, None, None]:
@@ -257,6 +381,12 @@ class Arc(object):
             yield self._labels[j]
 
 
+AsyncProcessorType = Callable[["PTCommon"], Awaitable[bool]]
+"""Custom token processing function run on the event loop"""
+BlockingProcessorType = Callable[[TokenWalletType], bool]
+"""Custom token processing function run in an executor"""
+
+
 class PTCommon(Token):
     """
     Base class implementing shared properties of places and transitions.
@@ -266,7 +396,9 @@ class PTCommon(Token):
         self,
         name: str = "",
         initial_tokens: TokenWalletType = {},
-        processor: Callable[["PTCommon"], Awaitable[bool]] | None = None,
+        processor: AsyncProcessorType | None = None,
+        executor: Executor | None = None,
+        blocking_processor: BlockingProcessorType | None = None,
         **kwargs: Any,
     ) -> None:
         """
@@ -277,7 +409,16 @@ class PTCommon(Token):
                                marking of the place.
         :param processor: Custom token processing function that is called between \
                           processing input and output arcs.
+        :param executor: Executor running the blocking callbacks. The default executor \
+                         of the event loop is used if it is ``None``.
+        :param blocking_processor: Synchronous replacement of ``processor`` run in the \
+                                   executor. It is called with a copy of the tokens of \
+                                   the PT instead of the PT, so it can also be run in a \
+                                   ``ProcessPoolExecutor``. The event loop keeps running \
+                                   other PTs while it is in progress.
         """
+        if processor is not None and blocking_processor is not None:
+            raise SoyutNetError(f"PT '{name}' can not have both processor types")
         super().__init__(**kwargs)
         self._name: str = name
         """Name of the PT"""
@@ -291,8 +432,21 @@ class PTCommon(Token):
         """Keeps tokens"""
         self._observer: Observer | None = None
         """Observes the tokens before each firing of output transitions"""
-        self._processor: Callable[["PTCommon"], Awaitable[bool]] | None = processor
+        self._processor: AsyncProcessorType | None = processor
         """Custom token processing function that is called between processing input and output arcs"""
+        self._blocking_processor: BlockingProcessorType | None = blocking_processor
+        """Custom token processing function run in the executor"""
+        self._executor: Executor | None = executor
+        """Executor running the blocking callbacks"""
+        self._run_control: RunControl | None = None
+        """Control of the run executing the PT loop"""
+        self._conflict_policy: ConflictPolicy | None = None
+        """Orders the output arcs. See :py:class:`soyutnet.policy.ConflictPolicy`"""
+        self._conflict_rotation: int = 0
+        """Rotation of the output arcs kept by the conflict policy ordering them"""
+        self._label_arcs: Dict[label_t, list[Tuple[Arc, int]]] = {}
+        """Output arcs and their label bits for each label. See \
+        :py:attr:`soyutnet.pt_common.Arc._label_mask`"""
 
     def __rshift__(
         self, pt_arc: Self | Arc | Set[Self], arc: Arc | None = None
@@ -467,7 +621,11 @@ class PTCommon(Token):
         if not strict and label not in self._tokens:
             self._tokens[label] = []
         try:
-            self._tokens[label].append(id)
+            ids: list[id_t] = self._tokens[label]
+            ids.append(id)
+            if len(ids) == 1:
+                for arc, bit in self._label_arcs.get(label, ()):
+                    arc._label_mask |= bit
         except KeyError as e:
             # TODO: Handle model error
             _, _, exc_tb = sys.exc_info()
@@ -487,7 +645,11 @@ class PTCommon(Token):
         :return: Token.
         """
         try:
-            id: id_t = self._tokens[label].pop(0)
+            ids: list[id_t] = self._tokens[label]
+            id: id_t = ids.pop(0)
+            if not ids:
+                for arc, bit in self._label_arcs.get(label, ()):
+                    arc._label_mask &= ~bit
             return (label, id)
         except KeyError as e:
             """Raised when label is not in ``self._tokens``."""
@@ -508,6 +670,20 @@ class PTCommon(Token):
 
         return tuple()
 
+    def _unget_token(self, token: TokenType) -> None:
+        """
+        Puts back a token taken by :py:func:`soyutnet.pt_common.PTCommon._get_token`,
+        so it is the first one with its label again.
+
+        :param token: A label and ID pair.
+        """
+        label: label_t = token[0]
+        ids: list[id_t] = self._tokens.setdefault(label, [])
+        ids.insert(0, token[1])
+        if len(ids) == 1:
+            for arc, bit in self._label_arcs.get(label, ()):
+                arc._label_mask |= bit
+
     def _get_token_count(self, label: label_t) -> int:
         """
         Get the number of tokens with the given label.
@@ -557,6 +733,7 @@ class PTCommon(Token):
         :return: If ``True`` proceeds to processing tokens and output arcs, else continues waiting for enabled arcs.
         """
         self.net.DEBUG_V(f"{self.ident()}: process_input_arcs")
+        changed: bool = False
         async for arc in self._get_input_arcs():
             if not arc.is_enabled():
                 self.net.DEBUG_V(f"Not enabled {arc}")
@@ -564,29 +741,53 @@ class PTCommon(Token):
             async for token in arc.wait():
                 self.net.DEBUG_V(f"Received '{token}' from {arc}")
                 self._put_token(token)
+                changed = True
                 if self._observer is not None:
                     await self._observer.inc_token_count(token[0])
 
+        if changed:
+            self._marking_changed()
+
         return True
 
+    async def _get_ordered_output_arcs(self) -> AsyncGenerator[Arc, None]:
+        """
+        Iterates through output arcs in the order chosen by the conflict policy of
+        the PT, or the net. If there is no policy, it is the same as
+        :py:func:`soyutnet.pt_common.PTCommon._get_output_arcs`.
+
+        :return: Output arcs.
+        """
+        policy: ConflictPolicy | None = (
+            self._conflict_policy or self.net.conflict_policy
+        )
+        if policy is None:
+            async for arc in self._get_output_arcs():
+                yield arc
+        else:
+            for arc in policy.order(self, self._output_arcs):
+                yield arc
+
     async def _process_output_arcs(self) -> None:
         """
         Sends tokens to the output PTs.
         """
         self.net.DEBUG_V(f"{self.ident()}: process_output_arcs")
-        async for arc in self._get_output_arcs():
+        changed: bool = False
+        async for arc in self._get_ordered_output_arcs():
             if arc.is_enabled():
                 continue
-            token: TokenType = tuple()
-            for label in arc.labels(remember_last_processed=True):
-                token = self._get_token(label)
-                if token:
-                    break
-            if not token:
+            label: label_t | None = arc._pick_label()
+            if label is None:
                 self.net.DEBUG_V(f"No token, skipping '{arc}'")
                 continue
+            token: TokenType = self._get_token(label)
             self.net.DEBUG_V(f"Sending '{token}' to {arc}")
             await arc.send(token)
+            changed = True
+
+        if changed:
+            self._marking_changed()
 
     async def _process_tokens(self) -> bool:
         """
@@ -595,10 +796,19 @@ class PTCommon(Token):
         :return: ``True`` by default, else goes back to :py:func:`soyutnet.pt_common.PTCommon._process_input_arcs`.
         """
         self.net.DEBUG_V(f"{self.ident()}: process_tokens")
-        if self._processor is None:
+        if self._processor is not None:
+            return await self._processor(self)
+
+        if self._blocking_processor is None:
             return True
 
-        return await self._processor(self)
+        tokens: TokenWalletType = {
+            label: list(ids) for label, ids in self._tokens.items()
+        }
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._blocking_processor, tokens
+        )
 
     async def _observe(self, requester: str = "") -> None:
         """
@@ -606,6 +816,49 @@ class PTCommon(Token):
         """
         pass
 
+    def _marking_changed(self) -> None:
+        """
+        Called after the PT acquired or released tokens.
+        """
+        pass
+
+    def _prepare_run(self) -> None:
+        """
+        Called by :py:func:`soyutnet.pt_common._loop` before the first iteration.
+        """
+        self._rebuild_label_index()
+
+    def _index_output_arc(self, arc: Arc) -> None:
+        """
+        Adds an output arc to the label index.
+
+        :param arc: Output arc.
+        """
+        arc._label_mask = 0
+        for i, label in enumerate(arc._labels):
+            bit: int = 1 << i
+            self._label_arcs.setdefault(label, []).append((arc, bit))
+            if self._tokens.get(label):
+                arc._label_mask |= bit
+
+    def _rebuild_label_index(self) -> None:
+        """
+        Rebuilds the label index after the output arcs are replaced or
+        :py:attr:`soyutnet.pt_common.PTCommon._tokens` is modified directly.
+        """
+        self._label_arcs = {}
+        for arc in self._output_arcs:
+            self._index_output_arc(arc)
+
+    def _has_pending_work(self) -> bool:
+        """
+        :return: ``True`` if the PT has callbacks in progress which may move tokens later.
+        """
+        return False
+
+    def _is_transition(self) -> bool:
+        return False
+
     async def _set_initial_marking(self) -> None:
         if self._observer is not None:
             for label in self._tokens:
@@ -649,19 +902,42 @@ class PTCommon(Token):
         :param labels: List of arc labels.
         :return: Output place or transition that ``other`` references.
         """
-        arc: Arc = Arc(start=self, end=other, weight=weight, labels=list(labels))
+        arc: Arc = self._connect(other, weight=weight, labels=labels)
+        self.net.DEBUG_V(f"{self.ident()}: Connected arc: {str(arc)}")
+
+        return other
+
+    def _connect(
+        self,
+        other: Self,
+        weight: int = 1,
+        labels: Sequence[label_t] = (GENERIC_LABEL,),
+        validate: bool = True,
+    ) -> Arc:
+        """
+        Creates the arc between ``self`` and ``other`` and adds the token slots for its labels.
+
+        :param other: The place/transition which it will be connected to.
+        :param weight: Arc weight.
+        :param labels: List of arc labels.
+        :param validate: See :py:class:`soyutnet.pt_common.Arc`.
+        :return: New arc.
+        """
+        arc: Arc = Arc(
+            start=self, end=other, weight=weight, labels=labels, validate=validate
+        )
         self._output_arcs.append(arc)
         other._input_arcs.append(arc)
         arc.index_at_start = len(self._output_arcs) - 1
         arc.index_at_end = len(other._input_arcs) - 1
-        for label in arc.labels():
+        for label in arc._labels:
             if label not in self._tokens:
                 self._tokens[label] = []
             if label not in other._tokens:
                 other._tokens[label] = []
-        self.net.DEBUG_V(f"{self.ident()}: Connected arc: {str(arc)}")
+        self._index_output_arc(arc)
 
-        return other
+        return arc
 
     async def observe(self, requester: str = "") -> None:
         """
@@ -711,6 +987,50 @@ class PTCommon(Token):
         return True
 
 
+EdgeType = (
+    Tuple[PTCommon, PTCommon]
+    | Tuple[PTCommon, PTCommon, int]
+    | Tuple[PTCommon, PTCommon, int, Sequence[label_t]]
+)
+"""(start, end, weight, labels) of an arc. Weight and labels are optional."""
+
+
+def connect_all(edges: Iterable[EdgeType], validate: bool = True) -> list[Arc]:
+    """
+    Creates arcs between many PTs at once.
+
+    It is equivalent to calling :py:func:`soyutnet.pt_common.PTCommon.connect`
+    for each edge, but the connections are validated in a single pass before
+    any arc is created (see :py:func:`soyutnet.validate.validate_arc_connections`),
+    so an invalid batch leaves the PTs unchanged. Arcs are created without
+    per-arc validation and debug messages.
+
+    e.g.
+
+    .. code:: python
+
+       connect_all(zip(places, transitions, weights, labels))
+
+    :param edges: Iterable of ``(start, end)``, ``(start, end, weight)`` or \
+                  ``(start, end, weight, labels)`` tuples. Columns can be zipped \
+                  from arrays.
+    :param validate: Validates connection types if ``True``.
+    :return: New arcs in the order of ``edges``.
+    """
+    entries: list[Any] = edges if isinstance(edges, list) else list(edges)
+    if validate:
+        validate_arc_connections((entry[0], entry[1]) for entry in entries)
+
+    arcs: list[Arc] = []
+    append = arcs.append
+    for entry in entries:
+        weight: int = int(entry[2]) if len(entry) > 2 else 1
+        labels: Sequence[label_t] = entry[3] if len(entry) > 3 else (GENERIC_LABEL,)
+        append(entry[0]._connect(entry[1], weight, labels, validate=False))
+
+    return arcs
+
+
 async def _loop(pt: PTCommon) -> None:
     """
     Task function assigned to the PT.
@@ -723,10 +1043,28 @@ async def _loop(pt: PTCommon) -> None:
     else:
         return
 
+    control: RunControl | None = current_control()
+    pt._run_control = control
+    pt._prepare_run()
+
     await pt._set_initial_marking()
     pt.net.DEBUG_V(f"{pt.ident()}: Loop started")
 
-    while await pt.should_continue():
-        await pt.net.sleep(pt.net.LOOP_DELAY)
+    try:
+        if control is None:
+            while await pt.should_continue():
+                await pt.net.sleep(pt.net.LOOP_DELAY)
+        elif not control.detects_quiescence:
+            while not control.stopped and await pt.should_continue():
+                await pt.net.sleep(pt.net.LOOP_DELAY)
+        else:
+            while not control.stopped:
+                activity: int = control.activity
+                if not await pt.should_continue():
+                    break
+                control.iteration_done(pt, activity)
+                await pt.net.sleep(pt.net.LOOP_DELAY)
+    finally:
+        pt._run_control = None
 
     pt.net.DEBUG_V(f"{pt.ident()}: Loop ended")
@@ -1,5 +1,6 @@
 import os
 import asyncio
+from itertools import chain
 from typing_extensions import (
     Any,
     Dict,
@@ -8,10 +9,14 @@ from typing_extensions import (
     Generator,
     Tuple,
     Coroutine,
+    Iterable,
+    Sequence,
+    Set,
+    TextIO,
 )
 
 from .constants import *
-from .pt_common import PTCommon, _loop
+from .pt_common import PTCommon, Arc, _loop
 from .observer import Observer, ObserverRecordType, MergedRecordsType
 from .token import Token
 from .place import Place, SpecialPlace
@@ -190,6 +195,41 @@ class PTRegistry(Registry):
             for entry in self._directory[label]:
                 yield _loop(entry[1])
 
+    def get_connected_components(self) -> list[list[PTCommon]]:
+        """
+        Groups the registered PTs which are connected by arcs in either direction.
+
+        :return: List of connected components in the order of registry entries.
+        """
+        pts: list[PTCommon] = [
+            e[1] for e in self.entries() if isinstance(e[1], PTCommon)
+        ]
+        parent: Dict[PTCommon, PTCommon] = {pt: pt for pt in pts}
+
+        def find(pt: PTCommon) -> PTCommon:
+            root: PTCommon = pt
+            while parent[root] is not root:
+                root = parent[root]
+            while parent[pt] is not root:
+                parent[pt], pt = root, parent[pt]
+            return root
+
+        for pt in pts:
+            for arc in pt._output_arcs:
+                end: Any = arc.end
+                if end is None or end not in parent:
+                    continue
+                a: PTCommon = find(pt)
+                b: PTCommon = find(end)
+                if a is not b:
+                    parent[b] = a
+
+        components: Dict[PTCommon, list[PTCommon]] = {}
+        for pt in pts:
+            components.setdefault(find(pt), []).append(pt)
+
+        return list(components.values())
+
     def register(self, pt: PTCommon) -> id_t:  # type: ignore[override]
         """
         Registers a PT.
@@ -239,7 +279,16 @@ class PTRegistry(Registry):
         output.sort(key=lambda rec: rec[1][0])
         return output
 
-    def _get_graphviz_node_definition(self, pt: PTCommon, t: int) -> str:
+    @staticmethod
+    def _get_graphviz_node_attributes(pt_type: type, highlighted: bool = False) -> str:
+        """
+        Generates the Graphviz node attributes shared by all PTs of a type.
+
+        :param pt_type: Type of the PT.
+        :param highlighted: Colors the transitions that fire in a frame of \
+                            :py:func:`soyutnet.registry.PTRegistry.iter_graph_frames`.
+        :return: Node attributes with an ``xlabel`` placeholder.
+        """
         shape: str = "circle"
         color: str = "#000000"
         fillcolor: str = "#dddddd"
@@ -248,38 +297,177 @@ class PTRegistry(Registry):
         fontsize: int = 20
         penwidth: int = 3
         style: str = "filled"
-        if isinstance(pt, Transition):
+        if issubclass(pt_type, Transition):
             shape = "box"
             color = "#cccccc"
             fillcolor = "#000000"
             height = 0.25
             width = 1.25
-        elif isinstance(pt, SpecialPlace):
+            if highlighted:
+                color = fillcolor = "#d62728"
+        elif issubclass(pt_type, SpecialPlace):
             fillcolor = "#777777"
-        node_fmt: str = (
-            """{}_{} [shape="{}",fontsize="{}",style="{}",color="{}",fillcolor="{}",label="",xlabel="{}",height="{}",width="{}",penwidth={}];"""
-        )
 
-        return node_fmt.format(
-            pt._name,
-            t,
-            shape,
-            fontsize,
-            style,
-            color,
-            fillcolor,
-            pt._name,
-            height,
-            width,
-            penwidth,
+        return (
+            f'[shape="{shape}",fontsize="{fontsize}",style="{style}",color="{color}",'
+            f'fillcolor="{fillcolor}",label="",xlabel="{{}}",height="{height}",'
+            f'width="{width}",penwidth={penwidth}];'
         )
 
+    def _get_graphviz_node_definition(
+        self, pt: PTCommon, t: int | str, cache: Dict[type, str] | None = None
+    ) -> str:
+        """
+        Generates Graphviz node definition of a PT.
+
+        :param pt: PT.
+        :param t: Event index for clustering multiple steps of PT net simulation.
+        :param cache: Node attributes computed before, by PT type.
+        :return: Node definition.
+        """
+        pt_type: type = type(pt)
+        attributes: str | None = None if cache is None else cache.get(pt_type)
+        if attributes is None:
+            attributes = self._get_graphviz_node_attributes(pt_type)
+            if cache is not None:
+                cache[pt_type] = attributes
+
+        name: str = pt._name
+        return f"{name}_{t} " + attributes.replace("{}", name, 1)
+
+    def get_neighborhood(
+        self, pts: Iterable[PTCommon], radius: int = 1
+    ) -> Set[PTCommon]:
+        """
+        Finds the PTs which can be reached from the given PTs by following at most
+        ``radius`` arcs in either direction.
+
+        :param pts: Center PTs.
+        :param radius: Maximum number of arcs between a center and a found PT.
+        :return: Center PTs and their neighbors.
+        """
+        found: Set[PTCommon] = set(pts)
+        frontier: list[PTCommon] = list(found)
+        for _ in range(radius):
+            next_frontier: list[PTCommon] = []
+            for pt in frontier:
+                for arc in chain(pt._input_arcs, pt._output_arcs):
+                    for other in (arc.start, arc.end):
+                        if other is not None and other not in found:
+                            found.add(other)
+                            next_frontier.append(other)
+            frontier = next_frontier
+
+        return found
+
+    def _get_graph_pts(
+        self, selected: Set[PTCommon] | None, ignore_dangling_pts: bool
+    ) -> Generator[PTCommon, None, None]:
+        """
+        Yields the PTs included in the graph in the order of registry entries.
+
+        :param selected: If not ``None``, only these PTs are included.
+        :param ignore_dangling_pts: Skips the PTs with no input/output connections.
+        :return: PTs.
+        """
+        for e in self.entries():
+            obj: Any = e[1]
+            if not isinstance(obj, PTCommon):
+                continue
+            elif selected is not None and obj not in selected:
+                continue
+            elif ignore_dangling_pts and obj.is_dangling():
+                continue
+            yield obj
+
+    @staticmethod
+    def _get_graph_arcs(
+        pts: Sequence[PTCommon], selected: Set[PTCommon] | None
+    ) -> list[Arc]:
+        """
+        Collects the input arcs of the PTs included in the graph.
+
+        The arcs are sorted once, by their end PTs in the given order and then by
+        the names of their start PTs, as in :py:func:`soyutnet.pt_common.PTCommon.get_sorted_input_arcs`.
+
+        :param pts: PTs included in the graph. See :py:func:`soyutnet.registry.PTRegistry._get_graph_pts`.
+        :param selected: If not ``None``, only arcs between these PTs are included.
+        :return: Arcs.
+        """
+        keyed: list[Tuple[int, str, Arc]] = []
+        for i, obj in enumerate(pts):
+            for arc in obj._input_arcs:
+                start: Any = arc.start
+                if selected is not None and start not in selected:
+                    continue
+                keyed.append((i, start._name, arc))
+        keyed.sort(key=lambda entry: entry[:2])
+
+        return [entry[2] for entry in keyed]
+
+    def iter_graph(
+        self,
+        net_name: str = "Net",
+        indent: str = "\t",
+        label_names: Dict[label_t, str] = {},
+        ignore_dangling_pts: bool = True,
+        pts: Iterable[PTCommon] | None = None,
+        radius: int = 0,
+    ) -> Generator[str, None, None]:
+        """
+        Yields the lines of the graph definition in Graphviz dot text format.
+
+        The registry is traversed once. Nodes are written while the included PTs
+        are collected, then the arcs of the collected PTs are written, so the
+        graph text is never kept in memory as a whole.
+
+        :param net_name: Given name of the PT net
+        :param indent: Indentation string used in sub-blocks of dot text format
+        :param label_names: Readable version of ``label_t`` types.
+        :param ignore_dangling_pts: The PTs with no input/output connections are ignored \
+                                    when it is set.
+        :param pts: If provided, only these PTs and their neighbors are included.
+        :param radius: Size of the neighborhood of ``pts``. \
+                       See :py:func:`soyutnet.registry.PTRegistry.get_neighborhood`.
+        :return: Lines ending with ``os.linesep``.
+        """
+        eol: str = os.linesep
+        selected: Set[PTCommon] | None = None
+        if pts is not None:
+            selected = self.get_neighborhood(pts, radius)
+
+        node_indent: str = 2 * indent
+        cache: Dict[type, str] = {}
+        yield f"digraph {net_name} {{" + eol
+        yield indent + "subgraph cluster_0 {" + eol
+        included: list[PTCommon] = []
+        for obj in self._get_graph_pts(selected, ignore_dangling_pts):
+            included.append(obj)
+            yield node_indent + self._get_graphviz_node_definition(obj, 0, cache) + eol
+        for arc in self._get_graph_arcs(included, selected):
+            yield node_indent + arc.get_graphviz_definition(
+                t=0, label_names=label_names
+            ) + eol
+        yield indent + "}" + eol
+        yield indent + "clusterrank=none;" + eol
+        yield "}" + eol
+
+    def write_graph(self, fh: TextIO, **kwargs: Any) -> None:
+        """
+        Writes the graph definition in Graphviz dot text format to a file.
+
+        :param fh: Text file object.
+        :param kwargs: See :py:func:`soyutnet.registry.PTRegistry.iter_graph`.
+        """
+        fh.writelines(self.iter_graph(**kwargs))
+
     def generate_graph(
         self,
         net_name: str = "Net",
         indent: str = "\t",
         label_names: Dict[label_t, str] = {},
         ignore_dangling_pts: bool = True,
+        **kwargs: Any,
     ) -> str:
         """
         Generated graph definition in Graphviz dot text format.
@@ -289,31 +477,156 @@ class PTRegistry(Registry):
         :param label_names: Readable version of ``label_t`` types.
         :param ignore_dangling_pts: The PTs with no input/output connections are ignored \
                                     when it is set.
+        :param kwargs: See :py:func:`soyutnet.registry.PTRegistry.iter_graph`.
+        """
+        return "".join(
+            self.iter_graph(
+                net_name=net_name,
+                indent=indent,
+                label_names=label_names,
+                ignore_dangling_pts=ignore_dangling_pts,
+                **kwargs,
+            )
+        )
+
+    @staticmethod
+    def _get_marking_text(
+        tokens: Tuple[TokenType, ...], label_names: Dict[label_t, str]
+    ) -> str:
+        """
+        Formats the token counts in an observer record as a node label.
+
+        :param tokens: ``(label, count)`` pairs.
+        :param label_names: Readable version of ``label_t`` types.
+        :return: Total count if only generic tokens exist, else ``label:count`` lines.
+        """
+        if all(l == GENERIC_LABEL and l not in label_names for l, _ in tokens):
+            return str(sum(count for _, count in tokens))
+
+        return "\\n".join(
+            f"{label_names.get(l, l)}:{count}" for l, count in tokens if count != 0
+        )
+
+    def iter_graph_frames(
+        self,
+        records: MergedRecordsType | None = None,
+        net_name: str = "Net",
+        indent: str = "\t",
+        label_names: Dict[label_t, str] = {},
+        ignore_dangling_pts: bool = True,
+        single_graph: bool = True,
+    ) -> Generator[str, None, None]:
+        """
+        Yields the lines of the net graph at the time of each firing.
+
+        Consecutive observer records requested by the same transition are grouped
+        into a frame. Each frame shows the markings of observed places just before
+        the firing, and the firing transition is highlighted. Frame ``t`` is a
+        cluster named ``cluster_t`` whose nodes are suffixed by ``_t``, as in
+        :py:func:`soyutnet.pt_common.Arc.get_graphviz_definition`.
+
+        Node and arc definitions are generated once and only the markings and
+        highlighted transitions are updated per frame.
+
+        :param records: Observer records, see :py:func:`soyutnet.registry.PTRegistry.get_merged_records`. \
+                        All records are used if it is ``None``.
+        :param net_name: Given name of the PT net
+        :param indent: Indentation string used in sub-blocks of dot text format
+        :param label_names: Readable version of ``label_t`` types.
+        :param ignore_dangling_pts: The PTs with no input/output connections are ignored \
+                                    when it is set.
+        :param single_graph: If ``True``, all frames are clusters of a single graph, \
+                             else a separate graph is generated for each frame.
+        :return: Lines ending with ``os.linesep``.
         """
         eol: str = os.linesep
-        gv: str = f"digraph {net_name} {{" + eol
-        gv_nodes: str = ""
-        gv_arcs: str = ""
-        for e in self.entries():
-            obj: Any = e[1]
-            if not isinstance(obj, PTCommon):
-                continue
-            elif ignore_dangling_pts and obj.is_dangling():
-                continue
-            node_def: str = self._get_graphviz_node_definition(obj, 0)
-            gv_nodes += 2 * indent + node_def + eol
-            for arc in obj.get_sorted_input_arcs():
-                gv_arcs += (
-                    2 * indent
-                    + arc.get_graphviz_definition(t=0, label_names=label_names)
+        node_indent: str = 2 * indent
+        sentinel: str = "\0"
+        """Placeholder of the frame index in node and arc templates"""
+        if records is None:
+            records = self.get_merged_records()
+
+        places: list[Tuple[str, str, str]] = []
+        """(name, template before marking, template after marking)"""
+        transitions: Dict[str, Tuple[str, str]] = {}
+        """name: (template, highlighted template)"""
+        arcs: list[str] = []
+        pts: list[PTCommon] = list(self._get_graph_pts(None, ignore_dangling_pts))
+        for obj in pts:
+            definition: str = self._get_graphviz_node_definition(obj, sentinel)
+            if isinstance(obj, Transition):
+                highlighted: str = f"{obj._name}_{sentinel} " + (
+                    self._get_graphviz_node_attributes(type(obj), True).replace(
+                        "{}", obj._name, 1
+                    )
+                )
+                transitions[obj._name] = (definition, highlighted)
+            else:
+                head, _, tail = definition.partition('label=""')
+                places.append((obj._name, head + 'label="', '"' + tail))
+        for arc in self._get_graph_arcs(pts, None):
+            arcs.append(arc.get_graphviz_definition(sentinel, label_names))
+
+        time_format: str = f".{self.net.FLOAT_DECIMAL_PLACE_FORMAT}f"
+
+        def frame(
+            t: int, time: float, fired: str, marking: Dict[str, str]
+        ) -> Generator[str, None, None]:
+            ts: str = str(t)
+            if not single_graph:
+                yield f"digraph {net_name}_{ts} {{" + eol
+            yield indent + f"subgraph cluster_{ts} {{" + eol
+            yield node_indent + f'label="{time:{time_format}} {fired}";' + eol
+            for name, head, tail in places:
+                yield node_indent + (
+                    head.replace(sentinel, ts)
+                    + marking.get(name, "")
+                    + tail.replace(sentinel, ts)
                     + eol
                 )
+            for name, (normal, highlighted) in transitions.items():
+                template: str = highlighted if name == fired else normal
+                yield node_indent + template.replace(sentinel, ts) + eol
+            for template in arcs:
+                yield node_indent + template.replace(sentinel, ts) + eol
+            yield indent + "}" + eol
+            if not single_graph:
+                yield "}" + eol
+
+        if single_graph:
+            yield f"digraph {net_name} {{" + eol
+
+        marking: Dict[str, str] = {}
+        group: Set[str] = set()
+        """Places observed in the current frame"""
+        t: int = 0
+        time: float = 0.0
+        fired: str = ""
+        for name, record in records:
+            if len(record) < 3:
+                continue
+            requester: str = record[2]
+            if group and (requester != fired or name in group):
+                yield from frame(t, time, fired, marking)
+                t += 1
+                group.clear()
+            if not group:
+                time = record[0]
+                fired = requester
+            group.add(name)
+            marking[name] = self._get_marking_text(record[1], label_names)
+        if group:
+            yield from frame(t, time, fired, marking)
+
+        if single_graph:
+            yield "}" + eol
+
+    def write_graph_frames(self, fh: TextIO, **kwargs: Any) -> None:
+        """
+        Writes the frames generated by :py:func:`soyutnet.registry.PTRegistry.iter_graph_frames`
+        to a file.
 
-        gv += indent + "subgraph cluster_0 {" + eol
-        gv += gv_nodes
-        gv += gv_arcs
-        gv += indent + "}" + eol
-        gv += indent + "clusterrank=none;" + eol
-        gv += "}" + eol
-
-        return gv
+        :param fh: Text file object.
+        :param kwargs: See :py:func:`soyutnet.registry.PTRegistry.iter_graph_frames`.
+        """
+        fh.writelines(self.iter_graph_frames(**kwargs))
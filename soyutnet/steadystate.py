@@ -0,0 +1,353 @@
+import math
+import asyncio
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing_extensions import (
+    Any,
+    Callable,
+    Dict,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from .constants import *
+from .control import current_control, RunControl
+
+if TYPE_CHECKING:
+    from .transition import Transition
+    from .observer import StatisticsObserver
+else:
+    Transition = Any
+    StatisticsObserver = Any
+
+
+def t_quantile(p: float, df: int) -> float:
+    """
+    Approximates the quantile of Student's t-distribution by the Cornish-Fisher
+    expansion around the normal quantile. The error is below ``1e-3`` for
+    ``df >= 5`` and the usual confidence levels.
+
+    :param p: Probability.
+    :param df: Degrees of freedom.
+    :return: Quantile.
+    """
+    z: float = NormalDist().inv_cdf(p)
+    if df <= 0:
+        return math.inf
+    z3: float = z**3
+    z5: float = z**5
+    z7: float = z**7
+
+    return (
+        z
+        + (z3 + z) / (4 * df)
+        + (5 * z5 + 16 * z3 + 3 * z) / (96 * df**2)
+        + (3 * z7 + 19 * z5 + 17 * z3 - 15 * z) / (384 * df**3)
+    )
+
+
+@dataclass
+class SteadyStateEstimate:
+    """
+    Confidence interval of a steady-state mean.
+    """
+
+    mean: float = 0.0
+    """Mean of the batch means after the warmup"""
+    half_width: float = math.inf
+    """Half width of the confidence interval"""
+    batches: int = 0
+    """Number of batches after the warmup"""
+    warmup: int = 0
+    """Number of observations deleted as the warmup transient"""
+    observations: int = 0
+    """Number of observations"""
+
+    @property
+    def relative_half_width(self) -> float:
+        if self.mean == 0:
+            return math.inf
+
+        return self.half_width / abs(self.mean)
+
+
+class BatchMeans(object):
+    """
+    Incremental batch means estimator of the steady-state mean of an output
+    series with MSER warmup detection.
+
+    Observations are averaged in batches. When the number of batches reaches
+    twice ``batch_count``, adjacent batches are merged and the batch size is
+    doubled, so the memory is constant and the batches get longer, i.e. less
+    correlated, as the run goes on.
+
+    The warmup transient is detected by the MSER rule applied to the batch
+    means: the first ``d`` batches minimizing the standard error of the mean
+    of the rest are deleted. ``d`` is limited to the first half of the batches.
+    """
+
+    def __init__(self, batch_count: int = 20, confidence: float = 0.95) -> None:
+        """
+        Constructor.
+
+        :param batch_count: Minimum number of batches kept after a merge.
+        :param confidence: Confidence level of the intervals.
+        """
+        self._batch_count: int = max(2, batch_count)
+        """Minimum number of batches kept after a merge"""
+        self._confidence: float = confidence
+        """Confidence level of the intervals"""
+        self._batch_size: int = 1
+        """Number of observations of each batch"""
+        self._batches: list[float] = []
+        """Means of the complete batches"""
+        self._sum: float = 0.0
+        """Sum of the observations of the incomplete batch"""
+        self._count: int = 0
+        """Number of observations of the incomplete batch"""
+        self.observations: int = 0
+        """Number of observations"""
+
+    def add(self, value: float) -> None:
+        """
+        Adds an observation.
+
+        :param value: Observation.
+        """
+        self.observations += 1
+        self._sum += value
+        self._count += 1
+        if self._count < self._batch_size:
+            return
+        self._batches.append(self._sum / self._count)
+        self._sum = 0.0
+        self._count = 0
+        batches: list[float] = self._batches
+        if len(batches) >= 2 * self._batch_count:
+            self._batches = [
+                (batches[i] + batches[i + 1]) / 2 for i in range(0, len(batches), 2)
+            ]
+            self._batch_size *= 2
+
+    def _get_warmup(self) -> int:
+        """
+        Applies the MSER rule to the batch means.
+
+        :return: Number of batches to delete.
+        """
+        batches: list[float] = self._batches
+        n: int = len(batches)
+        best: Tuple[float, int] = (math.inf, 0)
+        total: float = 0.0
+        total_sq: float = 0.0
+        """Sums of the batches after ``d``, accumulated backwards."""
+        sums: list[Tuple[float, float]] = [(0.0, 0.0)] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            total += batches[i]
+            total_sq += batches[i] ** 2
+            sums[i] = (total, total_sq)
+        for d in range(n // 2 + 1):
+            k: int = n - d
+            if k < 2:
+                break
+            s, sq = sums[d]
+            mean: float = s / k
+            mser: float = max(0.0, sq / k - mean**2) / k
+            if mser < best[0]:
+                best = (mser, d)
+
+        return best[1]
+
+    def estimate(self) -> SteadyStateEstimate:
+        """
+        Computes the confidence interval of the steady-state mean.
+
+        :return: Estimate. The half width is infinite if there are less than two \
+                 batches after the warmup.
+        """
+        d: int = self._get_warmup()
+        batches: list[float] = self._batches[d:]
+        output: SteadyStateEstimate = SteadyStateEstimate(
+            batches=len(batches),
+            warmup=d * self._batch_size,
+            observations=self.observations,
+        )
+        n: int = len(batches)
+        if n == 0:
+            return output
+        output.mean = sum(batches) / n
+        if n < 2:
+            return output
+        variance: float = sum((b - output.mean) ** 2 for b in batches) / (n - 1)
+        output.half_width = t_quantile((1 + self._confidence) / 2, n - 1) * math.sqrt(
+            variance / n
+        )
+
+        return output
+
+
+PrecisionHookType = Callable[[Dict[str, SteadyStateEstimate]], None]
+"""Called with the estimates when the target precision is reached"""
+
+
+class SteadyStateMonitor(object):
+    """
+    Estimates the steady-state throughputs of transitions and mean occupancies of
+    places during a run, and stops the run when all estimates reach a target
+    precision.
+
+    .. code:: python
+
+        monitor = SteadyStateMonitor(period=0.01, relative_precision=0.05)
+        monitor.add_throughput(t)
+        monitor.add_occupancy(net.StatisticsObserver(), label=GENERIC_LABEL)
+        soyutnet.run(reg, extra_routines=[monitor.run()])
+        print(monitor.estimates())
+
+    :py:func:`soyutnet.steadystate.SteadyStateMonitor.run` samples the metrics
+    once in each period: the number of firings of each transition per second,
+    and the time-weighted mean token count of each place in the period given by
+    a :py:class:`soyutnet.observer.StatisticsObserver`. Each series is fed to a
+    :py:class:`soyutnet.steadystate.BatchMeans` estimator.
+    """
+
+    def __init__(
+        self,
+        period: float = 0.01,
+        relative_precision: float = 0.05,
+        confidence: float = 0.95,
+        batch_count: int = 20,
+        min_batches: int = 10,
+        stop: bool = True,
+        on_precision: PrecisionHookType | None = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param period: Sampling period in seconds measured by :py:func:`soyutnet.SoyutNet.time`.
+        :param relative_precision: Target ratio of the half width of the \
+                                   confidence intervals to the means.
+        :param confidence: Confidence level of the intervals.
+        :param batch_count: See :py:class:`soyutnet.steadystate.BatchMeans`.
+        :param min_batches: Minimum number of batches after the warmup before the \
+                            precision is checked.
+        :param stop: Stops the run with the reason ``precision`` when the target \
+                     precision is reached.
+        :param on_precision: Called when the target precision is reached.
+        """
+        self._period: float = period
+        """Sampling period"""
+        self._relative_precision: float = relative_precision
+        """Target relative half width"""
+        self._confidence: float = confidence
+        """Confidence level"""
+        self._batch_count: int = batch_count
+        """Minimum number of batches kept after a merge"""
+        self._min_batches: int = min_batches
+        """Minimum number of batches after the warmup"""
+        self._stop: bool = stop
+        """Stops the run when the precision is reached"""
+        self._on_precision: PrecisionHookType | None = on_precision
+        """Called when the precision is reached"""
+        self._throughputs: Dict[str, Tuple[Transition, BatchMeans]] = {}
+        """Monitored transitions"""
+        self._occupancies: Dict[str, Tuple[StatisticsObserver, label_t, BatchMeans]] = (
+            {}
+        )
+        """Monitored observers"""
+        self.precision_reached: bool = False
+        """Set when all estimates reach the target precision"""
+
+    def add_throughput(self, transition: Transition, name: str = "") -> None:
+        """
+        Monitors the throughput of a transition.
+
+        :param transition: Transition.
+        :param name: Name of the estimate. The name of the transition is used if it is empty.
+        """
+        self._throughputs[name or transition._name] = (
+            transition,
+            BatchMeans(self._batch_count, self._confidence),
+        )
+
+    def add_occupancy(
+        self,
+        observer: StatisticsObserver,
+        label: label_t = GENERIC_LABEL,
+        name: str = "",
+    ) -> None:
+        """
+        Monitors the mean token count of a place.
+
+        :param observer: Statistics observer of the place.
+        :param label: Label.
+        :param name: Name of the estimate. The identity of the observer is used if it is empty.
+        """
+        self._occupancies[name or f"{observer.ident()}:{label}"] = (
+            observer,
+            label,
+            BatchMeans(self._batch_count, self._confidence),
+        )
+
+    def estimates(self) -> Dict[str, SteadyStateEstimate]:
+        """
+        Returns the current estimates.
+
+        :return: Estimate of each metric given by its name.
+        """
+        output: Dict[str, SteadyStateEstimate] = {}
+        for name, (_, estimator) in self._throughputs.items():
+            output[name] = estimator.estimate()
+        for name, (_, _, estimator) in self._occupancies.items():
+            output[name] = estimator.estimate()
+
+        return output
+
+    def _is_precise(self, estimates: Dict[str, SteadyStateEstimate]) -> bool:
+        return bool(estimates) and all(
+            e.batches >= self._min_batches
+            and e.relative_half_width <= self._relative_precision
+            for e in estimates.values()
+        )
+
+    async def run(self) -> None:
+        """
+        Samples the metrics until the target precision is reached. It is run as
+        an extra routine of :py:func:`soyutnet.run`.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        firings: Dict[str, int] = {
+            name: t.get_no_of_times_enabled()
+            for name, (t, _) in self._throughputs.items()
+        }
+        areas: Dict[str, float] = {
+            name: observer._get_accumulator(label).area
+            for name, (observer, label, _) in self._occupancies.items()
+        }
+        last: float = loop.time()
+        while True:
+            await asyncio.sleep(self._period)
+            now: float = loop.time()
+            elapsed: float = now - last
+            last = now
+            if elapsed <= 0:
+                continue
+            for name, (t, estimator) in self._throughputs.items():
+                count: int = t.get_no_of_times_enabled()
+                estimator.add((count - firings[name]) / elapsed)
+                firings[name] = count
+            for name, (observer, label, estimator) in self._occupancies.items():
+                area: float = observer._get_accumulator(label).area
+                estimator.add((area - areas[name]) / elapsed)
+                areas[name] = area
+
+            estimates: Dict[str, SteadyStateEstimate] = self.estimates()
+            if not self._is_precise(estimates):
+                continue
+            self.precision_reached = True
+            if self._on_precision is not None:
+                self._on_precision(estimates)
+            control: RunControl | None = current_control()
+            if self._stop and control is not None:
+                control.stop("precision")
+            return
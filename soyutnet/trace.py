@@ -0,0 +1,250 @@
+import os
+import mmap
+import struct
+import asyncio
+from concurrent.futures import Executor
+from typing_extensions import (
+    Any,
+    Literal,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+from .constants import *
+
+if TYPE_CHECKING:
+    from .place import SpecialPlace
+else:
+    SpecialPlace = Any
+
+TRACE_RECORD_FORMAT: str = "<dqq"
+"""Binary trace record: timestamp in seconds, label and ID"""
+
+TraceRecordType = Tuple[float, label_t, id_t]
+"""Trace record type"""
+
+_RECORD: struct.Struct = struct.Struct(TRACE_RECORD_FORMAT)
+
+
+def write_trace(path: str, records: list[TraceRecordType], binary: bool = True) -> None:
+    """
+    Writes a trace file for :py:class:`soyutnet.trace.TraceSource`.
+
+    :param path: Path of the trace file.
+    :param records: Records sorted by their timestamps.
+    :param binary: Writes :py:attr:`soyutnet.trace.TRACE_RECORD_FORMAT` records if set, \
+                   else ``timestamp,label,id`` lines.
+    """
+    with open(path, "wb") as fh:
+        if binary:
+            for record in records:
+                fh.write(_RECORD.pack(*record))
+        else:
+            fh.writelines(f"{t!r},{label},{id}\n".encode() for t, label, id in records)
+
+
+def _parse_binary(buffer: mmap.mmap, start: int, end: int) -> list[TraceRecordType]:
+    return list(_RECORD.iter_unpack(buffer[start:end]))
+
+
+def _parse_csv(buffer: mmap.mmap, start: int, end: int) -> list[TraceRecordType]:
+    records: list[TraceRecordType] = []
+    for line in buffer[start:end].splitlines():
+        if not line.strip():
+            continue
+        t, label, id = line.split(b",")
+        records.append((float(t), int(label), int(id)))
+
+    return records
+
+
+class TraceSource(object):
+    """
+    Demand driven token source replaying a recorded trace. See the ``source``
+    argument of :py:class:`soyutnet.place.SpecialPlace`.
+
+    .. code:: python
+
+        p = net.SpecialPlace("arrivals", source=TraceSource("day.trace"))
+
+    The trace file is memory mapped and parsed in chunks in an executor. The next
+    chunk is parsed while the tokens of the current one are injected, so the event
+    loop does not parse lines. Each token is injected when
+    :py:func:`soyutnet.SoyutNet.time` reaches its timestamp relative to the first
+    request of the place, so replays run in real time, or in virtual time with
+    :py:class:`soyutnet.clock.VirtualClockEventLoop`.
+
+    A binary trace is a sequence of :py:attr:`soyutnet.trace.TRACE_RECORD_FORMAT`
+    records, a CSV trace has a ``timestamp,label,id`` line per token. Records must
+    be sorted by their timestamps.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        format: Literal["binary", "csv"] = "binary",
+        chunk_size: int = 1 << 20,
+        time_offset: float = 0.0,
+        time_scale: float = 1.0,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param path: Path of the trace file.
+        :param format: ``binary`` or ``csv``.
+        :param chunk_size: Approximate number of bytes parsed at once.
+        :param time_offset: Subtracted from the timestamps, e.g. the start of the recording.
+        :param time_scale: Multiplies the timestamps. Replays are faster if it is less than ``1``.
+        :param executor: Executor parsing the chunks. The default executor of the event \
+                         loop is used if it is ``None``.
+        """
+        self._path: str = path
+        """Path of the trace file"""
+        self._binary: bool = format == "binary"
+        """Format of the trace file"""
+        self._chunk_size: int = max(_RECORD.size, chunk_size)
+        """Approximate number of bytes parsed at once"""
+        if self._binary:
+            self._chunk_size -= self._chunk_size % _RECORD.size
+        self._time_offset: float = time_offset
+        """Subtracted from the timestamps"""
+        self._time_scale: float = time_scale
+        """Multiplies the timestamps"""
+        self._executor: Executor | None = executor
+        """Executor parsing the chunks"""
+        self._file: Any = None
+        """Trace file"""
+        self._buffer: mmap.mmap | None = None
+        """Memory map of the trace file"""
+        self._offset: int = 0
+        """Offset of the next chunk"""
+        self._chunk_start: int = 0
+        """Offset of the chunk parsed in the executor"""
+        self._records: list[TraceRecordType] = []
+        """Records of the current chunk"""
+        self._index: int = 0
+        """Index of the next record in the current chunk"""
+        self._next_chunk: asyncio.Future[list[TraceRecordType]] | None = None
+        """Next chunk parsed in the executor"""
+        self._start_time: float | None = None
+        """Time of the first request"""
+        self.exhausted: bool = False
+        """Set when all records are injected"""
+
+    def _open(self) -> None:
+        self._file = open(self._path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self.close()
+            return
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """
+        Closes the trace file. It is called when all records are injected.
+        """
+        self.exhausted = True
+        if self._next_chunk is not None:
+            self._next_chunk.cancel()
+            self._next_chunk = None
+        self._close_file()
+
+    async def release(self) -> None:
+        """
+        Closes the trace file at the end of a run. The next run opens it again and
+        continues from the first record which is not injected.
+        """
+        chunk: asyncio.Future[list[TraceRecordType]] | None = self._next_chunk
+        if chunk is not None:
+            self._next_chunk = None
+            self._offset = self._chunk_start
+            await asyncio.wait([chunk])
+        self._close_file()
+
+    def _close_file(self) -> None:
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _submit_chunk(self) -> asyncio.Future[list[TraceRecordType]] | None:
+        """
+        Starts parsing the next chunk in the executor.
+
+        :return: Parsed records or ``None`` if the end of the file is reached.
+        """
+        buffer: mmap.mmap | None = self._buffer
+        if buffer is None or self._offset >= len(buffer):
+            return None
+        start: int = self._offset
+        end: int = min(len(buffer), start + self._chunk_size)
+        if self._binary:
+            end -= (end - start) % _RECORD.size
+            if end <= start:
+                return None
+        elif end < len(buffer):
+            newline: int = buffer.find(b"\n", end)
+            end = len(buffer) if newline < 0 else newline + 1
+        self._chunk_start = start
+        self._offset = end
+        parse = _parse_binary if self._binary else _parse_csv
+
+        return asyncio.get_running_loop().run_in_executor(
+            self._executor, parse, buffer, start, end
+        )
+
+    async def _load_chunk(self) -> bool:
+        """
+        Makes the next parsed chunk current.
+
+        :return: ``False`` if there is no record left.
+        """
+        if self._next_chunk is None:
+            self._next_chunk = self._submit_chunk()
+        while self._next_chunk is not None:
+            self._records = await self._next_chunk
+            self._index = 0
+            self._next_chunk = self._submit_chunk()
+            if self._records:
+                return True
+        self.close()
+
+        return False
+
+    async def __call__(self, place: SpecialPlace, count: int) -> list[TokenType]:
+        """
+        Returns the due tokens. Waits for the next one if none is due.
+
+        :param place: Place requesting tokens.
+        :param count: Maximum number of tokens.
+        :return: Tokens.
+        """
+        if self.exhausted:
+            return []
+        if self._start_time is None:
+            self._start_time = place.net.time()
+        if self._file is None:
+            self._open()
+
+        tokens: list[TokenType] = []
+        """Nothing is awaited after a token is taken, so a stopped run loses no token."""
+        while len(tokens) < count:
+            if self._index >= len(self._records):
+                if tokens or not await self._load_chunk():
+                    break
+            t, label, id = self._records[self._index]
+            delay: float = (
+                self._start_time
+                + (t - self._time_offset) * self._time_scale
+                - place.net.time()
+            )
+            if delay > 0:
+                if tokens:
+                    break
+                await asyncio.sleep(delay)
+            tokens.append((label, id))
+            self._index += 1
+
+        return tokens
@@ -1,17 +1,296 @@
+import math
 import asyncio
+from array import array
+from bisect import bisect_right
+from collections import deque
 from typing_extensions import (
     Any,
     Dict,
+    Iterator,
+    Self,
+    Sequence,
+    overload,
 )
 
 from .constants import *
-from .pt_common import PTCommon
+from .pt_common import PTCommon, Arc, ArcFillCounter
+from .control import RunControl
+from .eventlog import EventLogWriter
 
 FiringRecordType = Tuple[float]
 """Firing record type"""
-FiringHistoryType = list[FiringRecordType]
+FiringHistoryType = Sequence[FiringRecordType]
 """Type for list of firing records"""
 
+_DEFAULT_INTERVAL_BINS: list[float] = [10 ** (e / 4) for e in range(-6 * 4, 2 * 4 + 1)]
+"""Log-spaced inter-firing time bin edges from 1 µs to 100 s, 4 per decade"""
+
+
+class FiringRecords(Sequence[FiringRecordType]):
+    """
+    Compact store of the firing times of a transition.
+
+    Times are kept in an ``array('d')``, 8 bytes per firing. If a limit is given,
+    the array is a ring buffer keeping the latest firings. It is a sequence of
+    :py:attr:`soyutnet.transition.FiringRecordType` tuples for compatibility,
+    which are created only when they are accessed.
+
+    The EWMA rate and the inter-firing time histogram are updated in constant
+    time for each firing and cover all firings, including the ones dropped from
+    the ring buffer. Sliding window rates are computed by binary search on the
+    kept times without copying them.
+    """
+
+    def __init__(
+        self,
+        limit: int = 0,
+        time_constant: float = 1.0,
+        interval_bins: Sequence[float] | None = None,
+    ) -> None:
+        """
+        Constructor.
+
+        :param limit: Maximum number of kept firings. It is unlimited if chosen ``0``.
+        :param time_constant: Time constant of the EWMA rate in seconds.
+        :param interval_bins: Ascending bin edges of the inter-firing time \
+                              histogram in seconds. Log-spaced edges from 1 µs to \
+                              100 s are used if it is ``None``.
+        """
+        self._limit: int = max(0, limit)
+        """Maximum number of kept firings"""
+        self._times: array[float] = (
+            array("d", bytes(8 * self._limit)) if self._limit else array("d")
+        )
+        """Firing times"""
+        self._start: int = 0
+        """Index of the oldest firing in the ring buffer"""
+        self._size: int = 0
+        """Number of kept firings"""
+        self.total: int = 0
+        """Number of firings including the dropped ones"""
+        self._time_constant: float = time_constant
+        """Time constant of the EWMA rate"""
+        self._ewma_rate: float = 0.0
+        """EWMA rate at the last firing"""
+        self._last_time: float | None = None
+        """Time of the last firing"""
+        self._bin_edges: list[float] = list(
+            _DEFAULT_INTERVAL_BINS if interval_bins is None else interval_bins
+        )
+        """Bin edges of the inter-firing time histogram"""
+        self._histogram: array[int] = array("q", bytes(8 * (len(self._bin_edges) + 1)))
+        """Number of inter-firing times in each bin"""
+
+    def append(self, time: float) -> None:
+        """
+        Records a firing.
+
+        :param time: Firing time.
+        """
+        if self._limit:
+            i: int = self._start + self._size
+            if self._size < self._limit:
+                self._size += 1
+            else:
+                self._start = (self._start + 1) % self._limit
+            self._times[i % self._limit] = time
+        else:
+            self._times.append(time)
+            self._size += 1
+        self.total += 1
+
+        last: float | None = self._last_time
+        if last is not None:
+            interval: float = time - last
+            self._histogram[bisect_right(self._bin_edges, interval)] += 1
+            self._ewma_rate *= math.exp(-interval / self._time_constant)
+        self._ewma_rate += 1.0 / self._time_constant
+        self._last_time = time
+
+    def time_at(self, index: int) -> float:
+        """
+        Returns the time of a kept firing.
+
+        :param index: Index from the oldest kept firing. Negative indices count from the latest.
+        :return: Firing time.
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("firing record index out of range")
+        if self._limit:
+            return self._times[(self._start + index) % self._limit]
+
+        return self._times[index]
+
+    def __len__(self) -> int:
+        return self._size
+
+    @overload
+    def __getitem__(self, index: int) -> FiringRecordType: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[FiringRecordType]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> FiringRecordType | list[FiringRecordType]:
+        if isinstance(index, slice):
+            return [(self.time_at(i),) for i in range(*index.indices(self._size))]
+
+        return (self.time_at(index),)
+
+    def __iter__(self) -> Iterator[FiringRecordType]:
+        for i in range(self._size):
+            yield (self.time_at(i),)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FiringRecords):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+
+        return NotImplemented
+
+    def _count_after(self, time: float) -> int:
+        """
+        Counts the kept firings later than the given time by binary search.
+        """
+        low: int = 0
+        high: int = self._size
+        while low < high:
+            middle: int = (low + high) // 2
+            if self.time_at(middle) <= time:
+                low = middle + 1
+            else:
+                high = middle
+
+        return self._size - low
+
+    def get_rate(self, window: float, now: float | None = None) -> float:
+        """
+        Returns the number of firings per second in a sliding window. Only the
+        kept firings are counted if the ring buffer is full.
+
+        :param window: Window length in seconds.
+        :param now: End of the window. The last firing time is used if it is ``None``.
+        :return: Firing rate.
+        """
+        if self._last_time is None or window <= 0:
+            return 0.0
+        end: float = self._last_time if now is None else now
+
+        return (self._count_after(end - window) - self._count_after(end)) / window
+
+    def get_ewma_rate(self, now: float | None = None) -> float:
+        """
+        Returns the exponentially weighted moving average of the firing rate.
+        Each firing adds ``1 / time_constant`` which decays exponentially.
+
+        :param now: Evaluation time. The last firing time is used if it is ``None``.
+        :return: Firing rate.
+        """
+        if self._last_time is None:
+            return 0.0
+        if now is None or now <= self._last_time:
+            return self._ewma_rate
+
+        return self._ewma_rate * math.exp(
+            -(now - self._last_time) / self._time_constant
+        )
+
+    def get_interval_histogram(self) -> list[Tuple[float, float, int]]:
+        """
+        Returns the inter-firing time histogram.
+
+        :return: Lower edge, upper edge and count of each bin. The first and last bins \
+                 are open ended.
+        """
+        edges: list[float] = [-math.inf, *self._bin_edges, math.inf]
+
+        return [
+            (edges[i], edges[i + 1], count) for i, count in enumerate(self._histogram)
+        ]
+
+
+class FiringSubscription(object):
+    """
+    Stream of the firings of a transition. See :py:func:`soyutnet.transition.Transition.subscribe`.
+
+    It is an async iterator returning the records of all firings since the
+    previous iteration as a batch, so a slow subscriber does not miss firings
+    which happen while it is busy. Firings are buffered without a limit by
+    default. If a limit is given and the buffer is full, the oldest records are
+    discarded and counted in :py:attr:`soyutnet.transition.FiringSubscription.dropped`.
+    """
+
+    def __init__(self, transition: "Transition", maxsize: int = 0) -> None:
+        """
+        Constructor.
+
+        :param transition: Transition.
+        :param maxsize: Maximum number of buffered firing records. It is unlimited \
+                        if chosen ``0``.
+        """
+        self._transition: Transition | None = transition
+        """Subscribed transition"""
+        self._buffer: deque[FiringRecordType] = deque(
+            maxlen=maxsize if maxsize > 0 else None
+        )
+        """Firing records which are not delivered yet"""
+        self._waiter: asyncio.Future[None] | None = None
+        """Wakes up the waiting subscriber"""
+        self.dropped: int = 0
+        """Number of discarded firing records"""
+
+    def _publish(self, record: FiringRecordType) -> None:
+        buffer: deque[FiringRecordType] = self._buffer
+        if buffer.maxlen is not None and len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append(record)
+        waiter: asyncio.Future[None] | None = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def close(self) -> None:
+        """
+        Unsubscribes. The buffered records are still delivered, then the iteration ends.
+        """
+        if self._transition is not None:
+            self._transition._subscribers.remove(self)
+            self._transition = None
+        waiter: asyncio.Future[None] | None = self._waiter
+        self._waiter = None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> list[FiringRecordType]:
+        """
+        Waits for firings.
+
+        :return: Records of the firings since the previous call.
+        """
+        while not self._buffer:
+            if self._transition is None:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+        batch: list[FiringRecordType] = list(self._buffer)
+        self._buffer.clear()
+
+        return batch
+
 
 class Transition(PTCommon):
     """
@@ -19,25 +298,79 @@ class Transition(PTCommon):
     """
 
     def __init__(
-        self, name: str = "", record_firing: bool = False, **kwargs: Any
+        self,
+        name: str = "",
+        record_firing: bool = False,
+        priority: int = 0,
+        conflict_weight: float = 1.0,
+        event_log: EventLogWriter | None = None,
+        firing_record_limit: int = 0,
+        **kwargs: Any,
     ) -> None:
         """
         Constructor.
 
         :param name: Name of the transition.
+        :param priority: Transitions with higher priority are served first by the \
+                         input places using :py:class:`soyutnet.policy.PriorityPolicy`.
+        :param conflict_weight: Relative share of the tokens of the input places using \
+                                :py:class:`soyutnet.policy.WeightedRandomPolicy`.
+        :param event_log: Writes each firing with its consumed and produced tokens. \
+                          See :py:class:`soyutnet.eventlog.EventLogWriter`.
+        :param firing_record_limit: Maximum number of kept firing records if ``record_firing`` \
+                                    is set. It is unlimited if chosen ``0``.
         """
         super().__init__(name=name, **kwargs)
         self._no_of_times_enabled: int = 0
         """Counts the number of time the transition is enabled"""
-        self._firing_records: FiringHistoryType = []
+        self._firing_records: FiringRecords = FiringRecords(firing_record_limit)
         """Keeps timestampts of each firing of the transition: py:attr:`soyutnet.transition.FiringRecordType`"""
         self._record_firing: bool = record_firing
         """Enables recording firings of transitions"""
-        self._notifier: asyncio.Condition = asyncio.Condition()
-        """Firing notifier"""
+        self._subscribers: list[FiringSubscription] = []
+        """Firing subscriptions"""
+        self._firing_waiters: list[asyncio.Future[None]] = []
+        """Tasks waiting in :py:func:`soyutnet.transition.Transition.wait_for_firing`"""
+        self._priority: int = priority
+        """Conflict resolution priority"""
+        self._conflict_weight: float = conflict_weight
+        """Conflict resolution weight"""
+        self._fill_counter: ArcFillCounter = ArcFillCounter(self, 0, None)
+        """Number of full input arcs"""
+        self._polled_arcs: list[Arc] = []
+        """Input arcs whose fill levels are not counted"""
+        self._event_log: EventLogWriter | None = event_log
+        """Event log writer"""
+        self._consumed: list[TokenType] | None = None
+        """Tokens consumed by the current firing if it is logged"""
+        self._firing_time: float = 0.0
+        """Time of the current firing if it is logged"""
+
+    def _is_transition(self) -> bool:
+        return True
+
+    def _prepare_run(self) -> None:
+        """
+        Counts the full input arcs and subscribes to their fill level changes.
+        """
+        super()._prepare_run()
+        counted: list[Arc] = []
+        self._polled_arcs = []
+        for arc in self._input_arcs:
+            if arc._counts_fill_level:
+                counted.append(arc)
+            else:
+                arc._fill_counter = None
+                self._polled_arcs.append(arc)
+        counter: ArcFillCounter = ArcFillCounter(self, len(counted), self._run_control)
+        for arc in counted:
+            arc._fill_counter = counter
+            if arc.is_enabled():
+                counter.filled()
+        self._fill_counter = counter
 
     def _new_firing_record(self) -> None:
-        self._firing_records.append((self.net.time(),))
+        self._firing_records.append(self.net.time())
 
     async def _process_input_arcs(self) -> bool:
         """
@@ -46,17 +379,32 @@ class Transition(PTCommon):
         :return: ``True`` if the transition is enabled, else goes back to waiting input arcs to be enabled.
         """
         self.net.DEBUG_V(f"{self.ident()}: process_input_arcs")
-        async for arc in self._get_input_arcs():
+        control: RunControl | None = self._run_control
+        if control is None:
+            counter: ArcFillCounter = self._fill_counter
+            if counter.satisfied < counter.required:
+                return False
+        elif self not in control.enabled:
+            return False
+        for arc in self._polled_arcs:
             if not arc.is_enabled():
                 return False
 
+        if control is not None:
+            if control.stopped:
+                return False
+            control.fired(self._name)
+
         self.net.DEBUG_V(f"Enabled!")
         self._no_of_times_enabled += 1
         if self._record_firing:
             self._new_firing_record()
-
-        async with self._notifier:
-            self._notifier.notify_all()
+        if self._subscribers or self._firing_waiters:
+            self._publish_firing()
+        consumed: list[TokenType] | None = None
+        if self._event_log is not None:
+            consumed = self._consumed = []
+            self._firing_time = self.net.time()
 
         async for arc in self._get_input_arcs():
             await arc.observe_input_places(self._name)
@@ -64,6 +412,8 @@ class Transition(PTCommon):
             async for token in arc.wait():
                 self.net.DEBUG_V(f"Received '{token}' from {arc}")
                 self._put_token(token)
+                if consumed is not None:
+                    consumed.append(token)
                 await arc.notify_observer(token[0])
                 count -= 1
                 if count <= 0:
@@ -80,20 +430,26 @@ class Transition(PTCommon):
         Sends tokens to the output places when required conditions are satisfied.
         """
         self.net.DEBUG_V(f"{self.ident()}: process_output_arcs")
+        consumed: list[TokenType] | None = self._consumed
+        produced: list[TokenType] | None = None if consumed is None else []
         async for arc in self._get_output_arcs():
             count: int = arc.weight
             while count > 0:
-                token: TokenType = tuple()
-                for label in arc.labels(remember_last_processed=True):
-                    token = self._get_token(label)
-                    if token:
-                        break
-                if not token:
+                label: label_t | None = arc._pick_label()
+                if label is None:
                     break
+                token: TokenType = self._get_token(label)
                 self.net.DEBUG_V(f"Sending '{token}' to {arc}")
                 await arc.send(token)
+                if produced is not None:
+                    produced.append(token)
                 count -= 1
 
+        log: EventLogWriter | None = self._event_log
+        if log is not None and consumed is not None and produced is not None:
+            self._consumed = None
+            log.write(self._name, self._firing_time, consumed, produced)
+
     def get_no_of_times_enabled(self) -> int:
         """
         Returns number of times the transition is enabled.
@@ -102,7 +458,7 @@ class Transition(PTCommon):
         """
         return self._no_of_times_enabled
 
-    def get_firing_records(self) -> FiringHistoryType:
+    def get_firing_records(self) -> FiringRecords:
         """
         Returns all firing records. :py:attr:`soyutnet.transition.Transition._firing_records`
 
@@ -110,8 +466,48 @@ class Transition(PTCommon):
         """
         return self._firing_records
 
+    def _publish_firing(self) -> None:
+        record: FiringRecordType = (self.net.time(),)
+        for subscription in self._subscribers:
+            subscription._publish(record)
+        waiters: list[asyncio.Future[None]] = self._firing_waiters
+        self._firing_waiters = []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def subscribe(self, maxsize: int = 0) -> FiringSubscription:
+        """
+        Subscribes to the firings of the transition. Firings are published only
+        if the transition has subscribers.
+
+        .. code:: python
+
+            with t.subscribe() as firings:
+                async for batch in firings:
+                    for (timestamp,) in batch:
+                        ...
+
+        :param maxsize: Maximum number of buffered firing records of the subscriber. \
+                        The oldest records are dropped when it is exceeded. It is \
+                        unlimited if chosen ``0``.
+        :return: Firing subscription.
+        """
+        subscription: FiringSubscription = FiringSubscription(self, maxsize)
+        self._subscribers.append(subscription)
+
+        return subscription
+
     async def wait_for_firing(self) -> bool:
-        async with self._notifier:
-            await self._notifier.wait()
+        """
+        Waits until the transition fires next time. Firings happening before the
+        call are not reported, :py:func:`soyutnet.transition.Transition.subscribe`
+        does not miss any.
+
+        :return: ``True``
+        """
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._firing_waiters.append(waiter)
+        await waiter
 
         return True
@@ -1,4 +1,4 @@
-from typing_extensions import Any, Type, Union
+from typing_extensions import Any, Iterable, Tuple, Type, Union
 
 
 _PTCommon: Any = None
@@ -47,6 +47,26 @@ def validate_arc_connection_types(start: _PTCommon, end: _PTCommon) -> None:
             raise ModelError("Can not connect to a PT in an other net")
 
 
+def validate_arc_connections(pairs: Iterable[Tuple[Any, Any]]) -> None:
+    """
+    Validates a batch of (start, end) pairs.
+
+    Connection types are checked once per distinct pair of PT classes, so the
+    cost of structural pattern matching does not grow with the number of arcs.
+    Only the net membership is checked for every pair.
+
+    :param pairs: Start and end PTs of the arcs.
+    """
+    checked: set[Tuple[Type[Any], Type[Any]]] = set()
+    for start, end in pairs:
+        key: Tuple[Type[Any], Type[Any]] = (type(start), type(end))
+        if key not in checked:
+            validate_arc_connection_types(start, end)
+            checked.add(key)
+        elif start is not None and end is not None and start.net != end.net:
+            raise ModelError("Can not connect to a PT in an other net")
+
+
 def validate_arc(obj: _Arc, attr: Any, output: Any, *args: Any, **kwargs: Any) -> None:
     attr_name: str = attr.__name__
     match attr_name:
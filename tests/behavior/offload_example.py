@@ -0,0 +1,63 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import soyutnet
+from soyutnet import SoyutNet
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+
+
+def main(token_count=20, max_pending=4):
+    token_ids = list(range(1, token_count + 1))
+    consumed = []
+    in_progress = 0
+    max_in_progress = 0
+    lock = threading.Lock()
+
+    def producer():
+        with lock:
+            if token_ids:
+                return [(GENERIC_LABEL, token_ids.pop(0))]
+        return []
+
+    def consumer(token):
+        nonlocal in_progress, max_in_progress
+        with lock:
+            in_progress += 1
+            max_in_progress = max(max_in_progress, in_progress)
+        time.sleep(0.01)
+        """Blocking work"""
+        with lock:
+            in_progress -= 1
+            consumed.append(token[1])
+
+    def processor(tokens):
+        time.sleep(0.001)
+        return True
+
+    async def done():
+        while len(consumed) < token_count:
+            await net.sleep(0.01)
+        soyutnet.terminate()
+
+    with ThreadPoolExecutor(max_workers=2 * max_pending) as executor:
+        with SoyutNet(extra_routines=[done()]) as net:
+            p0 = net.SpecialPlace("p0", blocking_producer=producer, executor=executor)
+            t0 = net.Transition("t0")
+            p1 = net.Place("p1", blocking_processor=processor, executor=executor)
+            t1 = net.Transition("t1")
+            p2 = net.SpecialPlace(
+                "p2",
+                blocking_consumer=consumer,
+                executor=executor,
+                max_pending=max_pending,
+                token_limit=max_pending,
+            )
+            p0.connect(t0).connect(p1).connect(t1).connect(p2)
+
+    return sorted(consumed), max_in_progress
+
+
+if __name__ == "__main__":
+    print(main(int(sys.argv[1])))
@@ -133,3 +133,12 @@ def test_13():
             n = rec[0]
             assert (j % (i + 1) == 0 and n == "p1") or (j % (i + 1) != 0 and n == "p2")
             j += 1
+
+
+def test_14():
+    from behavior.offload_example import main
+
+    for max_pending in (1, 4):
+        consumed, max_in_progress = main(token_count=20, max_pending=max_pending)
+        assert consumed == list(range(1, 21))
+        assert 1 <= max_in_progress <= max_pending
@@ -48,5 +48,44 @@ def test_01_03():
         p.connect(t).connect(p)
 
 
+def test_02():
+    from soyutnet.pt_common import connect_all
+
+    net = SoyutNet()
+
+    places = [net.Place() for _ in range(10)]
+    transitions = [net.Transition() for _ in range(10)]
+    weights = [i + 1 for i in range(10)]
+    labels = [(0, i) for i in range(10)]
+
+    arcs = connect_all(zip(places, transitions, weights, labels))
+    arcs += connect_all((t, p) for p, t in zip(places[1:], transitions))
+    assert len(arcs) == 19
+    for i, (p, t) in enumerate(zip(places, transitions)):
+        assert p._output_arcs[0].end is t
+        assert t._input_arcs[0].weight == i + 1
+        assert set(t._tokens) == {0, i}
+
+
+def test_02_01():
+    from soyutnet.pt_common import connect_all
+
+    net = SoyutNet()
+    net2 = SoyutNet()
+
+    p1 = net.Place()
+    p2 = net.Place()
+    t1 = net.Transition()
+    t2 = net2.Transition()
+
+    with pytest.raises(ModelError):
+        connect_all([(p1, t1), (p1, p2)])
+    assert not p1._output_arcs
+
+    with pytest.raises(ModelError):
+        connect_all([(p1, t1), (p2, t2)])
+    assert not p1._output_arcs
+
+
 if __name__ == "__main__":
     test_01()
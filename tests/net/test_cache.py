@@ -0,0 +1,111 @@
+import soyutnet
+from soyutnet import SoyutNet, StopConditions, ResultCache, WeightedRandomPolicy
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+
+
+def _net(seed=1, count=2):
+    net = SoyutNet(seed=seed)
+    reg = net.PTRegistry()
+    p1 = net.Place(
+        "p1",
+        initial_tokens={GENERIC_LABEL: [GENERIC_ID] * count},
+        observer=net.Observer(),
+    )
+    p2 = net.Place("p2", observer=net.Observer())
+    t1 = net.Transition("t1", record_firing=True)
+    t2 = net.Transition("t2")
+    p1.connect(t1).connect(p2).connect(t2).connect(p1)
+    for pt in (p1, p2, t1, t2):
+        reg.register(pt)
+
+    return net, reg
+
+
+def test_01(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    until = StopConditions(max_firings=50)
+
+    net, reg = _net()
+    result = soyutnet.run(reg, until=until, cache=cache)
+    records = reg.get_merged_records()
+    assert result.firing_counts["t1"] + result.firing_counts["t2"] == 50
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached run is simulated")
+
+    monkeypatch.setattr(soyutnet, "main", fail)
+    net2, reg2 = _net()
+    assert soyutnet.run(reg2, until=until, cache=cache) == result
+    assert reg2.get_merged_records() == records
+
+    nets = [_net(), _net(), _net(seed=2), _net(count=3), _net(seed=None)]
+    keys = [cache.key(reg, until) for _, reg in nets]
+    assert keys[0] == keys[1]
+    assert keys[2] != keys[0] and keys[3] != keys[0]
+    assert keys[4] is None
+
+
+def test_02(tmp_path):
+    cache = ResultCache(str(tmp_path), max_size=1)
+    for count in (1, 2):
+        net, reg = _net(count=count)
+        soyutnet.run(reg, until=StopConditions(max_firings=10), cache=cache)
+
+    assert len(list(tmp_path.iterdir())) == 0
+
+    cache = ResultCache(str(tmp_path))
+    for count in (1, 2):
+        net, reg = _net(count=count)
+        soyutnet.run(reg, until=StopConditions(max_firings=10), cache=cache)
+
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+
+def _competing_net():
+    net = SoyutNet(seed=3)
+    net.conflict_policy = WeightedRandomPolicy()
+    reg = net.PTRegistry()
+    p = net.Place("p", initial_tokens={GENERIC_LABEL: [GENERIC_ID]})
+    t1 = net.Transition("t1")
+    t2 = net.Transition("t2")
+    p.connect(t1).connect(p)
+    p.connect(t2).connect(p)
+    for pt in (p, t1, t2):
+        reg.register(pt)
+
+    return net, reg
+
+
+def test_03(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    results = []
+    for _ in range(2):
+        net, reg = _competing_net()
+        soyutnet.run(reg, until=StopConditions(max_firings=5))
+        cached = soyutnet.run(reg, [], StopConditions(max_firings=20), cache=cache)
+        after = soyutnet.run(reg, until=StopConditions(max_firings=20))
+        results.append((cached, after, net.random.getstate()))
+
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+    assert results[0] == results[1]
+
+    results = []
+    for count in (5, 9):
+        net, reg = _competing_net()
+        results.append(
+            soyutnet.run(reg, [], StopConditions(max_firings=count), cache=cache)
+        )
+    assert [sum(r.firing_counts.values()) for r in results] == [5, 9]
+
+
+def test_04(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    nets = [_net(), _net()]
+    places = [next(o for _, o in reg.entries() if o._name == "p1") for _, reg in nets]
+    for p1 in places:
+        p1._get_token(GENERIC_LABEL)
+    places[1]._output_arcs[0]._queue.put_nowait((GENERIC_LABEL, GENERIC_ID))
+    keys = [cache.key(reg) for _, reg in nets]
+    assert keys[0] != keys[1]
+    assert cache.key(nets[1][1]) == keys[1]
+    assert places[1]._output_arcs[0]._queue.qsize() == 1
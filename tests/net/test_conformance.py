@@ -0,0 +1,78 @@
+import pytest
+
+from soyutnet import SoyutNet, TokenReplayer, SoyutNetError
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+
+
+def _net():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    start = net.Place("start", initial_tokens={GENERIC_LABEL: [GENERIC_ID]})
+    p1 = net.Place("p1")
+    p2 = net.Place("p2")
+    end = net.Place("end")
+    a = net.Transition("a")
+    b = net.Transition("b")
+    c = net.Transition("c")
+    d = net.Transition("d")
+    start.connect(a).connect(p1).connect(b).connect(p2).connect(d).connect(end)
+    p1.connect(c).connect(p2)
+    for pt in (start, p1, p2, end, a, b, c, d):
+        reg.register(pt)
+
+    return net, reg
+
+
+def test_01():
+    net, reg = _net()
+    replayer = TokenReplayer(reg, final_marking={"end": 1})
+    cases = [
+        ("fit1", ["a", "b", "d"]),
+        ("fit2", ["a", "c", "d"]),
+        ("skip", ["a", "d"]),
+        ("unknown", ["a", "x", "b", "d"]),
+        ("partial", ["a", "b"]),
+    ]
+    result = replayer.replay(cases, processes=1)
+    fit1, fit2, skip, unknown, partial = result.cases
+
+    assert (fit1.produced, fit1.consumed, fit1.missing, fit1.remaining) == (4, 4, 0, 0)
+    assert fit1.fitness == 1.0 and fit1.first_deviation is None
+    assert fit2.fitness == 1.0
+    assert (skip.missing, skip.remaining) == (1, 1)
+    assert skip.first_deviation == (1, "d")
+    assert skip.fitness == pytest.approx(0.5 * (1 - 1 / 3) + 0.5 * (1 - 1 / 3))
+    assert unknown.first_deviation == (1, "x") and unknown.fitness == 1.0
+    assert (partial.missing, partial.remaining) == (1, 1)
+    assert partial.first_deviation is None
+    assert result.fitting_cases == 3
+    assert result.missing == 2 and result.remaining == 2
+
+    assert replayer.replay(cases) == result
+    parallel = replayer.replay(iter(cases), processes=2, chunk_size=2)
+    assert parallel == result
+    # More chunks than the in-flight window
+    parallel = replayer.replay(iter(cases), processes=2, chunk_size=1)
+    assert parallel == result
+
+
+def test_02():
+    net, reg = _net()
+    reg.register(net.Transition("a"))
+    with pytest.raises(SoyutNetError):
+        TokenReplayer(reg)
+
+
+def test_03():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    start = net.Place("start", initial_tokens={5: [1]})
+    t = net.Transition("t")
+    done = net.Place("done")
+    start.connect(t, labels=[5]).connect(done, labels=[5])
+    for pt in (start, t, done):
+        reg.register(pt)
+
+    result = TokenReplayer(reg, final_marking={"done": 1}).replay([("c", ["t"])])
+    assert (result.missing, result.remaining) == (0, 0)
+    assert result.fitness == 1.0
@@ -0,0 +1,76 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import soyutnet
+from soyutnet import SoyutNet, StopConditions, EventLogWriter
+from soyutnet.constants import GENERIC_LABEL
+
+
+def _run(log):
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p1 = net.Place("p1", initial_tokens={GENERIC_LABEL: [1, 2], 5: [3]})
+    p2 = net.Place("p2")
+    t1 = net.Transition("t1", event_log=log)
+    t2 = net.Transition("t2", event_log=log)
+    p1.connect(t1, weight=2).connect(p2, weight=2).connect(t2, weight=2)
+    p1.connect(t1, labels=[5]).connect(p2, labels=[5]).connect(t2, labels=[5])
+    for pt in (p1, p2, t1, t2):
+        reg.register(pt)
+
+    return soyutnet.run(reg, until=StopConditions(quiescence=True))
+
+
+def test_01(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = EventLogWriter(str(path))
+    _run(log)
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert log.count == 2
+    assert [e["type"] for e in events] == ["t1", "t2"]
+    assert events[0]["time"] <= events[1]["time"]
+    t1 = {(r["objectId"], r["qualifier"]) for r in events[0]["relationships"]}
+    assert t1 == {
+        (token, qualifier)
+        for token in ("0:1", "0:2", "5:3")
+        for qualifier in ("consumed", "produced")
+    }
+    assert {r["qualifier"] for r in events[1]["relationships"]} == {"consumed"}
+    log.close()
+
+
+def test_02(tmp_path):
+    path = tmp_path / "log.xes"
+    with EventLogWriter(str(path), format="xes") as log:
+        _run(log)
+    root = ET.parse(path).getroot()
+    ns = {"xes": "http://www.xes-standard.org/"}
+    events = root.findall("xes:trace/xes:event", ns)
+    names = [e.find("xes:string[@key='concept:name']", ns).get("value") for e in events]
+    assert names == ["t1", "t2"]
+    consumed = events[1].find("xes:string[@key='consumed']", ns).get("value")
+    assert sorted(consumed.split()) == ["0:1", "0:2", "5:3"]
+
+
+def test_03(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = EventLogWriter(str(path))
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p = net.Place("p", initial_tokens={GENERIC_LABEL: [1]})
+    t = net.Transition("t", event_log=log)
+    p.connect(t).connect(p)
+    reg.register(p)
+    reg.register(t)
+
+    async def fail():
+        await t.wait_for_firing()
+        raise RuntimeError("failed")
+
+    with pytest.raises(RuntimeError):
+        soyutnet.run(reg, extra_routines=[fail()])
+    assert log.count > 0
+    assert len(path.read_text().splitlines()) == log.count
+    log.close()
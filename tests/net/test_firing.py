@@ -0,0 +1,45 @@
+import pickle
+
+import pytest
+
+import soyutnet
+from soyutnet import SoyutNet, StopConditions, FiringRecords
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+
+
+def test_01():
+    records = FiringRecords(limit=4, time_constant=1.0, interval_bins=[0.15, 0.5])
+    for t in [0.0, 0.1, 0.2, 0.3, 0.4, 1.0]:
+        records.append(t)
+
+    assert len(records) == 4 and records.total == 6
+    assert list(records) == [(0.2,), (0.3,), (0.4,), (1.0,)]
+    assert records[-1] == (1.0,) and records[1:3] == [(0.3,), (0.4,)]
+    with pytest.raises(IndexError):
+        records[4]
+    assert records.get_rate(0.5) == pytest.approx(2.0)
+    assert records.get_rate(1.0, now=1.35) == pytest.approx(2.0)
+    assert records.get_rate(0.9) == pytest.approx(4 / 0.9)
+    assert [count for _, _, count in records.get_interval_histogram()] == [4, 0, 1]
+    assert records.get_ewma_rate(now=2.0) == pytest.approx(
+        records.get_ewma_rate() * 2.718281828 ** (-1.0)
+    )
+    assert pickle.loads(pickle.dumps(records)) == records
+
+
+def test_02():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p = net.Place("p", initial_tokens={GENERIC_LABEL: [GENERIC_ID]})
+    t = net.Transition("t", record_firing=True, firing_record_limit=10)
+    p.connect(t).connect(p)
+    reg.register(p)
+    reg.register(t)
+
+    soyutnet.run(reg, until=StopConditions(max_firings=25))
+    records = t.get_firing_records()
+    assert len(records) == 10 and records.total == 25
+    times = [record[0] for record in records]
+    assert times == sorted(times)
+    assert records.get_ewma_rate() > 0
+    assert sum(count for _, _, count in records.get_interval_histogram()) == 24
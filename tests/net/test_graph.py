@@ -0,0 +1,69 @@
+import io
+
+from soyutnet import SoyutNet
+from soyutnet.pt_common import connect_all
+
+
+def create_ring(net, N):
+    reg = net.PTRegistry()
+    places = [net.Place(f"p{i}") for i in range(N)]
+    transitions = [net.Transition(f"t{i}") for i in range(N)]
+    {reg.register(pt) for pt in places + transitions}
+    connect_all(zip(places, transitions))
+    connect_all(zip(transitions, places[1:] + places[:1]))
+
+    return reg, places, transitions
+
+
+def test_01():
+    net = SoyutNet()
+    reg, *_ = create_ring(net, 10)
+
+    fh = io.StringIO()
+    reg.write_graph(fh, net_name="Ring", indent="  ")
+    assert fh.getvalue() == reg.generate_graph(net_name="Ring", indent="  ")
+
+
+def test_02():
+    net = SoyutNet()
+    reg, places, transitions = create_ring(net, 10)
+
+    assert reg.get_neighborhood([places[5]], radius=0) == {places[5]}
+    assert reg.get_neighborhood([places[5]], radius=2) == {
+        places[4],
+        transitions[4],
+        places[5],
+        transitions[5],
+        places[6],
+    }
+
+    graph = reg.generate_graph(pts=[places[5]], radius=1)
+    assert "p5_0 [" in graph
+    assert "t4_0 [" in graph
+    assert "t5_0 [" in graph
+    assert "p4_0" not in graph
+    assert "t4_0 -> p5_0" in graph
+    assert "p5_0 -> t5_0" in graph
+    assert graph.count("->") == 2
+
+
+def test_03():
+    net = SoyutNet()
+    reg, places, transitions = create_ring(net, 2)
+
+    records = [
+        ("p0", (0.1, ((0, 1),), "t0")),
+        ("p0", (0.2, ((0, 0),), "t0")),
+        ("p1", (0.3, ((0, 2),), "t1")),
+    ]
+    frames = "".join(reg.iter_graph_frames(records=records, indent=""))
+    assert frames.count("subgraph cluster_") == 3
+    assert 'p0_0 [shape="circle"' in frames
+    assert 'label="1",xlabel="p0"' in frames
+    assert 'label="0",xlabel="p0"' in frames
+    assert 'label="2",xlabel="p1"' in frames
+    assert "t1_2 -> p0_2" in frames
+    assert 'color="#d62728",fillcolor="#d62728",label="",xlabel="t0"' in frames
+
+    graphs = "".join(reg.iter_graph_frames(records=records, single_graph=False))
+    assert graphs.count("digraph Net_") == 3
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from soyutnet import SoyutNet
+from soyutnet.constants import GENERIC_LABEL
+
+
+def _observe(counts, times=None, flush=False, **kwargs):
+    net = SoyutNet()
+    observer = net.Observer(**kwargs)
+    now = [0.0]
+    net.time = lambda: now[0]
+
+    async def main():
+        count = 0
+        for i, c in enumerate(counts):
+            if times is not None:
+                now[0] = times[i]
+            await observer.inc_token_count(GENERIC_LABEL, c - count)
+            count = c
+            await observer.save()
+        if flush:
+            await observer.flush()
+
+    asyncio.run(main())
+
+    return [record[1][0][1] for record in observer.get_records()]
+
+
+def test_01():
+    counts = list(range(10))
+    assert _observe(counts) == counts
+    assert _observe(counts, sample_every=4) == [0, 4, 8]
+    assert _observe(counts, sample_every=4, flush=True) == [0, 4, 8, 9]
+    assert _observe(counts, sample_every=3, flush=True) == [0, 3, 6, 9]
+    times = [0.0, 0.1, 0.2, 0.35, 0.4, 0.5, 0.6, 0.75, 0.8, 0.9]
+    assert _observe(counts, times=times, sample_period=0.3) == [0, 3, 7]
+    counts = [0, 1, 2, 3, 2, 6, 6, 7, 1, 1]
+    assert _observe(counts, change_threshold=2) == [0, 3, 6, 1]
+    assert _observe(counts, sample_every=2, change_threshold=2) == [0, 6, 1]
+    counts = [0, 1, 5, 6, 7, 10]
+    times = [0.0, 0.1, 0.2, 0.35, 0.7, 0.8]
+    kwargs = {"sample_period": 0.3, "change_threshold": 2}
+    assert _observe(counts, times=times, **kwargs) == [0, 6, 10]
+
+
+def test_02():
+    net = SoyutNet()
+    now = [0.0]
+    net.time = lambda: now[0]
+    observer = net.StatisticsObserver(histogram_size=4)
+
+    async def main():
+        for t, inc in [(0.0, 2), (1.0, 1), (3.0, -2), (4.0, 5)]:
+            now[0] = t
+            await observer.inc_token_count(GENERIC_LABEL, inc)
+        await observer.save("t1")
+        await observer.save("t1")
+        now[0] = 5.0
+
+    asyncio.run(main())
+
+    stats = observer.get_statistics()
+    # Counts: 2 in [0, 1), 3 in [1, 3), 1 in [3, 4), 6 in [4, 5)
+    assert stats.duration == 5.0
+    assert stats.mean == pytest.approx((2 + 6 + 1 + 6) / 5)
+    assert stats.variance == pytest.approx((4 + 18 + 1 + 36) / 5 - 3.0**2)
+    assert (stats.minimum, stats.maximum) == (1, 6)
+    assert (stats.arrivals, stats.departures) == (8, 2)
+    assert stats.throughput == pytest.approx(0.4)
+    assert stats.sojourn_time == pytest.approx(3.0 / 1.6)
+    assert observer.get_percentile(10) == 1
+    assert observer.get_percentile(50) == 3
+    assert observer.get_percentile(100) == 3
+    assert observer.get_throughputs() == {"t1": pytest.approx(0.4)}
+    assert observer.get_records() == []
@@ -0,0 +1,75 @@
+import io
+
+import pytest
+
+from soyutnet import SoyutNet
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+from soyutnet.pnml import read_pnml, write_pnml
+from soyutnet.validate import ModelError
+
+
+PT_NET = """<?xml version="1.0" encoding="UTF-8"?>
+<pnml xmlns="http://www.pnml.org/version-2009/grammar/pnml">
+  <net id="n0" type="http://www.pnml.org/version-2009/grammar/ptnet">
+    <page id="page0">
+      <arc id="a0" source="p0" target="t0"><inscription><text>2</text></inscription></arc>
+      <place id="p0">
+        <name><text>input</text></name>
+        <initialMarking><text>3</text></initialMarking>
+      </place>
+      <transition id="t0"/>
+      <place id="p1"/>
+      <arc id="a1" source="t0" target="p1"/>
+    </page>
+  </net>
+</pnml>
+"""
+
+
+def _pts(reg):
+    return {pt._name: pt for _, pt in reg.entries()}
+
+
+def test_01():
+    net = SoyutNet()
+    reg = read_pnml(net, io.BytesIO(PT_NET.encode()))
+
+    pts = _pts(reg)
+    assert set(pts) == {"input", "t0", "p1"}
+    assert pts["input"]._tokens == {GENERIC_LABEL: [GENERIC_ID] * 3}
+    assert len(pts["t0"]._input_arcs) == 1
+    assert pts["t0"]._input_arcs[0].weight == 2
+    assert pts["t0"]._output_arcs[0].end is pts["p1"]
+
+
+def test_02():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p1 = net.Place("p1", initial_tokens={GENERIC_LABEL: [GENERIC_ID], 1: [10, 20]})
+    p2 = net.Place("p2")
+    t1 = net.Transition("t1")
+    p1.connect(t1, weight=2, labels=[GENERIC_LABEL, 1]).connect(p2, labels=[1])
+    t1.connect(p1, labels=[GENERIC_LABEL])
+    {reg.register(pt) for pt in (p1, p2, t1)}
+
+    fh = io.StringIO()
+    write_pnml(reg, fh)
+
+    net2 = SoyutNet()
+    reg2 = read_pnml(net2, io.BytesIO(fh.getvalue().encode()))
+    assert reg2.generate_graph() == reg.generate_graph()
+    pts = _pts(reg2)
+    assert pts["p1"]._tokens[1] == [10, 20]
+    assert pts["p1"]._tokens[GENERIC_LABEL] == [GENERIC_ID]
+
+
+def test_03():
+    net = SoyutNet()
+    document = PT_NET.replace('target="t0"', 'target="p1"')
+
+    with pytest.raises(ModelError):
+        read_pnml(net, io.BytesIO(document.encode()))
+
+    document = PT_NET.replace('target="t0"', 'target="x0"')
+    with pytest.raises(ModelError):
+        read_pnml(net, io.BytesIO(document.encode()))
@@ -0,0 +1,82 @@
+import pytest
+
+import soyutnet
+from soyutnet import (
+    SoyutNet,
+    StopConditions,
+    ConflictPolicy,
+    PriorityPolicy,
+    RoundRobinPolicy,
+    WeightedRandomPolicy,
+)
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+from soyutnet.pt_common import Arc
+
+
+def _competing_net(policy, **transition_kwargs):
+    """Two transitions compete for the single token of ``p``."""
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p = net.Place(
+        "p", initial_tokens={GENERIC_LABEL: [GENERIC_ID]}, conflict_policy=policy
+    )
+    t1 = net.Transition("t1", **transition_kwargs.get("t1", {}))
+    t2 = net.Transition("t2", **transition_kwargs.get("t2", {}))
+    p.connect(t1).connect(p)
+    p.connect(t2).connect(p)
+    for pt in (p, t1, t2):
+        reg.register(pt)
+
+    return soyutnet.run(reg, until=StopConditions(max_firings=400)).firing_counts
+
+
+def test_01():
+    counts = _competing_net(PriorityPolicy(), t2={"priority": 1})
+    assert counts == {"t1": 0, "t2": 400}
+
+    counts = _competing_net(RoundRobinPolicy())
+    assert abs(counts["t1"] - counts["t2"]) <= 2
+
+
+def test_02():
+    kwargs = {"t1": {"conflict_weight": 3.0}}
+    counts = _competing_net(WeightedRandomPolicy(seed=5), **kwargs)
+    assert 250 < counts["t1"] < 350
+    assert counts["t1"] + counts["t2"] == 400
+
+    assert _competing_net(WeightedRandomPolicy(seed=5), **kwargs) == counts
+
+
+def test_03():
+    with pytest.raises(TypeError):
+        ConflictPolicy()
+
+    net = SoyutNet()
+    p = net.Place("p")
+    t1 = net.Transition("t1")
+    t2 = net.Transition("t2")
+    t3 = net.Transition("t3", priority=1)
+    p.connect(t1)
+    p.connect(t2)
+    policy = PriorityPolicy()
+    assert [arc.end for arc in policy.order(p, p._output_arcs)][1:] == [t1]
+
+    # Same number of arcs, but one of them goes to another transition
+    arcs = [p._output_arcs[0], Arc(start=p, end=t3)]
+    assert [arc.end for arc in policy.order(p, arcs)][0] is t3
+
+
+def test_04():
+    net = SoyutNet()
+    places = [net.Place(f"p{i}") for i in range(2)]
+    assert places[0]._id == places[1]._id
+    for p in places:
+        p.connect(net.Transition())
+        p.connect(net.Transition())
+
+    for policy in (RoundRobinPolicy(), PriorityPolicy()):
+        indices = [
+            place._output_arcs.index(policy.order(place, place._output_arcs)[0])
+            for place in places
+        ]
+        assert indices[0] == indices[1]
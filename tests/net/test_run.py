@@ -0,0 +1,408 @@
+import asyncio
+from itertools import chain
+
+import pytest
+
+import soyutnet
+from soyutnet import SoyutNet, StopConditions
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+
+
+def _cyclic_net():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p = net.Place("p", initial_tokens={GENERIC_LABEL: [GENERIC_ID]})
+    t = net.Transition("t")
+    p.connect(t).connect(p)
+    reg.register(p)
+    reg.register(t)
+
+    return net, reg
+
+
+def test_01():
+    net, reg = _cyclic_net()
+
+    async def stop():
+        await asyncio.sleep(0.05)
+        soyutnet.terminate()
+
+    result = soyutnet.run(reg, extra_routines=[stop()])
+    assert result.stopped
+    assert result.firing_counts["t"] > 0
+    assert set(result.markings) == {"p"}
+    assert result.elapsed >= 0.05
+
+
+def test_02():
+    net, reg = _cyclic_net()
+
+    async def stop():
+        await asyncio.sleep(0.01)
+        soyutnet.terminate()
+
+    async def service():
+        unrelated = asyncio.create_task(asyncio.sleep(10))
+        result = await soyutnet.main(reg, extra_routines=[stop()])
+        assert not unrelated.cancelled()
+        unrelated.cancel()
+        return result
+
+    result = asyncio.run(service())
+    assert result.stopped
+    assert result.firing_counts["t"] > 0
+
+
+def test_03():
+    net, reg = _cyclic_net()
+
+    result = soyutnet.run(reg, until=StopConditions(max_firings=25))
+    assert result.reason == "max_firings"
+    assert result.firing_counts["t"] == 25
+
+    net, reg = _cyclic_net()
+    result = soyutnet.run(reg, until=StopConditions(transition_firings={"t": 7}))
+    assert result.reason == "transition_firings"
+    assert result.firing_counts["t"] == 7
+
+
+def test_04():
+    net, reg = _cyclic_net()
+
+    result = soyutnet.run(reg, until=StopConditions(max_time=0.02))
+    assert result.reason == "max_time"
+    assert result.elapsed >= 0.02
+
+    net, reg = _cyclic_net()
+    counts = []
+
+    def predicate(place):
+        counts.append(place.get_token_count(GENERIC_LABEL))
+        return len(counts) >= 10
+
+    result = soyutnet.run(reg, until=StopConditions(marking=predicate))
+    assert result.reason == "marking"
+    assert len(counts) == 10
+
+
+def test_05():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p1 = net.Place("p1", initial_tokens={GENERIC_LABEL: [GENERIC_ID] * 3})
+    p2 = net.Place("p2")
+    t = net.Transition("t")
+    p1.connect(t, weight=2).connect(p2, weight=2)
+    for pt in (p1, p2, t):
+        reg.register(pt)
+
+    result = soyutnet.run(reg, until=StopConditions(quiescence=True))
+    assert result.reason == "quiescence"
+    assert result.firing_counts["t"] == 1
+    assert result.markings["p2"] == {GENERIC_LABEL: [GENERIC_ID] * 2}
+
+
+def test_06():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p1 = net.Place("p1", initial_tokens={GENERIC_LABEL: [GENERIC_ID]})
+    p2 = net.Place("p2")
+    t = net.Transition("t")
+    p1.connect(t, weight=2).connect(p2, weight=2)
+    for pt in (p1, p2, t):
+        reg.register(pt)
+
+    reports = []
+
+    def hook(report):
+        reports.append(report)
+        if len(reports) == 1:
+            p1.put_token(GENERIC_LABEL, GENERIC_ID)
+        else:
+            soyutnet.terminate()
+
+    result = soyutnet.run(reg, until=StopConditions(on_quiescence=hook))
+    assert result.reason == "terminate"
+    assert len(reports) == 2
+    assert reports[0].tokens == {"p1": 1}
+    assert reports[0].missing == [("t", 1)]
+    assert reports[1].tokens == {"p2": 2}
+    assert reports[1].missing == [("t", 2)]
+    assert result.quiescence is reports[1]
+
+
+def test_07():
+    from soyutnet import WeightedRandomPolicy
+
+    def simulate(seed):
+        net = SoyutNet(seed=seed)
+        reg = net.PTRegistry()
+        policy = WeightedRandomPolicy()
+        p1 = net.Place(
+            "p1",
+            initial_tokens={GENERIC_LABEL: [GENERIC_ID] * 2},
+            observer=net.Observer(),
+            conflict_policy=policy,
+        )
+        p2 = net.Place("p2", observer=net.Observer())
+        t1 = net.Transition("t1", conflict_weight=2.0)
+        t2 = net.Transition("t2")
+        t3 = net.Transition("t3")
+        p1.connect(t1).connect(p2).connect(t3).connect(p1)
+        p1.connect(t2).connect(p1)
+        for pt in (p1, p2, t1, t2, t3):
+            reg.register(pt)
+
+        async def stop():
+            await asyncio.sleep(0.001)
+            soyutnet.terminate()
+
+        result = soyutnet.run(reg, extra_routines=[stop()])
+        return reg.get_merged_records(), result, p1.ident(), p1._ident0
+
+    records, result, ident, ident0 = simulate(3)
+    assert len(records) > 10
+    assert result.elapsed == pytest.approx(0.001, rel=0.01)
+    assert simulate(3) == (records, result, ident, ident0)
+    assert simulate(4)[0] != records
+
+
+def test_08():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    places = [
+        net.Place(f"p{i}", initial_tokens={GENERIC_LABEL: [GENERIC_ID] * (i > 0)})
+        for i in range(4)
+    ]
+    t = net.Transition("t")
+    for p in places:
+        p.connect(t)
+    for pt in places + [t]:
+        reg.register(pt)
+
+    result = soyutnet.run(reg, until=StopConditions(quiescence=True))
+    assert result.firing_counts["t"] == 0
+
+    places[0].put_token()
+    result = soyutnet.run(reg, until=StopConditions(max_firings=1))
+    assert result.firing_counts["t"] == 1
+    assert all(p.get_token_count(GENERIC_LABEL) == 0 for p in places)
+
+    for p in places[1:]:
+        p.put_token()
+    result = soyutnet.run(reg, until=StopConditions(quiescence=True))
+    assert result.firing_counts["t"] == 1
+
+    places[0].put_token()
+    result = soyutnet.run(reg, until=StopConditions(quiescence=True))
+    assert result.firing_counts["t"] == 2
+
+
+def test_09():
+    net = SoyutNet()
+    labels = list(range(1, 9))
+    p1 = net.Place("p1", initial_tokens={3: [GENERIC_ID], 7: [GENERIC_ID] * 2})
+    p2 = net.Place("p2")
+    t = net.Transition("t")
+    arc = p1.connect(t, labels=labels)._input_arcs[0]
+    t.connect(p2, labels=labels)
+    assert arc._label_mask == 0b01000100
+
+    assert arc._pick_label() == 3
+    assert arc._pick_label() == 7
+    assert arc._pick_label() == 3
+    p1._get_token(3)
+    assert arc._label_mask == 0b01000000
+    assert arc._pick_label() == 7
+    p1._put_token((1, GENERIC_ID))
+    assert arc._label_mask == 0b01000001
+    assert arc._pick_label() == 1
+    p1._get_token(7)
+    p1._get_token(7)
+    p1._get_token(1)
+    assert arc._pick_label() is None
+
+
+def test_10():
+    net, reg = _cyclic_net()
+    t = next(obj for _, obj in reg.entries() if obj._name == "t")
+    batches = []
+
+    async def monitor():
+        unbounded = t.subscribe()
+        with t.subscribe(maxsize=4) as firings:
+            async for batch in firings:
+                batches.append(batch)
+                if sum(map(len, batches)) + firings.dropped >= 20:
+                    break
+                await asyncio.sleep(0.001)
+            dropped.append(firings.dropped)
+        unbounded.close()
+        assert not t._subscribers
+        async for batch in unbounded:
+            received.extend(batch)
+        assert unbounded.dropped == 0
+        soyutnet.terminate()
+
+    dropped = []
+    received = []
+    result = soyutnet.run(reg, extra_routines=[monitor()])
+    assert len(received) >= 20
+    assert all(0 < len(batch) <= 4 for batch in batches)
+    assert any(len(batch) > 1 for batch in batches)
+    assert dropped[0] > 0
+    times = [record[0] for batch in batches for record in batch]
+    assert times == sorted(times)
+    assert result.firing_counts["t"] >= len(times) + dropped[0]
+
+
+def test_11():
+    from concurrent.futures import ThreadPoolExecutor
+
+    for executor in (None, ThreadPoolExecutor(1)):
+        net = SoyutNet()
+        reg = net.PTRegistry()
+        batches = []
+
+        if executor is None:
+
+            async def consume(place, tokens):
+                batches.append(tokens)
+
+        else:
+
+            def consume(tokens):
+                batches.append(tokens)
+
+        p1 = net.Place("p1", initial_tokens={GENERIC_LABEL: list(range(1, 51))})
+        t = net.Transition("t")
+        if executor is None:
+            p2 = net.SpecialPlace("p2", batch_consumer=consume)
+        else:
+            p2 = net.SpecialPlace(
+                "p2", blocking_batch_consumer=consume, executor=executor
+            )
+        p1.connect(t, weight=5).connect(p2, weight=5)
+        for pt in (p1, t, p2):
+            reg.register(pt)
+
+        soyutnet.run(reg, until=StopConditions(quiescence=True))
+        assert sorted(id for batch in batches for _, id in batch) == list(range(1, 51))
+        assert all(batches)
+        assert p2.get_token_count(GENERIC_LABEL) == 0
+
+    with pytest.raises(soyutnet.SoyutNetError):
+        net.SpecialPlace("p3", consumer=consume, batch_consumer=consume)
+    with pytest.raises(soyutnet.SoyutNetError):
+        net.SpecialPlace("p3", consumer=consume, blocking_consumer=consume)
+    with pytest.raises(soyutnet.SoyutNetError):
+        net.Place("p3", processor=consume, blocking_processor=consume)
+
+
+def test_12():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    requests = []
+    produced = 0
+
+    async def source(place, count):
+        nonlocal produced
+        requests.append(count)
+        tokens = [(GENERIC_LABEL, produced + i + 1) for i in range(count)]
+        produced += count
+        return tokens
+
+    async def tokens():
+        for i in range(1, 21):
+            yield (GENERIC_LABEL, i)
+
+    p1 = net.SpecialPlace("p1", source=source)
+    p2 = net.SpecialPlace("p2", source=tokens())
+    t = net.Transition("t")
+    p3 = net.Place("p3")
+    p1.connect(t, weight=3).connect(p3, weight=5)
+    p2.connect(t, weight=2)
+    for pt in (p1, p2, t, p3):
+        reg.register(pt)
+
+    result = soyutnet.run(reg, until=StopConditions(quiescence=True))
+    assert result.firing_counts["t"] == 10
+    assert p3.get_token_count(GENERIC_LABEL) == 50
+    assert all(0 < count <= 3 for count in requests)
+    assert 30 <= produced <= 33
+
+
+def test_13():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    blocked = asyncio.Event()
+
+    async def producer(place):
+        await blocked.wait()
+        return []
+
+    p1 = net.Place("p1", initial_tokens={GENERIC_LABEL: [1, 2, 3]})
+    t = net.Transition("t")
+    p2 = net.SpecialPlace("p2", producer=producer)
+    p1.connect(t).connect(p2)
+    for pt in (p1, t, p2):
+        reg.register(pt)
+
+    async def stop():
+        await asyncio.sleep(0.05)
+        soyutnet.terminate()
+
+    result = soyutnet.run(reg, extra_routines=[stop()])
+    assert result.stopped
+    ids = [id for pt in (p1, t, p2) for id in pt._tokens.get(GENERIC_LABEL, [])]
+    for arc in p1._output_arcs + t._output_arcs:
+        while not arc._queue.empty():
+            ids.append(arc._queue.get_nowait()[1])
+    assert sorted(ids) == [1, 2, 3]
+
+    wallets = chain(
+        result.markings.values(), result.held.values(), result.arc_tokens.values()
+    )
+    reported = [id for wallet in wallets for id in wallet.get(GENERIC_LABEL, [])]
+    assert sorted(reported) == [1, 2, 3]
+    assert sum(map(len, result.arc_tokens["t->p2"].values())) == 1
+
+
+def test_14():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p0 = net.Place("p0", initial_tokens={GENERIC_LABEL: [1, 2, 3, 4, 5]})
+    t0 = net.Transition("t0")
+    p1 = net.SpecialPlace("p1", token_limit=1)
+    p2 = net.Place("p2")
+    t = net.Transition("t")
+    p3 = net.Place("p3")
+    p0.connect(t0).connect(p1).connect(t).connect(p3)
+    p2.connect(t)
+    for pt in (p0, t0, p1, p2, t, p3):
+        reg.register(pt)
+
+    # t0 blocks sending to the full arc of p1, t never gets a token from p2
+    result = soyutnet.run(reg, until=StopConditions(quiescence=True, max_time=10))
+    assert result.reason == "quiescence"
+    assert result.elapsed < 5
+    assert result.firing_counts["t"] == 0
+    assert dict(result.quiescence.missing)["t"] == 1
+
+
+def test_15():
+    from soyutnet.control import RunControl
+    from soyutnet.pt_common import ArcFillCounter
+
+    net = SoyutNet()
+    t = net.Transition("t")
+    control = RunControl()
+    counter = ArcFillCounter(t, 2, control)
+    counter.filled()
+    assert t not in control.enabled
+    counter.filled()
+    assert t in control.enabled
+    counter.drained()
+    assert t not in control.enabled
+
+    ArcFillCounter(t, 0, control)
+    assert t in control.enabled
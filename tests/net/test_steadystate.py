@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import soyutnet
+from soyutnet import SoyutNet, BatchMeans, SteadyStateMonitor
+from soyutnet.steadystate import t_quantile
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL
+
+
+def test_01():
+    assert t_quantile(0.975, 9) == pytest.approx(2.262, abs=2e-3)
+    assert t_quantile(0.975, 30) == pytest.approx(2.042, abs=1e-3)
+
+    rng = random.Random(1)
+    estimator = BatchMeans(batch_count=10)
+    for i in range(4000):
+        transient = 50.0 * 0.99**i
+        estimator.add(10.0 + transient + rng.gauss(0, 1))
+    estimate = estimator.estimate()
+    assert estimate.observations == 4000
+    assert estimate.warmup > 0
+    assert 10 <= estimate.batches < 20
+    assert abs(estimate.mean - 10.0) < 3 * estimate.half_width + 0.1
+    assert estimate.relative_half_width < 0.05
+
+
+def test_02():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    observer = net.StatisticsObserver()
+    p1 = net.Place(
+        "p1", initial_tokens={GENERIC_LABEL: [GENERIC_ID] * 2}, observer=observer
+    )
+    p2 = net.Place("p2")
+    t1 = net.Transition("t1")
+    t2 = net.Transition("t2")
+    p1.connect(t1).connect(p2).connect(t2).connect(p1)
+    for pt in (p1, p2, t1, t2):
+        reg.register(pt)
+
+    reached = []
+    monitor = SteadyStateMonitor(
+        period=0.002, relative_precision=0.2, min_batches=5, on_precision=reached.append
+    )
+    monitor.add_throughput(t1)
+    monitor.add_occupancy(observer, name="p1")
+
+    result = soyutnet.run(reg, extra_routines=[monitor.run()])
+    assert result.reason == "precision"
+    assert monitor.precision_reached
+    estimates = reached[0]
+    assert set(estimates) == {"t1", "p1"}
+    assert estimates["t1"].mean > 0
+    assert 0 <= estimates["p1"].mean <= 2
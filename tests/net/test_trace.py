@@ -0,0 +1,88 @@
+import pytest
+
+import soyutnet
+from soyutnet import SoyutNet, StopConditions, TraceSource, write_trace
+from soyutnet.constants import GENERIC_LABEL
+
+
+def _replay(source):
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    arrivals = []
+
+    async def consume(place, tokens):
+        arrivals.extend((net.time(), token) for token in tokens)
+
+    p1 = net.SpecialPlace("p1", source=source)
+    t = net.Transition("t")
+    p2 = net.SpecialPlace("p2", batch_consumer=consume)
+    p1.connect(t).connect(p2)
+    for pt in (p1, t, p2):
+        reg.register(pt)
+
+    soyutnet.run(reg, until=StopConditions(quiescence=True))
+
+    return arrivals
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_01(tmp_path, binary):
+    records = [(0.01 * i, GENERIC_LABEL, i + 1) for i in range(100)]
+    path = str(tmp_path / "arrivals.trace")
+    write_trace(path, records, binary=binary)
+
+    source = TraceSource(
+        path,
+        format="binary" if binary else "csv",
+        chunk_size=64,
+        time_offset=-0.1,
+        time_scale=0.1,
+    )
+    arrivals = _replay(source)
+    assert [token for _, token in arrivals] == [(label, id) for _, label, id in records]
+    start = source._start_time
+    for (arrival, _), (t, _, _) in zip(arrivals, records):
+        assert arrival - start >= (t + 0.1) * 0.1
+    assert arrivals[-1][0] - start == pytest.approx(0.109, abs=0.05)
+    assert source.exhausted
+
+
+def test_02(tmp_path):
+    path = str(tmp_path / "empty.trace")
+    write_trace(path, [])
+    assert _replay(TraceSource(path)) == []
+
+
+def test_03(tmp_path):
+    records = [(0.001 * i, GENERIC_LABEL, i + 1) for i in range(100)]
+    path = str(tmp_path / "arrivals.trace")
+    write_trace(path, records)
+    source = TraceSource(path, chunk_size=64)
+
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    ids = []
+
+    async def consume(place, tokens):
+        ids.extend(id for _, id in tokens)
+
+    p1 = net.SpecialPlace("p1", source=source)
+    t = net.Transition("t")
+    p2 = net.SpecialPlace("p2", batch_consumer=consume)
+    p1.connect(t).connect(p2)
+    for pt in (p1, t, p2):
+        reg.register(pt)
+
+    result = soyutnet.run(reg, until=StopConditions(max_firings=10))
+    assert result.stopped
+    assert not source.exhausted
+    assert source._buffer is None and source._file is None
+
+    soyutnet.run(reg, until=StopConditions(quiescence=True))
+    assert source.exhausted
+    assert source._buffer is None and source._file is None
+    pending = [id for _, id in p1._tokens.get(GENERIC_LABEL, [])]
+    for arc in p1._output_arcs + t._output_arcs:
+        pending.extend(token[1] for token in arc._queue._queue)
+    pending.extend(id for _, id in t._tokens.get(GENERIC_LABEL, []))
+    assert sorted(ids + pending) == list(range(1, 101))
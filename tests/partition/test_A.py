@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+import soyutnet
+from soyutnet import SoyutNet
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL, SoyutNetError
+from soyutnet.partition import ChannelArc
+
+
+def ring(net, reg, name, token_count):
+    p1 = net.Place(f"{name}_p1", initial_tokens={GENERIC_LABEL: [1] * token_count})
+    p2 = net.Place(f"{name}_p2")
+    t1 = net.Transition(f"{name}_t1")
+    t2 = net.Transition(f"{name}_t2")
+    p1.connect(t1).connect(p2).connect(t2).connect(p1)
+    {reg.register(pt) for pt in (p1, p2, t1, t2)}
+
+    return p1, p2, t1, t2
+
+
+def test_01():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    a = ring(net, reg, "a", 1)
+    b = ring(net, reg, "b", 2)
+
+    components = reg.get_connected_components()
+    assert len(components) == 2
+    assert set(components[0]) == set(a)
+    assert set(components[1]) == set(b)
+
+    a[2].connect(b[1])
+    assert len(reg.get_connected_components()) == 1
+
+
+def test_02():
+    N = 200
+    token_ids = list(range(1, N + 1))
+    consumed = []
+
+    async def producer(place):
+        if token_ids:
+            return [(GENERIC_LABEL, token_ids.pop(0))]
+        return []
+
+    async def consumer(place):
+        token = place.get_token(GENERIC_LABEL)
+        if token:
+            consumed.append(token[1])
+            if len(consumed) == N:
+                soyutnet.terminate()
+
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p0 = net.SpecialPlace("p0", producer=producer)
+    t0 = net.Transition("t0")
+    p1 = net.Place("p1")
+    t1 = net.Transition("t1")
+    p2 = net.SpecialPlace("p2", consumer=consumer)
+    p0.connect(t0).connect(p1).connect(t1).connect(p2)
+    {reg.register(pt) for pt in (p0, t0, p1, t1, p2)}
+    a = ring(net, reg, "a", 3)
+
+    arcs = (t0._output_arcs[0], p1._output_arcs[0])
+    soyutnet.run_partitioned(reg, [[p0, t0], [p1, t1, p2], a])
+
+    assert sorted(consumed) == list(range(1, N + 1))
+    assert t0._output_arcs[0] is arcs[0]
+    assert p1._output_arcs[0] is arcs[1]
+    assert not any(isinstance(arc, ChannelArc) for arc in p1._input_arcs)
+    in_pts = sum(len(ids) for pt in a for ids in pt._tokens.values())
+    in_arcs = sum(arc._queue.qsize() for pt in a for arc in pt._output_arcs)
+    assert in_pts + in_arcs == 3
+
+
+def test_03():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    a = ring(net, reg, "a", 1)
+
+    with pytest.raises(SoyutNetError):
+        soyutnet.run_partitioned(reg, [a[:2]])
+
+    with pytest.raises(SoyutNetError):
+        soyutnet.run_partitioned(reg, [a, a[:1]])
@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+
+import soyutnet
+from soyutnet import SoyutNet
+from soyutnet.constants import GENERIC_ID, GENERIC_LABEL, SoyutNetError
+from soyutnet.distributed import SharedRingBuffer, ProcessChannelArc
+
+
+def test_01():
+    ring = SharedRingBuffer(3)
+    try:
+        assert ring.pop() is None
+        assert ring.push(1, 10)
+        assert ring.push(2, 20)
+        assert ring.push(3, 30)
+        assert not ring.push(4, 40)
+        assert len(ring) == 3
+        assert ring.pop() == (1, 10)
+        assert ring.push(4, 40)
+        assert [ring.pop() for _ in range(4)] == [(2, 20), (3, 30), (4, 40), None]
+    finally:
+        ring.close()
+
+
+def test_02():
+    N = 100
+    token_ids = list(range(1, N + 1))
+
+    async def producer(place):
+        if token_ids:
+            return [(GENERIC_LABEL, token_ids.pop(0))]
+        return []
+
+    async def consumer(place):
+        if place.get_token_count(GENERIC_LABEL) == N:
+            soyutnet.terminate()
+
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p0 = net.SpecialPlace("p0", producer=producer)
+    t0 = net.Transition("t0")
+    p1 = net.Place("p1", observer=net.Observer())
+    t1 = net.Transition("t1", record_firing=True)
+    p2 = net.SpecialPlace("p2", consumer=consumer)
+    p0.connect(t0).connect(p1).connect(t1, weight=2).connect(p2, weight=2)
+    {reg.register(pt) for pt in (p0, t0, p1, t1, p2)}
+
+    arc = p1._output_arcs[0]
+    soyutnet.run_distributed(reg, [[p0, t0, p1], [t1, p2]])
+
+    assert p1._output_arcs[0] is arc
+    assert not any(isinstance(arc, ProcessChannelArc) for arc in t1._input_arcs)
+    assert sorted(p2._tokens[GENERIC_LABEL]) == list(range(1, N + 1))
+    assert t1.get_no_of_times_enabled() == N // 2
+    assert len(t1.get_firing_records()) == N // 2
+    records = reg.get_merged_records()
+    assert len(records) == N // 2
+    assert all(rec[0] == "p1" and rec[1][2] == "t1" for rec in records)
+
+
+def test_03():
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p1 = net.Place("p1")
+    reg.register(p1)
+
+    with pytest.raises(SoyutNetError):
+        soyutnet.run_distributed(reg, [])
+
+
+def test_04():
+    N = 5
+
+    async def stop_after():
+        await asyncio.sleep(0.3)
+        soyutnet.terminate()
+
+    net = SoyutNet()
+    reg = net.PTRegistry()
+    p1 = net.Place("p1", initial_tokens={GENERIC_LABEL: [GENERIC_ID] * N})
+    t1 = net.Transition("t1")
+    p2 = net.Place("p2", observer=net.StatisticsObserver())
+    t2 = net.Transition("t2")
+    p1.connect(t1).connect(p2).connect(t2).connect(p1)
+    {reg.register(pt) for pt in (p1, t1, p2, t2)}
+
+    soyutnet.run_distributed(reg, [[p1, t1], [p2, t2]], [stop_after()])
+
+    marked = sum(len(pt._tokens.get(GENERIC_LABEL, [])) for pt in (p1, p2, t1, t2))
+    queued = sum(
+        arc._queue.qsize() for pt in (p1, t1, p2, t2) for arc in pt._output_arcs
+    )
+    assert marked + queued == N
+    assert p2._observer._accumulators[GENERIC_LABEL].arrivals > 0